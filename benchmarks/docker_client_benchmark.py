@@ -0,0 +1,120 @@
+"""
+Per-call latency of the Docker tools against a local stub Docker API server.
+
+Compares creating a client per call (the old behaviour) with the shared
+client, and the shared client with the listing cache.
+
+Usage:
+    poetry run python benchmarks/docker_client_benchmark.py [--calls 200]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import repo_path  # noqa: F401
+from yada.tools import docker_tools
+
+CONTAINER = {
+    "Id": "c0ffee" * 10 + "abcd",
+    "Name": "/stub",
+    "Image": "stub:latest",
+    "Config": {"Image": "stub:latest"},
+    "State": {"Status": "running"},
+}
+IMAGE = {"Id": "sha256:" + "ab" * 32, "RepoTags": ["stub:latest"]}
+
+# path -> response body
+ROUTES = {
+    "/_ping": "OK",
+    "/version": {"ApiVersion": "1.43", "Version": "24.0.0"},
+    "/containers/json": [{"Id": CONTAINER["Id"]}],
+    f"/containers/{CONTAINER['Id']}/json": CONTAINER,
+    "/images/json": [IMAGE],
+}
+
+
+class StubDockerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = 0
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        # headers and body are written separately, don't let Nagle delay them
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        StubDockerHandler.connections += 1
+
+    def do_GET(self):
+        StubDockerHandler.requests += 1
+        path = self.path.split("?")[0]
+        if path.startswith("/v1."):
+            path = path[path.index("/", 1) :]
+
+        body = ROUTES.get(path, {"message": "not found"})
+        payload = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.send_response(200 if path in ROUTES else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def _per_client_call() -> str:
+    # the behaviour before the shared client: a new client for every tool call
+    docker_tools._close_client()
+    docker_tools._invalidate_listings()
+    return docker_tools.list_all_running_docker_containers.invoke({})
+
+
+def _shared_client_call() -> str:
+    docker_tools._invalidate_listings()
+    return docker_tools.list_all_running_docker_containers.invoke({})
+
+
+def _cached_call() -> str:
+    return docker_tools.list_all_running_docker_containers.invoke({})
+
+
+def measure(name: str, call, calls: int) -> None:
+    StubDockerHandler.requests = 0
+    StubDockerHandler.connections = 0
+    call()  # warm up imports and the first connection
+
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    print(
+        f"{name:<16} median {statistics.median(samples):7.3f} ms  "
+        f"p95 {statistics.quantiles(samples, n=20)[-1]:7.3f} ms  "
+        f"requests {StubDockerHandler.requests:5}  "
+        f"connections {StubDockerHandler.connections:4}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubDockerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["DOCKER_HOST"] = f"tcp://127.0.0.1:{server.server_address[1]}"
+
+    measure("client per call", _per_client_call, args.calls)
+    measure("shared client", _shared_client_call, args.calls)
+    measure("listing cache", _cached_call, args.calls)
+
+    docker_tools._close_client()
+    server.shutdown()
@@ -0,0 +1,67 @@
+"""
+A deterministic chat model for the offline benchmarks.
+
+It answers from a script instead of calling an API, so a benchmark measures
+YADA's own overhead and gives the same result on every run.
+"""
+
+from typing import Callable, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Replies to a user message with the scripted tool calls, then answers with
+    `answer` once the tool results are in. With no tool calls scripted it
+    answers straight away.
+
+    `tool_calls` maps the latest user message to the tool calls to make, as
+    a list of `(name, args)` pairs.
+    """
+
+    tool_calls: Optional[Callable[[str], list[tuple[str, dict]]]] = None
+    answer: str = "Done."
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def get_num_tokens_from_messages(self, messages: list[BaseMessage]) -> int:
+        # a rough but deterministic count, tiktoken would need a download
+        return sum(len(str(message.content)) // 4 + 4 for message in messages)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        last = messages[-1]
+
+        scripted = []
+        if isinstance(last, HumanMessage) and self.tool_calls:
+            scripted = self.tool_calls(str(last.content))
+
+        if scripted:
+            message = AIMessage(
+                id=f"run-{self.calls}",
+                content="",
+                tool_calls=[
+                    {"id": f"call-{self.calls}-{i}", "name": name, "args": args}
+                    for i, (name, args) in enumerate(scripted)
+                ],
+            )
+        else:
+            message = AIMessage(id=f"run-{self.calls}", content=self.answer)
+
+        input_tokens = self.get_num_tokens_from_messages(messages)
+        output_tokens = self.get_num_tokens_from_messages([message])
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,167 @@
+"""
+Import-time benchmark for the YADA CLI startup path.
+
+Runs `python -X importtime` for each entry point, prints the slowest modules
+and exits with a non-zero status when an entry point exceeds its budget or
+imports a module it should not need.
+
+Absolute budgets depend on the machine, so they are loose defaults that can
+be overridden with --budget. With --baseline the budget is instead the import
+time of another commit, measured on the same machine, times --threshold.
+
+Usage:
+    poetry run python benchmarks/import_time_benchmark.py [--runs 5]
+    poetry run python benchmarks/import_time_benchmark.py --budget yada.cli=400
+    poetry run python benchmarks/import_time_benchmark.py --baseline main
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# entry point -> (budget in milliseconds, modules it must not import)
+BUDGETS = {
+    # `yada -V` and `yada --config`
+    "yada.cli": (
+        750,
+        [
+            "langchain",
+            "langchain_core",
+            "langchain_openai",
+            "langgraph",
+            "docker",
+            "git",
+        ],
+    ),
+    # `yada` chat / command startup, before the first tool call
+    "yada.yada_cli": (2500, ["langchain_openai", "docker", "git", "webbrowser"]),
+}
+
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(module: str, root: str = REPO_ROOT) -> dict[str, int]:
+    """
+    Import the module from the checkout at `root` in a fresh interpreter and
+    return the cumulative import time in microseconds of every module it
+    pulled in.
+    """
+    # `-c` puts the working directory first on sys.path
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def median_ms(module: str, runs: int, root: str = REPO_ROOT) -> float:
+    return statistics.median(measure(module, root)[module] for _ in range(runs)) / 1000
+
+
+def baseline_budgets(ref: str, runs: int, threshold: float) -> dict[str, float]:
+    """
+    Measure every entry point at the commit `ref`, checked out in a temporary
+    worktree, and return its median times `threshold` as the budget.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        worktree = os.path.join(directory, "baseline")
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", "--quiet", worktree, ref],
+            cwd=REPO_ROOT,
+            check=True,
+        )
+        try:
+            budgets = {}
+            for module in BUDGETS:
+                baseline_ms = median_ms(module, runs, worktree)
+                print(f"{module} at {ref}: {baseline_ms:.1f} ms")
+                budgets[module] = round(baseline_ms * threshold, 1)
+            return budgets
+        finally:
+            subprocess.run(
+                ["git", "worktree", "remove", "--force", worktree],
+                cwd=REPO_ROOT,
+                check=True,
+            )
+
+
+def report(module: str, runs: int, top: int, budget_ms: Optional[float]) -> bool:
+    samples = [measure(module) for _ in range(runs)]
+    total_ms = statistics.median(s.get(module, 0) for s in samples) / 1000
+    default_budget_ms, forbidden = BUDGETS[module]
+    if budget_ms is None:
+        budget_ms = default_budget_ms
+
+    print(f"\n{module}: {total_ms:.1f} ms (budget {budget_ms} ms, median of {runs})")
+    slowest = sorted(samples[-1].items(), key=lambda item: item[1], reverse=True)
+    for name, micros in slowest[1 : top + 1]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    ok = True
+    if total_ms > budget_ms:
+        print(f"  FAIL: over budget by {total_ms - budget_ms:.1f} ms")
+        ok = False
+
+    imported = [
+        name
+        for name in samples[-1]
+        if any(name == f or name.startswith(f + ".") for f in forbidden)
+    ]
+    if imported:
+        print(f"  FAIL: imports {', '.join(sorted(imported)[:10])}")
+        ok = False
+
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="MODULE=MS",
+        help="Override the budget of an entry point",
+    )
+    parser.add_argument(
+        "--baseline", metavar="REF", help="Budget relative to this git commit"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Slowdown ratio allowed over --baseline",
+    )
+    args = parser.parse_args()
+
+    budgets = {}
+    if args.baseline:
+        budgets = baseline_budgets(args.baseline, args.runs, args.threshold)
+    for override in args.budget:
+        module, _, milliseconds = override.partition("=")
+        if module not in BUDGETS:
+            parser.error(f"unknown entry point {module}")
+        budgets[module] = float(milliseconds)
+
+    results = [
+        report(module, args.runs, args.top, budgets.get(module)) for module in BUDGETS
+    ]
+    sys.exit(0 if all(results) else 1)
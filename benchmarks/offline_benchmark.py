@@ -0,0 +1,382 @@
+"""
+Offline benchmark suite for YADA's own overhead.
+
+A scripted chat model and stub tools stand in for the API, Docker and the
+shell, so the numbers only move when YADA's code does. Covers graph
+construction, per-turn overhead with N messages of history, ToolLoader.load
+with N custom tool files, SyncToolNode throughput and Markdown rendering.
+
+Results are written as JSON; pass a previous result file to --compare to
+flag regressions between commits.
+
+Usage:
+    poetry run python benchmarks/offline_benchmark.py --output before.json
+    poetry run python benchmarks/offline_benchmark.py --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from langchain.tools import tool
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+import repo_path  # noqa: F401
+from fake_model import ScriptedChatModel
+from yada import tool_loader, utils
+from yada.agent import YadaAgent
+from yada.sync_tool_node import SyncToolNode
+
+TOOL_LATENCY_SECONDS = 0.005
+
+CUSTOM_TOOL_FILE = '''
+from langchain.tools import tool
+
+from yada.tools import safe_tool
+
+
+@safe_tool
+@tool
+def custom_tool_{n}(name: str) -> str:
+    """
+    Benchmark custom tool {n}.
+
+    Args:
+        name (str): A name.
+    """
+    return f"hello {{name}}"
+'''
+
+ANSWER_MARKDOWN = """
+Here is what I found:
+
+- **3** containers are running: `web`, `db` and `cache`
+- the `web` container restarted twice in the last hour
+
+```bash
+docker logs --since 1h web
+```
+
+Let me know if you want me to restart it.
+"""
+
+
+@tool
+def lookup(key: str) -> str:
+    """
+    Look up a value.
+
+    Args:
+        key (str): The key to look up.
+    """
+    return f"value of {key}"
+
+
+@tool
+def slow_lookup(key: str) -> str:
+    """
+    Look up a value slowly.
+
+    Args:
+        key (str): The key to look up.
+    """
+    time.sleep(TOOL_LATENCY_SECONDS)
+    return f"value of {key}"
+
+
+def measure(
+    run: Callable[[], None],
+    repeat: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> dict:
+    """
+    Time `run` `repeat` times after one warm-up run, calling `setup` untimed
+    before each run.
+    """
+    samples = []
+    for i in range(repeat + 1):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        if i:
+            samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "runs": repeat,
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "min_ms": round(samples[0], 4),
+    }
+
+
+def _builtin_tools() -> tuple[list, list]:
+    with _custom_tools_dir(None):
+        loader = tool_loader.ToolLoader(index_path=None)
+        loader.load()
+    return loader.safe_tools, loader.sensitive_tools
+
+
+def bench_graph_construction(repeat: int) -> list[dict]:
+    safe_tools, sensitive_tools = _builtin_tools()
+
+    def run():
+        YadaAgent(
+            model=ScriptedChatModel(),
+            safe_tools=safe_tools,
+            sensitive_tools=sensitive_tools,
+            checkpointer=MemorySaver(),
+        )
+
+    params = {"tools": len(safe_tools) + len(sensitive_tools)}
+    return [{"name": "graph_construction", "params": params, **measure(run, repeat)}]
+
+
+def bench_turn_overhead(repeat: int, history_sizes: list[int]) -> list[dict]:
+    model = ScriptedChatModel(tool_calls=lambda _: [("lookup", {"key": "a"})])
+    agent = YadaAgent(
+        model=model,
+        safe_tools=[lookup],
+        sensitive_tools=[],
+        checkpointer=MemorySaver(),
+    )
+
+    results = []
+    for size in history_sizes:
+        history = []
+        for i in range(size // 2):
+            history.append(HumanMessage(id=f"h{i}", content=f"question {i}"))
+            history.append(AIMessage(id=f"a{i}", content=f"answer {i}"))
+
+        thread = {"config": None}
+
+        def setup():
+            # a fresh thread per run, so the history does not grow
+            config = {"configurable": {"thread_id": f"{size}-{time.perf_counter()}"}}
+            if history:
+                agent.workflow.update_state(
+                    config, {"messages": history}, as_node="agent"
+                )
+            thread["config"] = config
+
+        def run():
+            agent.invoke({"messages": ["lookup a"]}, thread["config"])
+
+        results.append(
+            {
+                "name": "turn_overhead",
+                "params": {"history_messages": size, "model_calls": 2},
+                **measure(run, repeat, setup),
+            }
+        )
+    return results
+
+
+def bench_tool_loader(repeat: int, file_counts: list[int]) -> list[dict]:
+    results = []
+    for count in file_counts:
+        directory = tempfile.mkdtemp(prefix="yada-bench-tools-")
+        index_path = os.path.join(directory, "index.json")
+        for n in range(count):
+            path = os.path.join(directory, f"bench_{n}_tools.py")
+            with open(path, "w") as f:
+                f.write(CUSTOM_TOOL_FILE.format(n=n))
+
+        def cold_setup():
+            if os.path.exists(index_path):
+                os.remove(index_path)
+            tool_loader._custom_modules.clear()
+
+        def run():
+            tool_loader.ToolLoader(index_path=index_path).load()
+
+        with _custom_tools_dir(directory):
+            for cache, setup in [("cold", cold_setup), ("warm", None)]:
+                results.append(
+                    {
+                        "name": "tool_loader_load",
+                        "params": {"custom_tool_files": count, "index": cache},
+                        **measure(run, repeat, setup),
+                    }
+                )
+        shutil.rmtree(directory)
+    return results
+
+
+def bench_sync_tool_node(repeat: int, calls: int, workers: list[int]) -> list[dict]:
+    message = AIMessage(
+        content="",
+        tool_calls=[
+            {"id": f"call{i}", "name": "slow_lookup", "args": {"key": str(i)}}
+            for i in range(calls)
+        ],
+    )
+
+    results = []
+    for max_workers in workers:
+        node = SyncToolNode([slow_lookup], all_tools=[], max_workers=max_workers)
+        result = measure(lambda: node.invoke({"messages": [message]}), repeat)
+        result["calls_per_second"] = round(calls / result["median_ms"] * 1000, 1)
+        results.append(
+            {
+                "name": "sync_tool_node",
+                "params": {
+                    "calls": calls,
+                    "max_workers": max_workers,
+                    "tool_latency_ms": TOOL_LATENCY_SECONDS * 1000,
+                },
+                **result,
+            }
+        )
+    return results
+
+
+def bench_print_markdown(repeat: int) -> list[dict]:
+    documents = {
+        "short": "Hello! How can I help you?",
+        "answer": ANSWER_MARKDOWN,
+        "long": ANSWER_MARKDOWN * 20,
+    }
+
+    results = []
+    # render like a 100 column terminal, not like a pipe
+    with _environ(FORCE_COLOR="1", COLUMNS="100"), contextlib.redirect_stdout(
+        io.StringIO()
+    ):
+        for name, markdown in documents.items():
+            results.append(
+                {
+                    "name": "print_markdown",
+                    "params": {"document": name, "chars": len(markdown)},
+                    **measure(lambda: utils.agent_response(markdown), repeat),
+                }
+            )
+    return results
+
+
+@contextlib.contextmanager
+def _custom_tools_dir(directory: Optional[str]):
+    with _environ(YADA_CUSTOM_TOOLS_DIR=directory or ""):
+        yield
+
+
+@contextlib.contextmanager
+def _environ(**values: str):
+    saved = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _key(result: dict) -> str:
+    params = ",".join(f"{k}={v}" for k, v in result["params"].items())
+    return f"{result['name']}[{params}]"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """
+    Print the change of every benchmark present in both runs and return
+    whether any got slower than `threshold` times its baseline median.
+    """
+    baseline_results = {_key(r): r for r in baseline["results"]}
+    regressed = False
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:", file=sys.stderr)
+    for result in current["results"]:
+        before = baseline_results.get(_key(result))
+        if not before:
+            continue
+
+        ratio = result["median_ms"] / before["median_ms"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(
+            f"  {_key(result):<70} {before['median_ms']:9.3f} -> "
+            f"{result['median_ms']:9.3f} ms  x{ratio:.2f}{flag}",
+            file=sys.stderr,
+        )
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--output", "-o", help="Write the JSON results here instead of stdout"
+    )
+    parser.add_argument("--compare", help="A previous JSON result file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Slowdown ratio reported as a regression",
+    )
+    args = parser.parse_args()
+
+    results = []
+    results += bench_graph_construction(args.repeat)
+    results += bench_turn_overhead(args.repeat, history_sizes=[0, 50, 200])
+    results += bench_tool_loader(args.repeat, file_counts=[10, 100])
+    results += bench_sync_tool_node(args.repeat, calls=32, workers=[1, 4, 8])
+    results += bench_print_markdown(args.repeat)
+
+    report = {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    for result in results:
+        print(f"{_key(result):<70} {result['median_ms']:9.3f} ms", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
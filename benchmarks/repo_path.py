@@ -0,0 +1,15 @@
+"""
+Make the checkout importable from the benchmark scripts.
+
+The project is installed with --no-root, so `yada` is only on sys.path when
+the working directory is the repository root. Importing this module first
+puts the root there regardless of where the script is run from.
+"""
+
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
@@ -0,0 +1,89 @@
+"""
+Wall-clock benchmark for SyncToolNode with a batch of mocked slow tools.
+
+Usage:
+    poetry run python benchmarks/sync_tool_node_benchmark.py
+"""
+
+import time
+
+from langchain.tools import tool
+from langchain_core.messages import AIMessage
+
+import repo_path  # noqa: F401
+from yada.sync_tool_node import SyncToolNode
+
+TOOL_LATENCY_SECONDS = 0.25
+
+
+@tool
+def list_all_docker_images() -> str:
+    """
+    Mocked slow tool.
+    """
+    time.sleep(TOOL_LATENCY_SECONDS)
+    return "images"
+
+
+@tool
+def list_all_running_docker_containers() -> str:
+    """
+    Mocked slow tool.
+    """
+    time.sleep(TOOL_LATENCY_SECONDS)
+    return "containers"
+
+
+@tool
+def docker_logs(container_id: str) -> str:
+    """
+    Mocked slow tool.
+
+    Args:
+        container_id (str): The ID of the Docker container.
+    """
+    time.sleep(TOOL_LATENCY_SECONDS)
+    return f"logs for {container_id}"
+
+
+@tool
+def homebrew_doctor() -> str:
+    """
+    Mocked slow tool.
+    """
+    time.sleep(TOOL_LATENCY_SECONDS)
+    return "ready to brew"
+
+
+TOOLS = [
+    list_all_docker_images,
+    list_all_running_docker_containers,
+    docker_logs,
+    homebrew_doctor,
+]
+
+
+def _tool_calls_message() -> AIMessage:
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {"id": "call0", "name": "list_all_docker_images", "args": {}},
+            {"id": "call1", "name": "list_all_running_docker_containers", "args": {}},
+            {"id": "call2", "name": "docker_logs", "args": {"container_id": "abc"}},
+            {"id": "call3", "name": "homebrew_doctor", "args": {}},
+        ],
+    )
+
+
+def run_benchmark(max_workers: int) -> float:
+    node = SyncToolNode(TOOLS, all_tools=[], max_workers=max_workers)
+    start = time.perf_counter()
+    node.invoke({"messages": [_tool_calls_message()]})
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    print(f"{len(TOOLS)} tool calls, {TOOL_LATENCY_SECONDS}s each")
+    for max_workers in [1, 2, 4]:
+        elapsed = run_benchmark(max_workers)
+        print(f"max_workers={max_workers}: {elapsed:.3f}s")
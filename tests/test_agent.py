@@ -0,0 +1,232 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from langchain.tools import tool
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from yada.agent import YadaAgent
+from yada.tools import with_coroutine
+
+
+class FakeToolCallingModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+class RecordingToolCallingModel(FakeToolCallingModel):
+    bound_tools: list = []
+
+    def bind_tools(self, tools, **kwargs):
+        self.bound_tools.append([t["function"]["name"] for t in tools])
+        return self
+
+
+async def _aecho(value: str) -> str:
+    await asyncio.sleep(0)
+    return f"async {value}"
+
+
+@with_coroutine(_aecho)
+@tool
+def echo(value: str) -> str:
+    """
+    Echo the value.
+
+    Args:
+        value (str): The value to echo.
+    """
+    return f"sync {value}"
+
+
+def _new_agent(messages: list[AIMessage]) -> YadaAgent:
+    return YadaAgent(
+        model=FakeToolCallingModel(messages=iter(messages)),
+        safe_tools=[echo],
+        sensitive_tools=[],
+        checkpointer=MemorySaver(),
+    )
+
+
+def _tool_call_messages() -> list[AIMessage]:
+    return [
+        AIMessage(
+            id="ai1",
+            content="",
+            tool_calls=[
+                {"id": "call0", "name": "echo", "args": {"value": "a"}},
+                {"id": "call1", "name": "echo", "args": {"value": "b"}},
+            ],
+        ),
+        AIMessage(id="ai2", content="done"),
+    ]
+
+
+class TestYadaAgent(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = {"configurable": {"thread_id": "test"}}
+        return super().setUp()
+
+    def test_invoke_uses_sync_tools(self):
+        # Arrange
+        agent = _new_agent(_tool_call_messages())
+
+        # Act
+        result = agent.invoke({"messages": ["hi"]}, self.config)
+
+        # Assert
+        tool_messages = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+        self.assertEqual([m.content for m in tool_messages], ["sync a", "sync b"])
+        self.assertEqual(result["messages"][-1].content, "done")
+
+    def test_ainvoke_uses_async_tools(self):
+        # Arrange
+        agent = _new_agent(_tool_call_messages())
+
+        # Act
+        result = asyncio.run(agent.ainvoke({"messages": ["hi"]}, self.config))
+
+        # Assert
+        tool_messages = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+        self.assertEqual([m.content for m in tool_messages], ["async a", "async b"])
+        self.assertEqual(result["messages"][-1].content, "done")
+
+    def test_astream(self):
+        # Arrange
+        agent = _new_agent([AIMessage(id="ai1", content="hello")])
+
+        async def collect():
+            return [
+                event
+                async for event in agent.astream({"messages": ["hi"]}, self.config)
+            ]
+
+        # Act
+        events = asyncio.run(collect())
+
+        # Assert
+        self.assertEqual(events[-1]["messages"][-1].content, "hello")
+        state = asyncio.run(agent.aget_state(self.config))
+        self.assertFalse(state.next)
+
+    def test_stream_updates_with_tokens(self):
+        # Arrange
+        agent = _new_agent([AIMessage(id="ai1", content="hello world")])
+        tokens = []
+
+        # Act
+        updates = list(
+            agent.stream_updates(
+                {"messages": ["hi"]},
+                self.config,
+                on_token=lambda chunk: tokens.append(chunk.content),
+            )
+        )
+
+        # Assert
+        self.assertEqual("".join(tokens), "hello world")
+        self.assertEqual(
+            [(node, update["messages"][-1].content) for node, update in updates],
+            [("agent", "hello world")],
+        )
+
+    def test_update_tools(self):
+        # Arrange
+        agent = _new_agent(_tool_call_messages())
+        old_workflow = agent.workflow
+
+        # Act
+        agent.update_tools(safe_tools=[], sensitive_tools=[echo])
+
+        # Assert
+        self.assertIsNot(agent.workflow, old_workflow)
+        self.assertTrue(agent.is_sensitive_tool("echo"))
+        result = agent.invoke({"messages": ["hi"]}, self.config)
+        self.assertEqual(agent.get_state(self.config).next, ("sensitive_tools",))
+        self.assertTrue(result["messages"][-1].tool_calls)
+
+    def test_tool_selection_binds_relevant_tools(self):
+        # Arrange
+        @tool
+        def list_capabilities() -> str:
+            """
+            List the capabilities of the tools available in YADA.
+            """
+            return ""
+
+        @tool
+        def docker_logs(container_id: str) -> str:
+            """
+            Get the logs of a Docker container.
+
+            Args:
+                container_id (str): The ID of the Docker container.
+            """
+            return ""
+
+        model = RecordingToolCallingModel(
+            messages=iter(
+                [AIMessage(id="ai1", content="a"), AIMessage(id="ai2", content="b")]
+            ),
+            bound_tools=[],
+        )
+        agent = YadaAgent(
+            model=model,
+            safe_tools=[echo, list_capabilities, docker_logs],
+            sensitive_tools=[],
+            checkpointer=MemorySaver(),
+            tool_selection_top_k=1,
+        )
+
+        # Act
+        agent.invoke({"messages": ["show the container logs"]}, self.config)
+        agent.invoke({"messages": ["show the container logs"]}, self.config)
+
+        # Assert
+        self.assertEqual(
+            model.bound_tools,
+            [
+                ["echo", "list_capabilities", "docker_logs"],
+                ["list_capabilities", "docker_logs"],
+            ],
+        )
+
+    def test_tool_subset_cache_is_thread_safe(self):
+        # Arrange
+        @tool
+        def docker_logs(container_id: str) -> str:
+            """
+            Get the logs of a Docker container.
+
+            Args:
+                container_id (str): The ID of the Docker container.
+            """
+            return ""
+
+        agent = YadaAgent(
+            model=FakeToolCallingModel(messages=iter([])),
+            safe_tools=[echo, docker_logs],
+            sensitive_tools=[],
+            checkpointer=MemorySaver(),
+            tool_selection_top_k=1,
+        )
+        prompts = ["echo the value", "show the container logs"] * 50
+
+        # Act
+        with mock.patch("yada.agent._MAX_TOOL_SUBSETS", 1):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                runnables = list(
+                    executor.map(
+                        lambda prompt: agent._select_model_runnable(
+                            {"messages": [HumanMessage(prompt)]}
+                        ),
+                        prompts,
+                    )
+                )
+
+        # Assert
+        self.assertEqual(len(runnables), len(prompts))
+        self.assertEqual(len(agent._tool_subset_runnables), 1)
@@ -0,0 +1,150 @@
+import io
+import json
+import unittest
+
+from langchain.tools import tool
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+
+from yada.agent import YadaAgent
+from yada.batch import (
+    BatchRunner,
+    percentile,
+    read_prompts,
+    without_sequential_tools,
+)
+from yada.tools.filesystem_tools import change_directory, current_directory
+
+
+class EchoModel(BaseChatModel):
+    """
+    Echoes the prompt, and asks for `wipe` when the prompt mentions it.
+    """
+
+    @property
+    def _llm_type(self) -> str:
+        return "echo"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            message = AIMessage(content=f"tool said: {last.content}")
+        elif "wipe" in last.content:
+            message = AIMessage(
+                content="", tool_calls=[{"id": "call0", "name": "wipe", "args": {}}]
+            )
+        else:
+            message = AIMessage(content=f"echo: {last.content}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@tool
+def wipe() -> str:
+    """
+    Wipe everything.
+    """
+    return "wiped"
+
+
+def _run(lines: list[str], allowed_tools=()) -> tuple[BatchRunner, list[dict]]:
+    agent = YadaAgent(
+        model=EchoModel(),
+        safe_tools=[],
+        sensitive_tools=[wipe],
+        checkpointer=MemorySaver(),
+    )
+    runner = BatchRunner(agent, concurrency=3, allowed_tools=allowed_tools)
+    output = io.StringIO()
+    runner.run(read_prompts(lines), output)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    return runner, sorted(results, key=lambda r: r["id"])
+
+
+class TestBatch(unittest.TestCase):
+    def test_read_prompts(self):
+        # Act
+        prompts = list(
+            read_prompts(
+                ['"hello"', "", '{"prompt": "hi", "id": "a", "thread_id": "t"}']
+            )
+        )
+
+        # Assert
+        self.assertEqual(
+            prompts,
+            [
+                {"prompt": "hello", "id": 1},
+                {"prompt": "hi", "id": "a", "thread_id": "t"},
+            ],
+        )
+
+    def test_read_prompts_reports_invalid_lines(self):
+        # Act
+        prompts = list(read_prompts(['{"id": 1}', "{not json", '"hello"']))
+
+        # Assert
+        self.assertEqual(prompts[0]["id"], 1)
+        self.assertIn("expected a prompt", prompts[0]["error"])
+        self.assertEqual(prompts[1]["id"], 2)
+        self.assertTrue(prompts[1]["error"].startswith("Line 2: "))
+        self.assertEqual(prompts[2], {"prompt": "hello", "id": 3})
+
+    def test_invalid_line_does_not_stop_the_run(self):
+        # Act
+        runner, results = _run(['"first"', "{not json", '"last"'])
+
+        # Assert
+        self.assertEqual([r["status"] for r in results], ["ok", "error", "ok"])
+        self.assertEqual(results[2]["response"], "echo: last")
+        self.assertEqual(runner.errors, 1)
+        self.assertIn("3 prompts (1 failed)", runner.summary())
+
+    def test_without_sequential_tools(self):
+        # Act
+        tools = without_sequential_tools([wipe, change_directory, current_directory])
+
+        # Assert
+        self.assertEqual([t.name for t in tools], ["wipe", "current_directory"])
+
+    def test_run_writes_a_result_per_prompt(self):
+        # Act
+        runner, results = _run([json.dumps(f"prompt {i}") for i in range(7)])
+
+        # Assert
+        self.assertEqual(
+            [r["response"] for r in results], [f"echo: prompt {i}" for i in range(7)]
+        )
+        self.assertEqual(len({r["thread_id"] for r in results}), 7)
+        self.assertEqual(runner.errors, 0)
+        self.assertIn("7 prompts (0 failed)", runner.summary())
+
+    def test_sensitive_tools_are_denied(self):
+        # Act
+        _, results = _run(['"wipe it"'])
+
+        # Assert
+        self.assertEqual(results[0]["denied_tools"], ["wipe"])
+        self.assertTrue(
+            results[0]["response"].startswith("tool said: Tool call denied")
+        )
+
+    def test_allowed_sensitive_tools_run(self):
+        # Act
+        _, results = _run(['"wipe it"'], allowed_tools=["wipe"])
+
+        # Assert
+        self.assertEqual(results[0]["denied_tools"], [])
+        self.assertEqual(results[0]["tool_calls"], ["wipe"])
+        self.assertEqual(results[0]["response"], "tool said: wiped")
+
+    def test_percentile(self):
+        # Act / Assert
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile([], 50), 0.0)
@@ -0,0 +1,225 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from yada.agent import YadaAgent
+from yada.checkpoint import SqliteCheckpointSaver
+
+
+class FakeToolCallingModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def _new_agent(checkpointer: SqliteCheckpointSaver, turns: int) -> YadaAgent:
+    return YadaAgent(
+        model=FakeToolCallingModel(
+            messages=iter([AIMessage(content=f"answer {i}") for i in range(turns)])
+        ),
+        safe_tools=[],
+        sensitive_tools=[],
+        checkpointer=checkpointer,
+    )
+
+
+class TestSqliteCheckpointSaver(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "checkpoints.sqlite")
+        self.config = {"configurable": {"thread_id": "thread1"}}
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_resume_thread_in_new_saver(self):
+        # Arrange
+        saver = SqliteCheckpointSaver(self.path)
+        agent = _new_agent(saver, turns=3)
+        for i in range(3):
+            agent.invoke({"messages": [f"question {i}"]}, self.config)
+        saver.close()
+
+        # Act
+        resumed_saver = SqliteCheckpointSaver(self.path)
+        state = _new_agent(resumed_saver, turns=0).get_state(self.config)
+
+        # Assert
+        self.assertEqual(resumed_saver.latest_thread_id(), "thread1")
+        self.assertEqual(
+            [m.content for m in state.values["messages"]],
+            [
+                "question 0",
+                "answer 0",
+                "question 1",
+                "answer 1",
+                "question 2",
+                "answer 2",
+            ],
+        )
+        resumed_saver.close()
+
+    def test_messages_stored_as_deltas(self):
+        # Arrange
+        saver = SqliteCheckpointSaver(self.path, max_checkpoints_per_thread=None)
+        agent = _new_agent(saver, turns=5)
+
+        # Act
+        for i in range(5):
+            agent.invoke({"messages": [f"question {i}"]}, self.config)
+        saver.flush()
+
+        # Assert
+        conn = sqlite3.connect(self.path)
+        blobs = [
+            json.loads(row[0])
+            for row in conn.execute(
+                "SELECT blob FROM blobs WHERE channel = 'messages' ORDER BY version"
+            )
+        ]
+        self.assertIsNone(blobs[0]["base"])
+        self.assertTrue(all(blob["base"] for blob in blobs[1:]))
+        self.assertTrue(all(len(blob["digests"]) <= 1 for blob in blobs[1:]))
+        self.assertEqual(
+            conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 10
+        )
+        conn.close()
+        saver.close()
+
+    @patch("yada.checkpoint._MESSAGE_DIGEST_CACHE_SIZE", 4)
+    def test_message_digest_cache_is_bounded(self):
+        # Arrange
+        saver = SqliteCheckpointSaver(self.path, max_checkpoints_per_thread=None)
+        agent = _new_agent(saver, turns=5)
+
+        # Act
+        for i in range(5):
+            agent.invoke({"messages": [f"question {i}"]}, self.config)
+        saver.flush()
+
+        # Assert
+        self.assertEqual(len(saver._message_digests), 4)
+        conn = sqlite3.connect(self.path)
+        self.assertEqual(
+            conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 10
+        )
+        conn.close()
+        saver.close()
+
+    def test_compaction_keeps_latest_checkpoints(self):
+        # Arrange
+        saver = SqliteCheckpointSaver(self.path, max_checkpoints_per_thread=2)
+        agent = _new_agent(saver, turns=5)
+        for i in range(5):
+            agent.invoke({"messages": [f"question {i}"]}, self.config)
+
+        # Act
+        saver.compact("thread1")
+
+        # Assert
+        self.assertEqual(len(list(saver.list(self.config))), 2)
+        state = agent.get_state(self.config)
+        self.assertEqual(len(state.values["messages"]), 10)
+        self.assertEqual(state.values["messages"][-1].content, "answer 4")
+        saver.close()
+
+    def test_delta_base_compacted_by_another_saver(self):
+        # Arrange
+        saver = SqliteCheckpointSaver(self.path)
+        agent = _new_agent(saver, turns=2)
+        agent.invoke({"messages": ["question 0"]}, self.config)
+        saver.flush()
+
+        # another process continues the thread and keeps only its latest checkpoint
+        other_saver = SqliteCheckpointSaver(self.path, max_checkpoints_per_thread=1)
+        _new_agent(other_saver, turns=1).invoke(
+            {"messages": ["question 1"]}, self.config
+        )
+        other_saver.close()
+
+        # Act
+        agent.invoke({"messages": ["question 2"]}, self.config)
+        saver.close()
+
+        # Assert
+        resumed_saver = SqliteCheckpointSaver(self.path)
+        state = _new_agent(resumed_saver, turns=0).get_state(self.config)
+        self.assertEqual(
+            [m.content for m in state.values["messages"]],
+            [
+                "question 0",
+                "answer 0",
+                "question 1",
+                "answer 0",
+                "question 2",
+                "answer 1",
+            ],
+        )
+        resumed_saver.close()
+
+    def test_compaction_runs_without_close(self):
+        # Arrange
+        saver = SqliteCheckpointSaver(
+            self.path, max_checkpoints_per_thread=2, compact_every=4
+        )
+        agent = _new_agent(saver, turns=5)
+
+        # Act
+        for i in range(5):
+            agent.invoke({"messages": [f"question {i}"]}, self.config)
+        saver.flush()
+
+        # Assert
+        conn = sqlite3.connect(self.path)
+        count = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+        conn.close()
+        # at most the kept ones plus those written since the last compaction
+        self.assertLessEqual(count, 2 + 4 - 1)
+        state = agent.get_state(self.config)
+        self.assertEqual(len(state.values["messages"]), 10)
+        saver.close()
+
+    def test_compaction_runs_after_interval(self):
+        # Arrange
+        saver = SqliteCheckpointSaver(
+            self.path, compact_every=None, compact_interval_seconds=60
+        )
+        agent = _new_agent(saver, turns=2)
+
+        # Act
+        with patch.object(saver, "compact") as mock_compact:
+            agent.invoke({"messages": ["question 0"]}, self.config)
+            compacted_early = mock_compact.called
+            saver._last_compaction -= 60
+            agent.invoke({"messages": ["question 1"]}, self.config)
+
+        # Assert
+        self.assertFalse(compacted_early)
+        mock_compact.assert_called_once_with("thread1")
+        saver.close()
+
+    def test_list_does_not_hold_lock_between_items(self):
+        # Arrange
+        saver = SqliteCheckpointSaver(self.path)
+        agent = _new_agent(saver, turns=1)
+        agent.invoke({"messages": ["question 0"]}, self.config)
+        checkpoints = saver.list(self.config)
+        next(checkpoints)
+
+        # Act
+        reader = threading.Thread(target=saver.latest_thread_id)
+        reader.start()
+        reader.join(timeout=5)
+
+        # Assert
+        self.assertFalse(reader.is_alive())
+        checkpoints.close()
+        saver.close()
@@ -1,4 +1,5 @@
 import sys
+import subprocess
 import pytest
 import unittest
 from unittest.mock import patch
@@ -6,9 +7,155 @@ from click.testing import CliRunner
 from importlib.metadata import PackageNotFoundError
 import yada.cli
 from yada.cli import run, _print_version
+from yada.tools.filesystem_tools import change_directory, current_directory
 from yada.yada_cli import YadaCli
 
 
 class TestCli(unittest.TestCase):
     def setUp(self) -> None:
         return super().setUp()
+
+    def test_version_and_config_path_skip_heavy_imports(self):
+        # Act
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, yada.cli; print(' '.join(sorted(sys.modules)))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        # Assert
+        modules = result.stdout.split()
+        for heavy in [
+            "langchain_core",
+            "langchain_openai",
+            "langgraph",
+            "docker",
+            "git",
+        ]:
+            self.assertNotIn(heavy, modules)
+
+    @patch("yada.tool_loader.ToolLoader.reindex", return_value=3)
+    def test_tools_reindex(self, mock_reindex):
+        # Act
+        result = CliRunner().invoke(run, ["tools", "reindex"])
+
+        # Assert
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Indexed 3 custom tools.", result.output)
+        mock_reindex.assert_called_once()
+
+    @patch("yada.cli.yada_config")
+    @patch("yada.yada_cli.YadaCli")
+    @patch("yada.batch.BatchRunner")
+    def test_batch(self, mock_batch_runner, mock_yada_cli, mock_yada_config):
+        # Arrange
+        mock_yada_config.api_key = "key"
+        tool_loader = mock_yada_cli.return_value.tool_loader
+        tool_loader.safe_tools = [current_directory, change_directory]
+        tool_loader.sensitive_tools = []
+        runner = mock_batch_runner.return_value
+        runner.errors = 0
+        runner.summary.return_value = "1 prompts"
+
+        # Act
+        result = CliRunner().invoke(
+            run, ["batch", "-c", "8", "--allow-tool", "wipe"], input='"hi"\n'
+        )
+
+        # Assert
+        self.assertEqual(result.exit_code, 0)
+        mock_batch_runner.assert_called_once_with(
+            mock_yada_cli.return_value.agent, concurrency=8, allowed_tools=("wipe",)
+        )
+        prompts, _ = runner.run.call_args.args
+        self.assertEqual(list(prompts), [{"prompt": "hi", "id": 1}])
+        mock_yada_cli.return_value.agent.update_tools.assert_called_once_with(
+            [current_directory], []
+        )
+        self.assertIn("Disabled change_directory", result.output)
+
+    @patch("yada.client.run_command")
+    @patch("yada.client.connect")
+    @patch("yada.yada_cli.YadaCli")
+    def test_command_is_forwarded_to_daemon(
+        self, mock_yada_cli, mock_connect, mock_run_command
+    ):
+        # Act
+        result = CliRunner().invoke(run, ["list", "containers"])
+
+        # Assert
+        self.assertEqual(result.exit_code, 0)
+        mock_run_command.assert_called_once_with(
+            mock_connect.return_value,
+            "list containers",
+            thread_id=None,
+            resume=False,
+            stream=False,
+        )
+        mock_yada_cli.assert_not_called()
+
+    @patch("yada.client.run_command", return_value=None)
+    @patch("yada.client.connect")
+    @patch("yada.yada_cli.YadaCli")
+    def test_forwarded_command_failure_exits_with_error(
+        self, mock_yada_cli, mock_connect, mock_run_command
+    ):
+        # Act
+        result = CliRunner().invoke(run, ["list", "containers"])
+
+        # Assert
+        self.assertEqual(result.exit_code, 1)
+        mock_yada_cli.assert_not_called()
+
+    @patch("yada.client.run_command")
+    @patch("yada.client.connect")
+    @patch("yada.yada_cli.YadaCli")
+    def test_prompt_starting_with_a_subcommand_name(
+        self, mock_yada_cli, mock_connect, mock_run_command
+    ):
+        # Act
+        results = [
+            CliRunner().invoke(run, ["tools", "I", "have", "installed?"]),
+            CliRunner().invoke(run, ["serve", "the", "app"]),
+            CliRunner().invoke(run, ["--", "serve"]),
+        ]
+
+        # Assert
+        self.assertEqual([result.exit_code for result in results], [0, 0, 0])
+        self.assertEqual(
+            [call.args[1] for call in mock_run_command.call_args_list],
+            ["tools I have installed?", "serve the app", "serve"],
+        )
+
+    @patch("yada.cli.yada_config")
+    @patch("yada.client.connect")
+    @patch("yada.yada_cli.YadaCli")
+    def test_json_output_runs_locally(
+        self, mock_yada_cli, mock_connect, mock_yada_config
+    ):
+        # Arrange
+        mock_yada_config.api_key = "key"
+        mock_yada_cli.return_value.yada_command.return_value = True
+
+        # Act
+        result = CliRunner().invoke(run, ["--output", "jsonl", "list", "containers"])
+
+        # Assert
+        self.assertEqual(result.exit_code, 0)
+        mock_connect.assert_not_called()
+        self.assertEqual(mock_yada_cli.call_args.kwargs["output"], "jsonl")
+        mock_yada_cli.return_value.yada_command.assert_called_once_with(
+            "list containers"
+        )
+
+    def test_json_output_needs_a_command(self):
+        # Act
+        result = CliRunner().invoke(run, ["--output", "json"])
+
+        # Assert
+        self.assertEqual(result.exit_code, 2)
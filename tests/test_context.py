@@ -0,0 +1,77 @@
+import unittest
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from yada.context import ContextWindow
+
+
+def _count_one(message) -> int:
+    return 1
+
+
+class TestContextWindow(unittest.TestCase):
+    def test_no_budget_keeps_all_messages(self):
+        # Arrange
+        context_window = ContextWindow(None, token_counter=_count_one)
+        messages = [HumanMessage(id=str(i), content="hi") for i in range(5)]
+
+        # Act
+        trimmed = context_window.trim(messages)
+
+        # Assert
+        self.assertEqual(trimmed, messages)
+
+    def test_trims_oldest_messages(self):
+        # Arrange
+        context_window = ContextWindow(3, token_counter=_count_one)
+        messages = [HumanMessage(id=str(i), content=str(i)) for i in range(5)]
+
+        # Act
+        trimmed = context_window.trim(
+            messages, reserved_messages=[HumanMessage(id="system", content="")]
+        )
+
+        # Assert
+        self.assertEqual([m.content for m in trimmed], ["3", "4"])
+
+    def test_keeps_tool_call_pairs_together(self):
+        # Arrange
+        context_window = ContextWindow(3, token_counter=_count_one)
+        messages = [
+            HumanMessage(id="1", content="list images"),
+            AIMessage(
+                id="2",
+                content="",
+                tool_calls=[
+                    {"id": "call0", "name": "list_all_docker_images", "args": {}},
+                    {"id": "call1", "name": "list_all_docker_images", "args": {}},
+                ],
+            ),
+            ToolMessage(id="3", content="images", tool_call_id="call0"),
+            ToolMessage(id="4", content="images", tool_call_id="call1"),
+            AIMessage(id="5", content="Here are your images."),
+        ]
+
+        # Act
+        trimmed = context_window.trim(messages)
+
+        # Assert
+        self.assertEqual([m.id for m in trimmed], ["5"])
+
+    def test_caches_token_counts_by_message_id(self):
+        # Arrange
+        calls = []
+
+        def counter(message) -> int:
+            calls.append(message.id)
+            return 1
+
+        context_window = ContextWindow(100, token_counter=counter)
+        messages = [HumanMessage(id=str(i), content=str(i)) for i in range(3)]
+
+        # Act
+        context_window.trim(messages)
+        context_window.trim(messages + [HumanMessage(id="3", content="3")])
+
+        # Assert
+        self.assertEqual(calls, ["2", "1", "0", "3"])
@@ -0,0 +1,105 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+
+from yada.tools import docker_tools
+
+
+class TestDockerClient(unittest.TestCase):
+    def setUp(self) -> None:
+        docker_tools._close_client()
+        docker_tools._invalidate_listings()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        docker_tools._close_client()
+        docker_tools._invalidate_listings()
+        return super().tearDown()
+
+    @patch("docker.from_env")
+    def test_client_is_reused(self, mock_from_env):
+        # Act
+        first = docker_tools._docker_client()
+        second = docker_tools._docker_client()
+
+        # Assert
+        self.assertIs(first, second)
+        mock_from_env.assert_called_once()
+
+    @patch("yada.tools.docker_tools._HEALTH_CHECK_INTERVAL_SECONDS", -1)
+    @patch("docker.from_env")
+    def test_client_reconnects_when_ping_fails(self, mock_from_env):
+        # Arrange
+        stale, fresh = MagicMock(), MagicMock()
+        stale.ping.side_effect = ConnectionError("daemon restarted")
+        mock_from_env.side_effect = [stale, fresh]
+        docker_tools._docker_client()
+
+        # Act
+        client = docker_tools._docker_client()
+
+        # Assert
+        self.assertIs(client, fresh)
+        stale.close.assert_called_once()
+
+    @patch("docker.from_env")
+    def test_listing_is_cached_until_invalidated(self, mock_from_env):
+        # Arrange
+        client = mock_from_env.return_value
+        client.containers.list.return_value = ["container"]
+        container = client.containers.get.return_value
+
+        # Act
+        docker_tools.list_all_running_docker_containers.invoke({})
+        docker_tools.list_all_running_docker_containers.invoke({})
+        docker_tools.stop_docker_container.invoke({"container_id": "abc"})
+        result = docker_tools.list_all_running_docker_containers.invoke({})
+
+        # Assert
+        self.assertEqual(result, "container")
+        container.stop.assert_called_once()
+        self.assertEqual(client.containers.list.call_count, 2)
+
+
+class TestDockerLogs(unittest.TestCase):
+    def setUp(self) -> None:
+        docker_tools._close_client()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        docker_tools._close_client()
+        return super().tearDown()
+
+    @patch("docker.from_env")
+    def test_filters_and_stops_early(self, mock_from_env):
+        # Arrange
+        container = mock_from_env.return_value.containers.get.return_value
+        logs = MagicMock()
+        logs.__iter__.return_value = iter(
+            [b"ok\nERROR one\nok\nerr", b"or two\nERROR three\n"]
+        )
+        container.logs.return_value = logs
+
+        # Act
+        result = docker_tools.docker_logs.invoke(
+            {"container_id": "abc", "tail": 50, "grep": "error", "max_lines": 2}
+        )
+
+        # Assert
+        self.assertEqual(result, "ERROR one\nerror two\n[stopped after 2 lines]\n")
+        container.logs.assert_called_once_with(
+            stream=True, follow=False, tail=50, since=None, until=None
+        )
+        logs.close.assert_called_once()
+
+    def test_parse_log_time(self):
+        # Act
+        relative = docker_tools._parse_log_time("15m")
+        unix = docker_tools._parse_log_time("1700000000")
+        iso = docker_tools._parse_log_time("2024-01-02T03:04:05Z")
+
+        # Assert
+        age = datetime.datetime.now() - relative
+        self.assertAlmostEqual(age.total_seconds(), 15 * 60, delta=5)
+        self.assertEqual(unix, 1700000000.0)
+        self.assertEqual(iso.timestamp(), 1704164645)
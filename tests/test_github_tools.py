@@ -0,0 +1,199 @@
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from yada.tools import github_tools
+
+
+def git(*args: str, cwd: str = None) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+class TestCloneGithubRepository(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # a bare repository with three commits on main and one on a feature
+        # branch, served over file:// so shallow and partial clones apply
+        cls.directory = tempfile.mkdtemp()
+        work = os.path.join(cls.directory, "work")
+        os.makedirs(os.path.join(work, "docs"))
+        os.makedirs(os.path.join(work, "src"))
+        git("init", "-q", "-b", "main", work)
+        git("config", "user.email", "test@example.com", cwd=work)
+        git("config", "user.name", "Test", cwd=work)
+        for n in range(3):
+            for directory in ["docs", "src"]:
+                with open(os.path.join(work, directory, f"{n}.txt"), "w") as f:
+                    f.write(f"{directory} {n}\n")
+            git("add", ".", cwd=work)
+            git("commit", "-q", "-m", f"commit {n}", cwd=work)
+        git("checkout", "-q", "-b", "feature", cwd=work)
+        git("commit", "-q", "--allow-empty", "-m", "feature", cwd=work)
+
+        bare = os.path.join(cls.directory, "remote.git")
+        git("clone", "-q", "--bare", work, bare)
+        git("config", "uploadpack.allowFilter", "true", cwd=bare)
+        cls.url = f"file://{bare}"
+
+    def setUp(self) -> None:
+        self.target = os.path.join(tempfile.mkdtemp(), "clone")
+        self.progress = bytearray()
+        echo = patch(
+            "yada.tools.github_tools.terminal_echo",
+            return_value=self.progress.extend,
+        )
+        echo.start()
+        self.addCleanup(echo.stop)
+
+    def _clone(self, **args) -> str:
+        return github_tools.clone_github_repository_by_git_url.invoke(
+            {"git_url": self.url, "to_path": self.target, **args}
+        )
+
+    def test_full_clone(self):
+        # Act
+        result = self._clone()
+
+        # Assert
+        self.assertRegex(
+            result, r"^Cloned the main branch of the repository to .* in [\d.]+s\.$"
+        )
+        self.assertEqual(git("rev-list", "--count", "HEAD", cwd=self.target), "3")
+        self.assertIn("origin/feature", git("branch", "-r", cwd=self.target))
+        self.assertIn(b"Receiving objects", bytes(self.progress))
+
+    def test_shallow_single_branch_clone(self):
+        # Act
+        self._clone(depth=1, single_branch=True)
+
+        # Assert
+        self.assertEqual(git("rev-list", "--count", "HEAD", cwd=self.target), "1")
+        self.assertNotIn("origin/feature", git("branch", "-r", cwd=self.target))
+
+    def test_partial_clone(self):
+        # Act
+        self._clone(filter="blob:none")
+
+        # Assert
+        self.assertEqual(
+            git("config", "remote.origin.partialclonefilter", cwd=self.target),
+            "blob:none",
+        )
+        with open(os.path.join(self.target, "src", "2.txt")) as f:
+            self.assertEqual(f.read(), "src 2\n")
+
+    def test_sparse_clone(self):
+        # Act
+        result = self._clone(sparse_paths=["docs"])
+
+        # Assert
+        self.assertIn("checking out only docs", result)
+        self.assertTrue(os.path.isfile(os.path.join(self.target, "docs", "0.txt")))
+        self.assertFalse(os.path.exists(os.path.join(self.target, "src")))
+
+    def test_reference_cache_is_reused(self):
+        # Arrange
+        cache_dir = tempfile.mkdtemp()
+        second = os.path.join(tempfile.mkdtemp(), "clone")
+
+        # Act
+        with patch("yada.tools.github_tools.YADA_GIT_CACHE_DIR", cache_dir):
+            self._clone(reference_cache=True)
+            github_tools.clone_github_repository_by_git_url.invoke(
+                {"git_url": self.url, "to_path": second, "reference_cache": True}
+            )
+
+        # Assert
+        caches = os.listdir(cache_dir)
+        self.assertEqual(len(caches), 1)
+        self.assertTrue(caches[0].startswith("remote-"))
+        cache = os.path.join(cache_dir, caches[0])
+        self.assertEqual(git("config", "gc.auto", cwd=cache), "0")
+        self.assertEqual(git("config", "gc.pruneExpire", cwd=cache), "never")
+        for clone in [self.target, second]:
+            with open(os.path.join(clone, ".git/objects/info/alternates")) as f:
+                self.assertEqual(
+                    f.read().strip(), os.path.join(cache_dir, caches[0], "objects")
+                )
+
+    def test_failed_clone(self):
+        # Act
+        result = self._clone(branch="missing")
+
+        # Assert
+        self.assertTrue(result.startswith("An error occurred: `git clone"), result)
+        self.assertIn("missing", result)
+
+
+class TestRepositoryCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.path = self._repository()
+        github_tools._close_repositories()
+        self.addCleanup(github_tools._close_repositories)
+
+    def _repository(self) -> str:
+        path = tempfile.mkdtemp()
+        git("init", "-q", "-b", "main", path)
+        git("config", "user.email", "test@example.com", cwd=path)
+        git("config", "user.name", "Test", cwd=path)
+        git("commit", "-q", "--allow-empty", "-m", "initial", cwd=path)
+        return path
+
+    def _cached(self, path: str):
+        return github_tools._repositories[os.path.realpath(path)].repo
+
+    def _checkout(self, branch: str, path: str = None) -> str:
+        return github_tools.checkout_github_repository_branch.invoke(
+            {"branch": branch, "repository_path": path or self.path}
+        )
+
+    def test_repository_is_reused(self):
+        # Arrange
+        self._checkout("feature")
+        repo = self._cached(self.path)
+
+        # Act
+        result = self._checkout("main")
+        deleted = github_tools.delete_local_github_repository_branch.invoke(
+            {"branch": "feature", "repository_path": self.path}
+        )
+
+        # Assert
+        self.assertEqual(result, "Checked out existing main branch.")
+        self.assertEqual(deleted, "Deleted local branch feature.")
+        self.assertIs(self._cached(self.path), repo)
+        self.assertEqual(git("branch", "--show-current", cwd=self.path), "main")
+
+    def test_head_changed_outside_reopens_the_repository(self):
+        # Arrange
+        self._checkout("feature")
+        repo = self._cached(self.path)
+
+        # Act
+        git("checkout", "-q", "main", cwd=self.path)
+        result = self._checkout("feature")
+
+        # Assert
+        self.assertEqual(result, "Checked out existing feature branch.")
+        self.assertIsNot(self._cached(self.path), repo)
+
+    def test_least_recently_used_repository_is_closed(self):
+        # Arrange
+        other = self._repository()
+        self._checkout("feature")
+        repo = self._cached(self.path)
+
+        # Act
+        with patch.object(github_tools, "_MAX_CACHED_REPOSITORIES", 1), patch.object(
+            type(repo), "close", autospec=True
+        ) as close:
+            self._checkout("feature", path=other)
+
+        # Assert
+        # Repo.__del__ closes too, so repositories collected meanwhile may show up
+        close.assert_any_call(repo)
+        self.assertEqual(list(github_tools._repositories), [os.path.realpath(other)])
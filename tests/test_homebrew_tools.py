@@ -0,0 +1,312 @@
+import os
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from yada.tools import homebrew_tools
+
+# a stand-in for brew that keeps its packages in $BREW_STATE, logs every call
+# and fails if two calls overlap, like brew's own lock
+FAKE_BREW = """#!{python}
+import json, os, sys, time
+
+ALIASES = {{"python": "python@3.12", "hashicorp/tap/terraform": "terraform"}}
+UNKNOWN = {{"missing"}}
+BROKEN = {{"broken"}}
+
+state_path = os.environ["BREW_STATE"]
+no_update = "no-update " if os.environ.get("HOMEBREW_NO_AUTO_UPDATE") else ""
+with open(os.environ["BREW_LOG"], "a") as log:
+    log.write(no_update + " ".join(sys.argv[1:]) + "\\n")
+try:
+    os.mkdir(state_path + ".lock")
+except FileExistsError:
+    print("locked", file=sys.stderr)
+    sys.exit(9)
+
+
+def load():
+    with open(state_path) as f:
+        return dict(line.split(" ", 1) for line in f.read().splitlines() if line)
+
+
+def save(packages):
+    with open(state_path, "w") as f:
+        f.writelines(f"{{name}} {{versions}}\\n" for name, versions in packages.items())
+
+
+def unknown(name):
+    print(f'Error: No available formula with the name "{{name}}".', file=sys.stderr)
+
+
+status = 0
+command, args = sys.argv[1], sys.argv[2:]
+try:
+    if command == "list":
+        print("Warning: fake brew is outdated", file=sys.stderr)
+        sys.stdout.write(open(state_path).read())
+    elif command == "info":
+        names = args[1:]
+        for name in names:
+            if name in UNKNOWN:
+                unknown(name)
+                sys.exit(1)
+        formulae = [
+            {{
+                "name": ALIASES.get(name, name),
+                "full_name": name if "/" in name else ALIASES.get(name, name),
+                "aliases": [name] if name == "python" else [],
+                "oldnames": [],
+            }}
+            for name in names
+        ]
+        print(json.dumps({{"formulae": formulae, "casks": []}}))
+    elif command == "install":
+        time.sleep(0.2)
+        packages = load()
+        for name in args:
+            canonical = ALIASES.get(name, name)
+            if name in UNKNOWN:
+                unknown(name)
+                status = 1
+            elif name in BROKEN:
+                print(f"Error: {{name}}: failed to build", file=sys.stderr)
+                status = 1
+            elif canonical in packages:
+                print(f"Warning: {{canonical}} is already installed")
+            else:
+                packages[canonical] = "1.0"
+        save(packages)
+    elif command == "uninstall":
+        packages = load()
+        for name in args:
+            if packages.pop(ALIASES.get(name, name), None) is None:
+                print(f"Error: No such keg: /opt/homebrew/Cellar/{{name}}", file=sys.stderr)
+                status = 1
+        save(packages)
+    elif command == "doctor":
+        print("Warning: fake brew")
+        status = 1
+finally:
+    os.rmdir(state_path + ".lock")
+sys.exit(status)
+""".format(python=sys.executable)
+
+
+class TestHomebrewTools(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.mkdtemp()
+        brew = os.path.join(directory, "brew")
+        with open(brew, "w") as f:
+            f.write(FAKE_BREW)
+        os.chmod(brew, os.stat(brew).st_mode | stat.S_IEXEC)
+
+        self.log = os.path.join(directory, "log")
+        self.state = state = os.path.join(directory, "state")
+        with open(state, "w") as f:
+            f.write("git 2.47.0\n")
+
+        env = patch.dict(
+            os.environ,
+            {
+                "PATH": f"{directory}:{os.environ['PATH']}",
+                "BREW_LOG": self.log,
+                "BREW_STATE": state,
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        echo = patch("yada.tools.homebrew_tools.terminal_echo", return_value=None)
+        echo.start()
+        self.addCleanup(echo.stop)
+        homebrew_tools._installed_packages = None
+        homebrew_tools._auto_updated = False
+
+    def _calls(self) -> list[str]:
+        with open(self.log) as f:
+            return f.read().splitlines()
+
+    def test_list_is_cached(self):
+        # Act
+        first = homebrew_tools.list_homebrew_packages.invoke({})
+        second = homebrew_tools.list_homebrew_packages.invoke({})
+
+        # Assert
+        self.assertEqual(first, "git 2.47.0")
+        self.assertEqual(second, first)
+        self.assertEqual(self._calls(), ["list --versions"])
+
+    def test_list_keeps_every_package(self):
+        # Arrange
+        with open(self.state, "a") as f:
+            f.write("\n")
+            for n in range(2000):
+                f.write(f"package-{n} 1.{n} 1.{n + 1}\n")
+
+        # Act
+        packages = homebrew_tools._installed_package_versions()
+
+        # Assert
+        self.assertEqual(len(packages), 2001)
+        self.assertEqual(packages["package-1999"], ["1.1999", "1.2000"])
+        self.assertNotIn("Warning:", packages)
+
+    def test_install_refreshes_the_list(self):
+        # Arrange
+        homebrew_tools.list_homebrew_packages.invoke({})
+
+        # Act
+        result = homebrew_tools.install_homebrew_package.invoke({"package": "jq"})
+        packages = homebrew_tools.list_homebrew_packages.invoke({})
+
+        # Assert
+        self.assertTrue(result.startswith("Installed Homebrew package: jq in "))
+        self.assertEqual(packages, "git 2.47.0\njq 1.0")
+        self.assertEqual(
+            self._calls(), ["list --versions", "install jq", "list --versions"]
+        )
+
+    def test_install_packages_uses_one_brew_call(self):
+        # Act
+        result = homebrew_tools.install_homebrew_packages.invoke(
+            {"packages": ["jq", "ripgrep", "fd"]}
+        )
+
+        # Assert
+        lines = result.splitlines()
+        self.assertRegex(lines[0], r"^brew install of 3 packages took \d+\.\ds:$")
+        self.assertEqual(
+            lines[1:],
+            ["jq: installed 1.0", "ripgrep: installed 1.0", "fd: installed 1.0"],
+        )
+        self.assertEqual(
+            self._calls(),
+            [
+                "install jq ripgrep fd",
+                "list --versions",
+                "info --json=v2 jq ripgrep fd",
+            ],
+        )
+
+    def test_install_packages_reports_each_package(self):
+        # Act
+        result = homebrew_tools.install_homebrew_packages.invoke(
+            {"packages": ["jq", "missing"]}
+        )
+
+        # Assert
+        self.assertIn("jq: installed 1.0", result)
+        self.assertIn(
+            'missing: failed: No available formula with the name "missing".', result
+        )
+        self.assertIn(
+            "An error occurred: `brew install jq missing` exited with code 1", result
+        )
+        self.assertIn("No available formula with the name", result)
+
+    def test_install_packages_resolves_aliases_and_taps(self):
+        # Act
+        result = homebrew_tools.install_homebrew_packages.invoke(
+            {"packages": ["python", "hashicorp/tap/terraform"]}
+        )
+
+        # Assert
+        self.assertEqual(
+            result.splitlines()[1:],
+            [
+                "python: installed as python@3.12 1.0",
+                "hashicorp/tap/terraform: installed as terraform 1.0",
+            ],
+        )
+
+    def test_install_packages_reports_failure_of_installed_package(self):
+        # Arrange
+        with open(self.state, "a") as f:
+            f.write("broken 0.9\n")
+
+        # Act
+        result = homebrew_tools.install_homebrew_packages.invoke(
+            {"packages": ["broken", "jq"]}
+        )
+
+        # Assert
+        self.assertEqual(
+            result.splitlines()[1:3],
+            ["broken: failed: broken: failed to build", "jq: installed 1.0"],
+        )
+
+    def test_failed_first_install_keeps_auto_update(self):
+        # Act
+        homebrew_tools.install_homebrew_packages.invoke({"packages": ["missing"]})
+        homebrew_tools.install_homebrew_package.invoke({"package": "jq"})
+
+        # Assert
+        installs = [call for call in self._calls() if "install" in call]
+        self.assertEqual(installs, ["install missing", "install jq"])
+
+    def test_later_installs_skip_auto_update(self):
+        # Act
+        homebrew_tools.install_homebrew_packages.invoke({"packages": ["jq"]})
+        homebrew_tools.install_homebrew_package.invoke({"package": "fd"})
+
+        # Assert
+        installs = [call for call in self._calls() if "install" in call]
+        self.assertEqual(installs, ["install jq", "no-update install fd"])
+
+    def test_uninstall_packages(self):
+        # Arrange
+        homebrew_tools.install_homebrew_packages.invoke({"packages": ["jq", "fd"]})
+
+        # Act
+        result = homebrew_tools.uninstall_homebrew_packages.invoke(
+            {"packages": ["jq", "git"]}
+        )
+
+        # Assert
+        self.assertEqual(
+            result.splitlines()[1:], ["jq: uninstalled", "git: uninstalled"]
+        )
+        self.assertEqual(homebrew_tools.list_homebrew_packages.invoke({}), "fd 1.0")
+
+    def test_concurrent_installs_run_one_at_a_time(self):
+        # Arrange
+        results = []
+
+        def install(package):
+            results.append(
+                homebrew_tools.install_homebrew_package.invoke({"package": package})
+            )
+
+        threads = [threading.Thread(target=install, args=(p,)) for p in "abc"]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual(len(results), 3)
+        for result in results:
+            self.assertTrue(result.startswith("Installed"), result)
+
+    def test_failed_command_reports_exit_code_and_output(self):
+        # Arrange
+        # no brew on the PATH
+        os.environ["PATH"] = os.environ["PATH"].split(":", 1)[1]
+
+        # Act
+        result = homebrew_tools.uninstall_homebrew_package.invoke({"package": "jq"})
+
+        # Assert
+        self.assertTrue(result.startswith("An error occurred: "), result)
+
+    def test_doctor_returns_warnings(self):
+        # Act
+        result = homebrew_tools.homebrew_doctor.invoke({})
+
+        # Assert
+        self.assertIn("Warning: fake brew", result)
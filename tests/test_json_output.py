@@ -0,0 +1,87 @@
+import io
+import json
+import unittest
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from tests.test_batch import EchoModel, wipe
+from yada.agent import YadaAgent
+from yada.json_output import JsonOutput
+
+
+def _agent() -> YadaAgent:
+    return YadaAgent(
+        model=EchoModel(),
+        safe_tools=[],
+        sensitive_tools=[wipe],
+        checkpointer=MemorySaver(),
+    )
+
+
+def _run(command: str, output_format: str = "jsonl", answer: str = "y"):
+    output = io.StringIO()
+    json_output = JsonOutput(
+        _agent(), output, output_format=output_format, confirm=lambda _: answer
+    )
+    ok = json_output.run(command, {"configurable": {"thread_id": "t1"}})
+    return ok, output.getvalue()
+
+
+class TestJsonOutput(unittest.TestCase):
+    def test_jsonl_streams_one_event_per_line(self):
+        # Act
+        ok, output = _run("hello")
+
+        # Assert
+        events = [json.loads(line) for line in output.splitlines()]
+        self.assertTrue(ok)
+        self.assertEqual([e["type"] for e in events], ["start", "message", "done"])
+        self.assertEqual(events[1]["content"], "echo: hello")
+        self.assertEqual(events[-1]["response"], "echo: hello")
+        self.assertEqual(events[-1]["thread_id"], "t1")
+        self.assertIn("elapsed_seconds", events[1])
+        self.assertIn("duration_seconds", events[1])
+
+    def test_json_writes_one_document(self):
+        # Act
+        _, output = _run("hello", output_format="json")
+
+        # Assert
+        events = json.loads(output)["events"]
+        self.assertEqual([e["type"] for e in events], ["start", "message", "done"])
+
+    def test_approved_sensitive_tool_call(self):
+        # Act
+        _, output = _run("wipe it", answer="y")
+
+        # Assert
+        events = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(
+            [e["type"] for e in events],
+            [
+                "start",
+                "message",
+                "tool_call",
+                "confirm",
+                "confirmed",
+                "tool_result",
+                "message",
+                "done",
+            ],
+        )
+        self.assertEqual(events[2]["name"], "wipe")
+        self.assertTrue(events[2]["sensitive"])
+        self.assertEqual(events[5]["content"], "wiped")
+        self.assertEqual(events[-1]["response"], "tool said: wiped")
+
+    def test_denied_sensitive_tool_call(self):
+        # Act
+        _, output = _run("wipe it", answer="n")
+
+        # Assert
+        events = [json.loads(line) for line in output.splitlines()]
+        self.assertFalse(events[4]["approved"])
+        self.assertNotIn("tool_result", [e["type"] for e in events])
+        self.assertTrue(
+            events[-1]["response"].startswith("tool said: Tool call denied")
+        )
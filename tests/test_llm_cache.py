@@ -0,0 +1,206 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+from langchain_core.runnables import RunnableLambda
+
+from yada.llm_cache import YadaLLMCache
+
+
+def _prompt(*messages) -> str:
+    return dumps(list(messages))
+
+
+def _generations(content: str) -> list[ChatGeneration]:
+    return [ChatGeneration(message=AIMessage(id="cached", content=content))]
+
+
+def _in_thread(thread_id: str, func):
+    # the cache reads the thread from the config of the runnable it runs in
+    return RunnableLambda(lambda _: func()).invoke(
+        None, {"configurable": {"thread_id": thread_id}}
+    )
+
+
+class TestYadaLLMCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "llm_cache.sqlite")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def test_lookup_ignores_ids_and_whitespace(self):
+        # Arrange
+        cache = YadaLLMCache(self.path)
+        cache.update(
+            _prompt(HumanMessage(id="a", content="hello")), "llm", _generations("hi")
+        )
+
+        # Act
+        result = cache.lookup(_prompt(HumanMessage(id="b", content="hello \n")), "llm")
+
+        # Assert
+        self.assertEqual(result[0].message.content, "hi")
+        self.assertIsNone(result[0].message.id)
+        self.assertEqual(cache.stats(), "1 hits, 0 misses, 0 bypassed")
+
+    def test_lookup_misses_for_other_llm_string(self):
+        # Arrange
+        cache = YadaLLMCache(self.path)
+        prompt = _prompt(HumanMessage(content="hello"))
+        cache.update(prompt, "llm", _generations("hi"))
+
+        # Act
+        result = cache.lookup(prompt, "other llm")
+
+        # Assert
+        self.assertIsNone(result)
+        self.assertEqual(cache.misses, 1)
+
+    def test_lookup_reads_from_disk(self):
+        # Arrange
+        prompt = _prompt(HumanMessage(content="hello"))
+        YadaLLMCache(self.path).update(prompt, "llm", _generations("hi"))
+
+        # Act
+        result = YadaLLMCache(self.path).lookup(prompt, "llm")
+
+        # Assert
+        self.assertEqual(result[0].message.content, "hi")
+
+    def test_sensitive_tool_calls_bypass_cache(self):
+        # Arrange
+        cache = YadaLLMCache(self.path, sensitive_tool_names=["execute_shell_command"])
+        prompt = _prompt(
+            HumanMessage(content="list files"),
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {"id": "1", "name": "execute_shell_command", "args": {"c": "ls"}}
+                ],
+            ),
+        )
+
+        # Act
+        cache.update(prompt, "llm", _generations("done"))
+        result = cache.lookup(prompt, "llm")
+
+        # Assert
+        self.assertIsNone(result)
+        self.assertEqual(cache.stats(), "0 hits, 0 misses, 1 bypassed")
+
+    def test_thread_bypasses_cache_after_sensitive_call(self):
+        # Arrange
+        cache = YadaLLMCache(self.path, sensitive_tool_names=["execute_shell_command"])
+        sensitive_prompt = _prompt(
+            HumanMessage(content="remove the files"),
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {"id": "1", "name": "execute_shell_command", "args": {"c": "rm"}}
+                ],
+            ),
+        )
+        # the same thread later, with the tool call trimmed from the context
+        trimmed_prompt = _prompt(HumanMessage(content="list files"))
+        cache.update(trimmed_prompt, "llm", _generations("files"))
+
+        # Act
+        _in_thread("t1", lambda: cache.lookup(sensitive_prompt, "llm"))
+        results = [
+            _in_thread("t1", lambda: cache.lookup(trimmed_prompt, "llm")),
+            _in_thread(
+                "t1", lambda: YadaLLMCache(self.path).lookup(trimmed_prompt, "llm")
+            ),
+            _in_thread("t2", lambda: cache.lookup(trimmed_prompt, "llm")),
+        ]
+
+        # Assert
+        self.assertIsNone(results[0])
+        self.assertIsNone(results[1])
+        self.assertEqual(results[2][0].message.content, "files")
+
+    def test_cached_tool_calls_get_fresh_ids(self):
+        # Arrange
+        cache = YadaLLMCache(self.path)
+        prompt = _prompt(HumanMessage(content="list files"))
+        message = AIMessage(
+            content="",
+            tool_calls=[{"id": "call_1", "name": "list_files", "args": {}}],
+            additional_kwargs={
+                "tool_calls": [
+                    {
+                        "id": "call_1",
+                        "type": "function",
+                        "function": {"name": "list_files", "arguments": "{}"},
+                    }
+                ]
+            },
+        )
+        cache.update(prompt, "llm", [ChatGeneration(message=message)])
+
+        # Act
+        first = cache.lookup(prompt, "llm")[0].message
+        second = cache.lookup(prompt, "llm")[0].message
+
+        # Assert
+        ids = [first.tool_calls[0]["id"], second.tool_calls[0]["id"], "call_1"]
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(
+            first.additional_kwargs["tool_calls"][0]["id"], first.tool_calls[0]["id"]
+        )
+
+    def test_expired_entries_miss(self):
+        # Arrange
+        cache = YadaLLMCache(self.path, ttl_seconds=60)
+        prompt = _prompt(HumanMessage(content="hello"))
+        cache.update(prompt, "llm", _generations("hi"))
+
+        # Act
+        with patch("yada.llm_cache.time.time", return_value=time.time() + 120):
+            result = cache.lookup(prompt, "llm")
+
+        # Assert
+        self.assertIsNone(result)
+
+    def test_evict_keeps_most_recent_entries(self):
+        # Arrange
+        cache = YadaLLMCache(self.path, max_memory_entries=1, max_disk_entries=2)
+        prompts = [_prompt(HumanMessage(content=str(i))) for i in range(3)]
+        for prompt in prompts:
+            cache.update(prompt, "llm", _generations("hi"))
+            time.sleep(0.01)
+
+        # Act
+        cache.evict()
+
+        # Assert
+        cache._memory.clear()
+        self.assertIsNone(cache.lookup(prompts[0], "llm"))
+        self.assertIsNotNone(cache.lookup(prompts[2], "llm"))
+
+    def test_chat_model_uses_cache(self):
+        # Arrange
+        cache = YadaLLMCache(self.path)
+        model = GenericFakeChatModel(
+            messages=iter([AIMessage(content="first"), AIMessage(content="second")]),
+            cache=cache,
+        )
+
+        # Act
+        first = model.invoke("hello")
+        second = model.invoke("hello")
+
+        # Assert
+        self.assertEqual(first.content, "first")
+        self.assertEqual(second.content, "first")
+        self.assertNotEqual(first.id, second.id)
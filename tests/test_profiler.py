@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import unittest
+
+from langchain.tools import tool
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+
+from yada import profiler
+from yada.agent import YadaAgent
+
+
+class CountingModel(BaseChatModel):
+    """
+    Calls `shout` once, then answers, reporting token usage on every call.
+    """
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        usage = {"input_tokens": 10, "output_tokens": 2, "total_tokens": 12}
+        if isinstance(messages[-1], ToolMessage):
+            message = AIMessage(content="done", usage_metadata=usage)
+        else:
+            message = AIMessage(
+                content="",
+                tool_calls=[{"id": "call0", "name": "shout", "args": {}}],
+                usage_metadata=usage,
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@tool
+def shout() -> str:
+    """
+    Shout.
+    """
+    return "HEY"
+
+
+class TestProfiler(unittest.TestCase):
+    def tearDown(self) -> None:
+        profiler.disable()
+
+    def test_span_is_a_no_op_when_disabled(self):
+        # Act
+        with profiler.span("tool", "shout") as span:
+            span["output_bytes"] = 3
+
+        # Assert
+        self.assertIsNone(profiler._profiler)
+
+    def test_agent_turn_records_model_and_tool_spans(self):
+        # Arrange
+        session_profiler = profiler.enable()
+        agent = YadaAgent(
+            model=CountingModel(),
+            safe_tools=[shout],
+            sensitive_tools=[],
+            checkpointer=MemorySaver(),
+        )
+
+        # Act
+        agent.invoke({"messages": ["hi"]}, {"configurable": {"thread_id": "1"}})
+
+        # Assert
+        rows = {(r["category"], r["name"]): r for r in session_profiler.summary()}
+        model_row = rows[("model", "call_model")]
+        self.assertEqual(model_row["count"], 2)
+        self.assertEqual(model_row["prompt_tokens"], 20)
+        self.assertEqual(model_row["completion_tokens"], 4)
+        self.assertEqual(rows[("tool", "shout")]["output_bytes"], 3)
+
+    def test_chrome_trace(self):
+        # Arrange
+        session_profiler = profiler.enable()
+        with profiler.span("render", "handle_event"):
+            pass
+        path = os.path.join(tempfile.mkdtemp(), "trace.json")
+
+        # Act
+        session_profiler.write_chrome_trace(path)
+
+        # Assert
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["cat"], "render")
+        self.assertEqual(events[0]["name"], "handle_event")
+        self.assertGreaterEqual(events[0]["dur"], 0)
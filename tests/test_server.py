@@ -0,0 +1,218 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from langchain.tools import tool
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+
+from tests.test_batch import EchoModel, wipe
+from yada import client
+from yada.agent import YadaAgent
+from yada.server import YadaServer
+from yada.tools.filesystem_tools import change_directory, current_directory
+
+
+class DirectoryModel(BaseChatModel):
+    """
+    Answers "where" with `current_directory`, "cd <dir>" with
+    `change_directory` and "env" with `read_client_env`, then repeats the
+    tool result.
+    """
+
+    @property
+    def _llm_type(self) -> str:
+        return "directory"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            message = AIMessage(content=last.content)
+        else:
+            name, args = {
+                "where": ("current_directory", {}),
+                "env": ("read_client_env", {}),
+            }.get(last.content, ("change_directory", {"directory": last.content[3:]}))
+            message = AIMessage(
+                content="", tool_calls=[{"id": "call0", "name": name, "args": args}]
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+@tool
+def read_client_env() -> str:
+    """
+    Read YADA_TEST_CLIENT.
+    """
+    return os.environ.get("YADA_TEST_CLIENT", "unset")
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.socket_path = os.path.join(tempfile.mkdtemp(), "yada.sock")
+        yada_cli = MagicMock()
+        yada_cli.agent = YadaAgent(
+            model=EchoModel(),
+            safe_tools=[],
+            sensitive_tools=[wipe],
+            checkpointer=MemorySaver(),
+        )
+        yada_cli._start_tool_watcher.return_value = None
+        yada_cli._turn_lock = threading.Lock()
+        with patch("yada.server.YadaCli", return_value=yada_cli):
+            self.server = YadaServer(self.socket_path)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _run(self, command: str, thread_id: str = None) -> str:
+        sock = client.connect(self.socket_path)
+        return client.run_command(sock, command, thread_id=thread_id)
+
+    @patch("yada.client.utils")
+    def test_command_round_trip(self, mock_utils):
+        # Act
+        thread_id = self._run("hello")
+
+        # Assert
+        self.assertTrue(thread_id)
+        mock_utils.agent_response.assert_called_once_with("echo: hello")
+
+    @patch("yada.client.utils")
+    def test_thread_is_kept_between_commands(self, mock_utils):
+        # Act
+        thread_id = self._run("hello", thread_id="t1")
+        self._run("again", thread_id=thread_id)
+
+        # Assert
+        config = {"configurable": {"thread_id": "t1"}}
+        messages = self.server.agent.get_state(config).values["messages"]
+        self.assertEqual(len(messages), 4)
+        self.assertEqual(mock_utils.agent_response.call_count, 2)
+
+    @patch("yada.client.utils")
+    def test_sensitive_tool_call_is_confirmed_by_the_client(self, mock_utils):
+        # Arrange
+        mock_utils.user_input.return_value = "y"
+
+        # Act
+        self._run("wipe it")
+
+        # Assert
+        mock_utils.tool_calls_message.assert_called_once()
+        mock_utils.agent_response.assert_called_with("tool said: wiped")
+
+    @patch("yada.client.utils")
+    def test_turn_does_not_load_thread_state(self, mock_utils):
+        # Arrange
+        mock_utils.user_input.return_value = "y"
+        self._run("hello", thread_id="t1")
+
+        # Act
+        with patch.object(self.server.agent, "get_state") as mock_get_state:
+            self._run("wipe it", thread_id="t1")
+
+        # Assert
+        mock_get_state.assert_not_called()
+        mock_utils.tool_calls_message.assert_called_once()
+        mock_utils.agent_response.assert_called_with("tool said: wiped")
+        self.assertEqual(mock_utils.agent_response.call_count, 3)
+
+    @patch("yada.client.utils")
+    def test_denied_sensitive_tool_call(self, mock_utils):
+        # Arrange
+        mock_utils.user_input.return_value = "n"
+
+        # Act
+        self._run("wipe it")
+
+        # Assert
+        response = mock_utils.agent_response.call_args.args[0]
+        self.assertTrue(response.startswith("tool said: "))
+        self.assertNotEqual(response, "tool said: wiped")
+
+    def test_connect_without_daemon(self):
+        # Act / Assert
+        self.assertIsNone(client.connect(self.socket_path + ".missing"))
+
+    def test_second_server_on_the_same_socket_is_refused(self):
+        # Act / Assert
+        with self.assertRaises(RuntimeError):
+            YadaServer(self.socket_path)
+
+    def test_server_close_removes_socket(self):
+        # Act
+        self.server.shutdown()
+        self.server.server_close()
+
+        # Assert
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+class TestServerClientContext(unittest.TestCase):
+    def setUp(self) -> None:
+        self.socket_path = os.path.join(tempfile.mkdtemp(), "yada.sock")
+        yada_cli = MagicMock()
+        yada_cli.agent = YadaAgent(
+            model=DirectoryModel(),
+            safe_tools=[current_directory, change_directory, read_client_env],
+            sensitive_tools=[],
+            checkpointer=MemorySaver(),
+        )
+        yada_cli._start_tool_watcher.return_value = None
+        yada_cli._turn_lock = threading.Lock()
+        with patch("yada.server.YadaCli", return_value=yada_cli):
+            self.server = YadaServer(self.socket_path)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    @patch("yada.client.utils")
+    def _run(self, command: str, mock_utils, **kwargs) -> str:
+        sock = client.connect(self.socket_path)
+        client.run_command(sock, command, **kwargs)
+        return mock_utils.agent_response.call_args.args[0]
+
+    def test_tools_run_in_the_client_directory(self):
+        # Arrange
+        client_dir = os.path.realpath(tempfile.mkdtemp())
+        daemon_dir = os.getcwd()
+
+        # Act
+        response = self._run("where", cwd=client_dir)
+
+        # Assert
+        self.assertEqual(response, client_dir)
+        self.assertEqual(os.getcwd(), daemon_dir)
+
+    def test_change_directory_does_not_move_other_clients(self):
+        # Arrange
+        first_dir = os.path.realpath(tempfile.mkdtemp())
+        os.mkdir(os.path.join(first_dir, "sub"))
+        second_dir = os.path.realpath(tempfile.mkdtemp())
+
+        # Act
+        self._run("cd sub", cwd=first_dir)
+        response = self._run("where", cwd=second_dir)
+
+        # Assert
+        self.assertEqual(response, second_dir)
+
+    def test_tools_see_the_client_environment(self):
+        # Act
+        response = self._run("env", env={**os.environ, "YADA_TEST_CLIENT": "yes"})
+
+        # Assert
+        self.assertEqual(response, "yes")
+        self.assertNotIn("YADA_TEST_CLIENT", os.environ)
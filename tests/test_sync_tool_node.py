@@ -0,0 +1,150 @@
+import threading
+import time
+import unittest
+
+from langchain.tools import tool
+from langchain_core.messages import AIMessage
+
+from yada.sync_tool_node import SyncToolNode
+from yada.tools import sequential_tool
+
+
+@tool
+def slow_tool(value: str) -> str:
+    """
+    Return the value after a short delay.
+
+    Args:
+        value (str): The value to return.
+    """
+    time.sleep(0.2)
+    return value
+
+
+@tool
+def fast_tool(value: str) -> str:
+    """
+    Return the value immediately.
+
+    Args:
+        value (str): The value to return.
+    """
+    return value
+
+
+_release_hung_tool = threading.Event()
+
+
+@tool
+def hung_tool(value: str) -> str:
+    """
+    Hang until the test releases it.
+
+    Args:
+        value (str): The value to return.
+    """
+    _release_hung_tool.wait(timeout=10)
+    return value
+
+
+@sequential_tool
+@tool
+def state_tool(value: str) -> str:
+    """
+    Pretend to change process state.
+
+    Args:
+        value (str): The value to return.
+    """
+    return value
+
+
+def _tool_calls_message(*calls: tuple[str, str]) -> AIMessage:
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {"id": f"call{idx}", "name": name, "args": {"value": value}}
+            for idx, (name, value) in enumerate(calls)
+        ],
+    )
+
+
+class TestSyncToolNode(unittest.TestCase):
+    def test_sequential_by_default(self):
+        # Arrange
+        node = SyncToolNode([slow_tool, fast_tool], all_tools=[])
+        message = _tool_calls_message(("slow_tool", "a"), ("fast_tool", "b"))
+
+        # Act
+        result = node.invoke({"messages": [message]})
+
+        # Assert
+        self.assertEqual([m.content for m in result["messages"]], ["a", "b"])
+
+    def test_concurrent_preserves_order(self):
+        # Arrange
+        node = SyncToolNode([slow_tool, fast_tool], all_tools=[], max_workers=4)
+        message = _tool_calls_message(
+            ("slow_tool", "a"), ("slow_tool", "b"), ("fast_tool", "c")
+        )
+
+        # Act
+        start = time.perf_counter()
+        result = node.invoke({"messages": [message]})
+        elapsed = time.perf_counter() - start
+
+        # Assert
+        self.assertEqual([m.content for m in result["messages"]], ["a", "b", "c"])
+        self.assertEqual(
+            [m.tool_call_id for m in result["messages"]], ["call0", "call1", "call2"]
+        )
+        self.assertLess(elapsed, 0.4)
+
+    def test_sequential_tool_is_a_barrier(self):
+        # Arrange
+        node = SyncToolNode([slow_tool, state_tool], all_tools=[], max_workers=4)
+        calls = [("slow_tool", "a"), ("state_tool", "b"), ("slow_tool", "c")]
+
+        # Act
+        batches = node._batch_tool_calls(
+            _tool_calls_message(*calls).tool_calls, [{}, {}, {}]
+        )
+
+        # Assert
+        self.assertEqual(
+            [[tc["args"]["value"] for tc, _ in batch] for batch in batches],
+            [["a"], ["b"], ["c"]],
+        )
+        self.assertTrue(node.is_sequential_tool("state_tool"))
+        self.assertFalse(node.is_sequential_tool("slow_tool"))
+
+    def test_timeout(self):
+        # Arrange
+        node = SyncToolNode([slow_tool, fast_tool], all_tools=[], timeout=0.05)
+        message = _tool_calls_message(("slow_tool", "a"), ("fast_tool", "b"))
+
+        # Act
+        result = node.invoke({"messages": [message]})
+
+        # Assert
+        self.assertIn("timed out", result["messages"][0].content)
+        self.assertEqual(result["messages"][0].tool_call_id, "call0")
+        self.assertEqual(result["messages"][1].content, "b")
+
+    def test_hung_call_does_not_block_later_calls(self):
+        # Arrange
+        node = SyncToolNode([hung_tool, fast_tool], all_tools=[], timeout=0.2)
+        message = _tool_calls_message(
+            ("hung_tool", "a"), ("fast_tool", "b"), ("fast_tool", "c")
+        )
+        self.addCleanup(_release_hung_tool.set)
+
+        # Act
+        start = time.perf_counter()
+        result = node.invoke({"messages": [message]})
+        elapsed = time.perf_counter() - start
+
+        # Assert
+        self.assertLess(elapsed, 2)
+        self.assertIn("timed out", result["messages"][0].content)
+        self.assertEqual([m.content for m in result["messages"][1:]], ["b", "c"])
@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+import textwrap
+import unittest
+from unittest.mock import patch
+
+from yada import tool_loader, tools
+from yada.tool_loader import LazyTool, ToolLoader
+
+CUSTOM_TOOLS = textwrap.dedent('''
+    from langchain_core.tools import tool
+    from yada.tools import safe_tool, sensitive_tool
+
+
+    @safe_tool
+    @tool
+    def greet(name: str) -> str:
+        """
+        Greet someone.
+
+        Args:
+            name (str): Who to greet.
+        """
+        return "{greeting} " + name
+
+
+    @sensitive_tool
+    @tool
+    def wipe() -> str:
+        """
+        Wipe everything.
+        """
+        return "wiped"
+    ''')
+
+
+class TestToolLoader(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tools_dir = os.path.join(self.tmp_dir.name, "tools")
+        os.mkdir(self.tools_dir)
+        self.index_path = os.path.join(self.tmp_dir.name, "tool_index.json")
+        self._write_tools("hi")
+
+        env = patch.dict(os.environ, {"YADA_CUSTOM_TOOLS_DIR": self.tools_dir})
+        env.start()
+        self.addCleanup(env.stop)
+        tool_loader._custom_modules.clear()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def _write_tools(self, greeting: str) -> None:
+        with open(os.path.join(self.tools_dir, "my_tools.py"), "w") as f:
+            f.write(CUSTOM_TOOLS.replace("{greeting}", greeting))
+
+    def _load(self) -> ToolLoader:
+        loader = ToolLoader(index_path=self.index_path)
+        loader.load()
+        return loader
+
+    def test_load_indexes_custom_tools(self):
+        # Act
+        loader = self._load()
+
+        # Assert
+        safe = {t.name: t for t in loader.safe_tools}
+        sensitive = {t.name: t for t in loader.sensitive_tools}
+        self.assertIsInstance(safe["greet"], LazyTool)
+        self.assertIsInstance(sensitive["wipe"], LazyTool)
+        with open(self.index_path) as f:
+            index = json.load(f)
+        self.assertEqual(
+            list(index["files"]), [os.path.join(self.tools_dir, "my_tools.py")]
+        )
+
+    def test_cached_index_imports_module_on_first_call(self):
+        # Arrange
+        self._load()
+        tool_loader._custom_modules.clear()
+
+        # Act
+        greet = {t.name: t for t in self._load().safe_tools}["greet"]
+        imported_before_call = dict(tool_loader._custom_modules)
+        result = greet.invoke({"name": "bob"})
+
+        # Assert
+        self.assertEqual(imported_before_call, {})
+        self.assertEqual(result, "hi bob")
+        self.assertEqual(len(tool_loader._custom_modules), 1)
+        self.assertEqual(
+            greet.tool_call_schema.model_json_schema()["required"], ["name"]
+        )
+
+    def test_changed_file_is_reindexed(self):
+        # Arrange
+        self._load()
+        self._write_tools("hello")
+        os.utime(os.path.join(self.tools_dir, "my_tools.py"), ns=(0, 0))
+        tool_loader._custom_modules.clear()
+
+        # Act
+        greet = {t.name: t for t in self._load().safe_tools}["greet"]
+
+        # Assert
+        self.assertEqual(greet.invoke({"name": "bob"}), "hello bob")
+
+    def test_reindex(self):
+        # Act
+        count = ToolLoader(index_path=self.index_path).reindex()
+
+        # Assert
+        self.assertEqual(count, 2)
+
+    def test_reload_replaces_only_changed_file(self):
+        # Arrange
+        with open(os.path.join(self.tools_dir, "other_tools.py"), "w") as f:
+            f.write(CUSTOM_TOOLS.replace("greet", "welcome").replace("wipe", "erase"))
+        loader = self._load()
+        welcome = {t.name: t for t in loader.safe_tools}["welcome"]
+        self._write_tools("hello")
+
+        # Act
+        loader.reload([os.path.join(self.tools_dir, "my_tools.py")])
+
+        # Assert
+        safe = {t.name: t for t in loader.safe_tools}
+        self.assertIs(safe["welcome"], welcome)
+        self.assertEqual(safe["greet"].invoke({"name": "bob"}), "hello bob")
+
+    def test_reload_drops_tools_of_deleted_file(self):
+        # Arrange
+        loader = self._load()
+        path = os.path.join(self.tools_dir, "my_tools.py")
+        os.remove(path)
+
+        # Act
+        loader.reload([path])
+
+        # Assert
+        names = [t.name for t in loader.safe_tools + loader.sensitive_tools]
+        self.assertNotIn("greet", names)
+        self.assertNotIn("wipe", names)
+        self.assertNotIn("greet", tools.get_tool_registry())
@@ -0,0 +1,123 @@
+import unittest
+
+from langchain.tools import tool
+from langchain_core.messages import AIMessage, HumanMessage
+
+from yada.tool_selection import ToolSelector, tokenize
+
+
+@tool
+def list_capabilities() -> str:
+    """
+    List the capabilities of the tools available in YADA.
+    """
+    return ""
+
+
+@tool
+def docker_logs(container_id: str) -> str:
+    """
+    Get the logs of a Docker container.
+
+    Args:
+        container_id (str): The ID of the Docker container.
+    """
+    return ""
+
+
+@tool
+def install_homebrew_package(package_name: str) -> str:
+    """
+    Install a Homebrew package.
+
+    Args:
+        package_name (str): The name of the package to install.
+    """
+    return ""
+
+
+@tool
+def create_directory(directory: str) -> str:
+    """
+    Create a directory.
+
+    Args:
+        directory (str): The directory to create.
+    """
+    return ""
+
+
+@tool
+def execute_shell_command(command: str) -> str:
+    """
+    Execute a shell command.
+
+    Args:
+        command (str): The command to execute.
+    """
+    return ""
+
+
+TOOLS = [
+    list_capabilities,
+    docker_logs,
+    install_homebrew_package,
+    create_directory,
+    execute_shell_command,
+]
+
+
+class TestToolSelector(unittest.TestCase):
+    def test_tokenize(self):
+        # Act
+        tokens = tokenize("Show me the logs of my Docker containers")
+
+        # Assert
+        self.assertEqual(tokens, ["show", "log", "docker", "container"])
+
+    def test_select_top_k_and_always_selected_tools(self):
+        # Arrange
+        selector = ToolSelector(TOOLS, top_k=1)
+
+        # Act
+        selected = selector.select([HumanMessage("why did my container crash?")])
+
+        # Assert
+        self.assertEqual(selected, ["list_capabilities", "docker_logs"])
+
+    def test_select_keeps_tools_called_in_thread(self):
+        # Arrange
+        selector = ToolSelector(TOOLS, top_k=1)
+        messages = [
+            HumanMessage("create the dir foo"),
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "id": "1",
+                        "name": "create_directory",
+                        "args": {"directory": "foo"},
+                    }
+                ],
+            ),
+            HumanMessage("now install the jq package with brew"),
+        ]
+
+        # Act
+        selected = selector.select(messages)
+
+        # Assert
+        self.assertEqual(
+            selected,
+            ["list_capabilities", "install_homebrew_package", "create_directory"],
+        )
+
+    def test_select_all_tools_without_matches(self):
+        # Arrange
+        selector = ToolSelector(TOOLS, top_k=1)
+
+        # Act
+        selected = selector.select([HumanMessage("hello there")])
+
+        # Assert
+        self.assertEqual(selected, [t.name for t in TOOLS])
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from yada import tool_watcher
+from yada.tool_watcher import ToolWatcher
+
+
+class TestToolWatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.changes = []
+        self.changed = threading.Event()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def _on_change(self, paths: list[str]) -> None:
+        self.changes.append(paths)
+        self.changed.set()
+
+    def _assert_reports_changed_tool_files(self, watcher: ToolWatcher) -> None:
+        # Act
+        watcher.start()
+        try:
+            path = os.path.join(self.tmp_dir.name, "my_tools.py")
+            with open(os.path.join(self.tmp_dir.name, "helpers.py"), "w") as f:
+                f.write("x = 1")
+            with open(path, "w") as f:
+                f.write("x = 1")
+            changed = self.changed.wait(timeout=5)
+        finally:
+            watcher.stop()
+
+        # Assert
+        self.assertTrue(changed)
+        self.assertEqual(self.changes, [[path]])
+
+    def test_inotify(self):
+        # Arrange
+        watcher = ToolWatcher(self.tmp_dir.name, self._on_change, debounce=0.1)
+        fd = tool_watcher._inotify_watch(self.tmp_dir.name)
+        if fd is None:
+            self.skipTest("inotify is not available")
+        os.close(fd)
+
+        self._assert_reports_changed_tool_files(watcher)
+
+    @patch("yada.tool_watcher._inotify_watch", return_value=None)
+    def test_polling_fallback(self, mock_inotify_watch):
+        # Arrange
+        watcher = ToolWatcher(self.tmp_dir.name, self._on_change, poll_interval=0.05)
+
+        self._assert_reports_changed_tool_files(watcher)
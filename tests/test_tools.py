@@ -0,0 +1,242 @@
+import asyncio
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from yada.config import get_config
+from yada.tools import ToolOutput, astream_command, run_command
+from yada.tools.os_tools import execute_shell_command, read_tool_output
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        # killed orphans can linger as zombies when nothing reaps them
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split()[2] != "Z"
+    except FileNotFoundError:
+        return True
+
+
+class TestToolOutput(unittest.TestCase):
+    def test_short_output_is_kept_whole(self):
+        # Arrange
+        output = ToolOutput(max_bytes=100)
+
+        # Act
+        output.write(b"hello ")
+        output.write("world")
+
+        # Assert
+        self.assertEqual(output.text(), "hello world")
+        self.assertIsNone(output.spill_path)
+
+    def test_long_output_keeps_head_and_tail(self):
+        # Arrange
+        output = ToolOutput(max_bytes=40)
+        lines = [f"line {i:03}\n" for i in range(100)]
+
+        # Act
+        for line in lines:
+            output.write(line)
+        text = output.text()
+
+        # Assert
+        self.assertTrue(text.startswith("line 000\nl"))
+        self.assertTrue(text.endswith("line 099\n"))
+        self.assertIn(f"{900 - 40} of 900 bytes elided", text)
+        with open(output.spill_path) as f:
+            self.assertEqual(f.read(), "".join(lines))
+        os.remove(output.spill_path)
+
+    def test_run_command_streams_stdout(self):
+        # Arrange
+        output = ToolOutput(max_bytes=100)
+
+        # Act
+        result = run_command(
+            "echo out; echo err >&2; exit 3", output=output, shell=True
+        )
+
+        # Assert
+        self.assertEqual(result.exit_code, 3)
+        self.assertEqual(output.text(), "out\n")
+
+    def test_run_command_interleaves_stderr(self):
+        # Arrange
+        output = ToolOutput(max_bytes=100)
+        echoed = []
+
+        # Act
+        result = run_command(
+            "echo out; echo err >&2",
+            output=output,
+            shell=True,
+            stderr=True,
+            echo=echoed.append,
+        )
+
+        # Assert
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(output.text(), "out\nerr\n")
+        self.assertEqual(b"".join(echoed), b"out\nerr\n")
+        self.assertGreater(result.duration_seconds, 0)
+
+    def test_run_command_timeout_kills_the_process_group(self):
+        # Arrange
+        output = ToolOutput(max_bytes=100)
+
+        # Act
+        result = run_command(
+            "sleep 30 & echo $!; wait", output=output, shell=True, timeout=0.5
+        )
+
+        # Assert
+        self.assertTrue(result.timed_out)
+        self.assertLess(result.duration_seconds, 5)
+        child_pid = int(output.text())
+        for _ in range(50):
+            if not _is_running(child_pid):
+                break
+            time.sleep(0.05)
+        self.assertFalse(_is_running(child_pid))
+
+    def test_run_command_timeout_after_stdout_closes(self):
+        # Arrange
+        output = ToolOutput(max_bytes=100)
+
+        # Act
+        result = run_command(
+            "exec >/dev/null 2>&1; sleep 30",
+            output=output,
+            shell=True,
+            stderr=True,
+            timeout=0.5,
+        )
+
+        # Assert
+        self.assertTrue(result.timed_out)
+        self.assertLess(result.duration_seconds, 5)
+        self.assertLess(result.exit_code, 0)
+
+    def test_run_command_output_limit(self):
+        # Arrange
+        output = ToolOutput(max_bytes=100)
+
+        # Act
+        result = run_command(
+            "yes", output=output, shell=True, max_output_bytes=1_000_000
+        )
+
+        # Assert
+        self.assertTrue(result.output_limit_exceeded)
+        self.assertLess(result.exit_code, 0)
+        os.remove(output.spill_path)
+
+    def test_astream_command_timeout(self):
+        # Arrange
+        output = ToolOutput(max_bytes=100)
+
+        # Act
+        result = asyncio.run(
+            astream_command(
+                "sh", "-c", "echo started; sleep 30", output=output, timeout=0.5
+            )
+        )
+
+        # Assert
+        self.assertTrue(result.timed_out)
+        self.assertEqual(output.text(), "started\n")
+
+    def test_astream_command_timeout_after_stdout_closes(self):
+        # Arrange
+        output = ToolOutput(max_bytes=100)
+
+        # Act
+        result = asyncio.run(
+            astream_command(
+                "sh",
+                "-c",
+                "exec >/dev/null 2>&1; sleep 30",
+                output=output,
+                timeout=0.5,
+            )
+        )
+
+        # Assert
+        self.assertTrue(result.timed_out)
+        self.assertLess(result.duration_seconds, 5)
+
+
+class TestExecuteShellCommand(unittest.TestCase):
+    @patch("yada.tools.os_tools.terminal_echo", return_value=None)
+    def test_returns_output_and_exit_code(self, mock_terminal_echo):
+        # Act
+        result = execute_shell_command.invoke({"command": "echo hi >&2; exit 2"})
+
+        # Assert
+        self.assertIn("hi", result)
+        self.assertIn("Exit code: 2, duration:", result)
+
+
+class TestReadToolOutput(unittest.TestCase):
+    def test_reads_spilled_output(self):
+        # Arrange
+        output = ToolOutput(max_bytes=4)
+        output.write(b"0123456789")
+        output.close()
+
+        # Act
+        result = read_tool_output.invoke(
+            {"path": output.spill_path, "offset": 2, "length": 3}
+        )
+
+        # Assert
+        self.assertEqual(result, "Bytes 2-5 of 10\n234")
+        os.remove(output.spill_path)
+
+    def test_length_is_capped(self):
+        # Arrange
+        output = ToolOutput(max_bytes=4)
+        output.write(b"x" * 100_000)
+        output.close()
+
+        # Act
+        result = read_tool_output.invoke(
+            {"path": output.spill_path, "length": 1_000_000}
+        )
+
+        # Assert
+        limit = get_config().max_tool_output_bytes
+        header, chunk = result.split("\n", 1)
+        self.assertEqual(header, f"Bytes 0-{limit} of 100000")
+        self.assertEqual(len(chunk), limit)
+        os.remove(output.spill_path)
+
+    def test_old_outputs_are_removed(self):
+        # Arrange
+        old = ToolOutput(max_bytes=4)
+        old.write(b"0123456789")
+        old.close()
+        os.utime(old.spill_path, (0, 0))
+
+        # Act
+        output = ToolOutput(max_bytes=4)
+        output.write(b"0123456789")
+        output.close()
+
+        # Assert
+        self.assertFalse(os.path.exists(old.spill_path))
+        self.assertTrue(os.path.exists(output.spill_path))
+        os.remove(output.spill_path)
+
+    def test_rejects_other_files(self):
+        # Act
+        result = read_tool_output.invoke({"path": __file__})
+
+        # Assert
+        self.assertTrue(result.startswith("Not a saved tool output"))
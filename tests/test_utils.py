@@ -0,0 +1,71 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from yada import utils
+
+
+class TestUtils(unittest.TestCase):
+    def setUp(self) -> None:
+        # the console reads FORCE_COLOR once, start each test with a new one
+        utils._console = None
+
+    def tearDown(self) -> None:
+        utils._console = None
+
+    def test_console_is_shared(self):
+        # Act / Assert
+        self.assertIs(utils.get_console(), utils.get_console())
+
+    def test_tool_calls_message(self):
+        # Act
+        message = utils.tool_calls_message(
+            [{"name": "create_dir", "args": {"path": "foo", "mode": 755}}]
+        )
+
+        # Assert
+        self.assertTrue(message.startswith("I want to execute the following tools."))
+        self.assertTrue(
+            message.endswith(
+                "- **Tool:** create_dir\n\t- **Args**\n\t\t- path=foo\n\t\t- mode=755\n"
+            )
+        )
+
+    @patch.dict(os.environ)
+    def test_piped_output_is_plain(self):
+        # Arrange
+        os.environ.pop("FORCE_COLOR", None)
+        output = io.StringIO()
+
+        # Act
+        with redirect_stdout(output):
+            utils.print_thinking()
+            utils.agent_response("**Done**, created `foo`.")
+            stream = utils.AgentResponseStream()
+            stream.write("streamed")
+            stream.write(" *text*")
+            stream.close()
+
+        # Assert
+        self.assertEqual(
+            output.getvalue(),
+            "YADA: **Done**, created `foo`.\nYADA: streamed *text*\n",
+        )
+
+    @patch.dict(os.environ, {"FORCE_COLOR": "1"})
+    def test_static_content_is_rendered_once(self):
+        # Arrange
+        utils._render_static.cache_clear()
+        output = io.StringIO()
+
+        # Act
+        with redirect_stdout(output):
+            utils.print_static("**Examples**", markdown=True)
+            utils.print_static("**Examples**", markdown=True)
+
+        # Assert
+        self.assertEqual(utils._render_static.cache_info().misses, 1)
+        self.assertEqual(output.getvalue().count("Examples"), 2)
+        self.assertNotIn("**", output.getvalue())
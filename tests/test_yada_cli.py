@@ -1,13 +1,25 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, call, MagicMock
 
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
 
 from yada.yada_cli import YadaCli
 
 
 class TestYadaCli(unittest.TestCase):
     def setUp(self) -> None:
+        # keep the user's checkpoints and LLM cache out of the tests
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        for name in ["YADA_CHECKPOINT_DB_PATH", "YADA_LLM_CACHE_DB_PATH"]:
+            path_patch = patch(
+                f"yada.yada_cli.{name}", os.path.join(tmp_dir.name, f"{name}.sqlite")
+            )
+            path_patch.start()
+            self.addCleanup(path_patch.stop)
+
         thread_id = None
         debug = False
         self.yada_cli = YadaCli(thread_id=thread_id, debug=debug)
@@ -117,10 +129,7 @@ class TestYadaCli(unittest.TestCase):
     @patch("yada.yada_cli.ToolLoader")
     @patch("yada.yada_cli.YadaAgent")
     @patch("yada.yada_cli.model")
-    @patch("yada.yada_cli.MemorySaver")
-    def test_new_agent(
-        self, mock_memory_saver, mock_model, mock_yada_agent, mock_tool_loader
-    ):
+    def test_new_agent(self, mock_model, mock_yada_agent, mock_tool_loader):
         # Arrange
         mock_tool_loader_instance = MagicMock()
         mock_tool_loader.return_value = mock_tool_loader_instance
@@ -130,23 +139,46 @@ class TestYadaCli(unittest.TestCase):
         mock_model_instance = MagicMock()
         mock_model.return_value = mock_model_instance
 
-        mock_memory_saver_instance = MagicMock()
-        mock_memory_saver.return_value = mock_memory_saver_instance
-
         # Act
         agent = self.yada_cli._new_agent()
 
         # Assert
         mock_tool_loader_instance.load.assert_called_once()
+        mock_model.assert_called_once_with(cache=None)
         mock_yada_agent.assert_called_once_with(
             model=mock_model_instance,
             safe_tools=["safe_tool"],
             sensitive_tools=["sensitive_tool"],
-            checkpointer=mock_memory_saver_instance,
+            checkpointer=self.yada_cli.checkpointer,
             debug=self.yada_cli.debug,
+            max_tool_workers=1,
+            tool_call_timeout=None,
+            max_context_tokens=None,
+            tool_selection_top_k=None,
         )
         self.assertEqual(agent, mock_yada_agent.return_value)
 
+    @patch("yada.yada_cli.SqliteCheckpointSaver.latest_thread_id")
+    def test_resume_latest_thread(self, mock_latest_thread_id):
+        # Arrange
+        mock_latest_thread_id.return_value = "latest"
+
+        # Act
+        yada_cli = YadaCli(thread_id=None, resume=True)
+
+        # Assert
+        self.assertEqual(yada_cli.config["configurable"]["thread_id"], "latest")
+        self.assertTrue(yada_cli.resumed)
+
+    @patch("yada.yada_cli.SqliteCheckpointSaver.latest_thread_id")
+    def test_resume_given_thread(self, mock_latest_thread_id):
+        # Act
+        yada_cli = YadaCli(thread_id="abc", resume=True)
+
+        # Assert
+        mock_latest_thread_id.assert_not_called()
+        self.assertEqual(yada_cli.config["configurable"]["thread_id"], "abc")
+
     @patch("yada.yada_cli.utils.user_response")
     @patch("yada.yada_cli.YadaCli._handle_ai_message")
     def test_handle_event_with_human_message(
@@ -223,137 +255,132 @@ class TestYadaCli(unittest.TestCase):
         mock_handle_ai_message.assert_called_once_with(event["messages"])
         self.assertIn("123", self.yada_cli._printed)
 
-    @patch("yada.yada_cli.utils.user_input", side_effect=["y", "n"])
+    @patch("yada.yada_cli.utils.user_input", side_effect=["", "y", "n"])
     @patch("yada.yada_cli.YadaCli._handle_user_response_to_sensitive_tool_call")
-    @patch("yada.yada_cli.YadaCli._handle_ai_message")
     @patch("yada.yada_cli.YadaAgent.get_state")
     def test_handle_tool_calls(
         self,
         mock_get_state,
-        mock_handle_ai_message,
         mock_handle_user_response_to_sensitive_tool_call,
         mock_user_input,
     ):
         # Arrange
-        event = {"messages": [{"id": "123", "content": "test response"}]}
-        mock_snapshot = MagicMock()
-        mock_snapshot.next = True
-        mock_get_state.side_effect = [
-            mock_snapshot,
-            mock_snapshot,
-            MagicMock(next=False),
+        tool_calls = [{"id": "tool1", "name": "tool1", "args": {}}]
+        next_tool_calls = [{"id": "tool2", "name": "tool2", "args": {}}]
+        event = {"messages": [AIMessage(id="123", content="", tool_calls=tool_calls)]}
+        self.yada_cli.agent.sensitive_tool_names = ["tool1", "tool2"]
+        mock_handle_user_response_to_sensitive_tool_call.side_effect = [
+            next_tool_calls,
+            [],
         ]
-        mock_result = {"messages": [{"id": "456", "content": "test ai message"}]}
-        mock_handle_user_response_to_sensitive_tool_call.return_value = mock_result
 
         # Act
         self.yada_cli._handle_tool_calls(event)
 
         # Assert
-        self.assertEqual(mock_user_input.call_count, 2)
+        self.assertEqual(mock_user_input.call_count, 3)
         mock_handle_user_response_to_sensitive_tool_call.assert_has_calls(
-            [call("y", event), call("n", event)]
+            [call("y", event["messages"][-1].tool_calls), call("n", next_tool_calls)]
         )
-        mock_handle_ai_message.assert_called_with(mock_result["messages"][-1])
-        self.assertEqual(mock_get_state.call_count, 3)
+        mock_get_state.assert_not_called()
 
+    @patch("yada.yada_cli.utils.user_input")
+    def test_handle_tool_calls_without_pending_tool_calls(self, mock_user_input):
+        # Arrange
+        event = {"messages": [AIMessage(id="123", content="test ai message")]}
+
+        # Act
+        self.yada_cli._handle_tool_calls(event)
+
+        # Assert
+        mock_user_input.assert_not_called()
+
+    @patch("yada.yada_cli.YadaCli._handle_ai_message")
     @patch("yada.yada_cli.utils.print_working")
-    @patch("yada.yada_cli.YadaAgent.invoke")
+    @patch("yada.yada_cli.YadaAgent.stream_updates")
     def test_handle_user_response_to_sensitive_tool_call_yes(
-        self, mock_invoke, mock_print_working
+        self, mock_stream_updates, mock_print_working, mock_handle_ai_message
     ):
         # Arrange
         user_prompt = "y"
-        event = {
-            "messages": [
-                AIMessage(
-                    id="123",
-                    content="test ai message",
-                    tool_calls=[
-                        {"id": "tool1", "name": "tool1", "args": {"arg1": "value1"}}
-                    ],
-                )
-            ]
-        }
-        mock_result = {"messages": [{"id": "456", "content": "test ai message"}]}
-        mock_invoke.return_value = mock_result
+        tool_calls = [{"id": "tool1", "name": "tool1", "args": {"arg1": "value1"}}]
+        response = AIMessage(id="456", content="test ai message")
+        mock_stream_updates.return_value = [
+            (
+                "sensitive_tools",
+                {"messages": [ToolMessage(tool_call_id="tool1", content="ok")]},
+            ),
+            ("agent", {"messages": [response]}),
+        ]
 
         # Act
         result = self.yada_cli._handle_user_response_to_sensitive_tool_call(
-            user_prompt, event
+            user_prompt, tool_calls
         )
 
         # Assert
         mock_print_working.assert_called_once()
-        mock_invoke.assert_called_once_with(None, self.yada_cli.config)
-        self.assertEqual(result, mock_result)
+        mock_stream_updates.assert_called_once_with(None, self.yada_cli.config)
+        mock_handle_ai_message.assert_called_once_with(response)
+        self.assertEqual(result, [])
 
+    @patch("yada.yada_cli.YadaCli._handle_ai_message")
     @patch("yada.yada_cli.utils.print_thinking")
-    @patch("yada.yada_cli.YadaAgent.invoke")
+    @patch("yada.yada_cli.YadaAgent.stream_updates")
     def test_handle_user_response_to_sensitive_tool_call_no(
-        self, mock_invoke, mock_print_thinking
+        self, mock_stream_updates, mock_print_thinking, mock_handle_ai_message
     ):
         # Arrange
         user_prompt = "n"
-        event = {
-            "messages": [
-                AIMessage(
-                    id="123",
-                    content="test ai message",
-                    tool_calls=[{"id": "tool1", "name": "tool1", "args": {}}],
-                )
-            ]
-        }
-        mock_result = {"messages": [{"id": "456", "content": "test ai message"}]}
-        mock_invoke.return_value = mock_result
+        tool_calls = [
+            {"id": "tool1", "name": "tool1", "args": {}},
+            {"id": "tool2", "name": "tool2", "args": {}},
+        ]
+        mock_stream_updates.return_value = [
+            ("agent", {"messages": [AIMessage(id="456", content="test ai message")]})
+        ]
 
         # Act
         result = self.yada_cli._handle_user_response_to_sensitive_tool_call(
-            user_prompt, event
+            user_prompt, tool_calls
         )
 
         # Assert
         mock_print_thinking.assert_called_once()
-        mock_invoke.assert_called_once_with(
+        denied = "Tool call denied by user. Reasoning: 'No, I don't want to execute those tools.'. Continue assisting, accounting for the user's input."
+        mock_stream_updates.assert_called_once_with(
             {
                 "messages": [
-                    ToolMessage(
-                        tool_call_id="tool1",
-                        content="Tool call denied by user. Reasoning: 'No, I don't want to execute those tools.'. Continue assisting, accounting for the user's input.",
-                    )
+                    ToolMessage(tool_call_id="tool1", content=denied),
+                    ToolMessage(tool_call_id="tool2", content=denied),
                 ]
             },
             self.yada_cli.config,
         )
-        self.assertEqual(result, mock_result)
+        self.assertEqual(result, [])
 
+    @patch("yada.yada_cli.YadaCli._handle_ai_message")
     @patch("yada.yada_cli.utils.print_thinking")
-    @patch("yada.yada_cli.YadaAgent.invoke")
+    @patch("yada.yada_cli.YadaAgent.stream_updates")
     def test_handle_user_response_to_sensitive_tool_call_custom_reason(
-        self, mock_invoke, mock_print_thinking
+        self, mock_stream_updates, mock_print_thinking, mock_handle_ai_message
     ):
         # Arrange
         user_prompt = "I need more information."
-        event = {
-            "messages": [
-                AIMessage(
-                    id="123",
-                    content="test ai message",
-                    tool_calls=[{"id": "tool1", "name": "tool1", "args": {}}],
-                )
-            ]
-        }
-        mock_result = {"messages": [{"id": "456", "content": "test ai message"}]}
-        mock_invoke.return_value = mock_result
+        tool_calls = [{"id": "tool1", "name": "tool1", "args": {}}]
+        next_tool_calls = [{"id": "tool2", "name": "tool2", "args": {}}]
+        next_message = AIMessage(id="456", content="", tool_calls=next_tool_calls)
+        mock_stream_updates.return_value = [("agent", {"messages": [next_message]})]
+        self.yada_cli.agent.sensitive_tool_names = ["tool1", "tool2"]
 
         # Act
         result = self.yada_cli._handle_user_response_to_sensitive_tool_call(
-            user_prompt, event
+            user_prompt, tool_calls
         )
 
         # Assert
         mock_print_thinking.assert_called_once()
-        mock_invoke.assert_called_once_with(
+        mock_stream_updates.assert_called_once_with(
             {
                 "messages": [
                     ToolMessage(
@@ -364,7 +391,8 @@ class TestYadaCli(unittest.TestCase):
             },
             self.yada_cli.config,
         )
-        self.assertEqual(result, mock_result)
+        mock_handle_ai_message.assert_called_once_with(next_message)
+        self.assertEqual(result, next_message.tool_calls)
 
     @patch("yada.yada_cli.utils.print_working")
     @patch("yada.yada_cli.utils.agent_response")
@@ -521,3 +549,31 @@ class TestYadaCli(unittest.TestCase):
             "- **Tool:** Tool 1\n\t- **Args**\n"
         )
         mock_agent_response.assert_called_once_with(expected_message)
+
+    @patch("yada.yada_cli.utils.AgentResponseStream")
+    @patch("yada.yada_cli.YadaCli._handle_ai_message")
+    @patch("yada.yada_cli.YadaAgent.stream_tokens")
+    def test_stream_tokens(
+        self, mock_stream_tokens, mock_handle_ai_message, mock_response_stream
+    ):
+        # Arrange
+        metadata = {"langgraph_node": "agent"}
+        final_message = AIMessage(id="456", content="hello world")
+        mock_stream_tokens.return_value = [
+            ("values", {"messages": [HumanMessage(id="123", content="hi")]}),
+            ("messages", (AIMessageChunk(id="456", content="hello"), metadata)),
+            ("messages", (AIMessageChunk(id="456", content=" world"), metadata)),
+            ("values", {"messages": [final_message]}),
+        ]
+        self.yada_cli._printed = set()
+
+        # Act
+        event = self.yada_cli._stream_tokens("hi")
+
+        # Assert
+        mock_response_stream.return_value.write.assert_has_calls(
+            [call("hello"), call(" world")]
+        )
+        mock_handle_ai_message.assert_not_called()
+        self.assertIn("456", self.yada_cli._printed)
+        self.assertEqual(event, {"messages": [final_message]})
@@ -1,10 +1,19 @@
-from langchain_openai import ChatOpenAI
+from typing import TYPE_CHECKING
 
 from yada.config import get_config
 
+if TYPE_CHECKING:
+    from langchain_core.caches import BaseCache
+    from langchain_openai import ChatOpenAI
 
-def model() -> ChatOpenAI:
-    return ChatOpenAI(model=get_config().llm_model_name, api_key=get_config().api_key)
+
+def model(cache: "BaseCache" = None) -> "ChatOpenAI":
+    # imported lazily so `yada -V` and `yada --config` skip LangChain entirely
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=get_config().llm_model_name, api_key=get_config().api_key, cache=cache
+    )
 
 
 def custom_tools_dir() -> str:
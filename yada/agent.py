@@ -1,17 +1,43 @@
-from typing import Any, Annotated, Literal, Sequence, TypedDict, Iterator
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Annotated,
+    AsyncIterator,
+    Callable,
+    Literal,
+    Sequence,
+    TypedDict,
+    Iterator,
+)
 
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+)
 
 from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 from langgraph.managed import IsLastStep
 
-from langchain_openai import ChatOpenAI
-
+from yada import profiler
+from yada.context import ContextWindow
 from yada.sync_tool_node import SyncToolNode
+from yada.tool_selection import ToolSelector
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+# bound models cached per tool subset, oldest evicted first
+_MAX_TOOL_SUBSETS = 32
 
 
 class AgentState(TypedDict):
@@ -24,40 +50,85 @@ class YadaAgent:
 
     def __init__(
         self,
-        model: ChatOpenAI,
+        model: "ChatOpenAI",
         safe_tools: list[BaseTool],
         sensitive_tools: list[BaseTool],
         interrupt_before: list[str] = ["sensitive_tools"],
         checkpointer=None,
         debug: bool = False,
+        max_tool_workers: int = 1,
+        tool_call_timeout: float = None,
+        max_context_tokens: int = None,
+        tool_selection_top_k: int = None,
+    ) -> None:
+        self.model = model
+        self.interrupt_before = interrupt_before
+        self.checkpointer = checkpointer
+        self.debug = debug
+        self.max_tool_workers = max_tool_workers
+        self.tool_call_timeout = tool_call_timeout
+        self.tool_selection_top_k = tool_selection_top_k
+        # tool name -> (tool, OpenAI tool schema), reused across tool updates
+        self._tool_schemas = {}
+        self._tool_subset_lock = threading.Lock()
+
+        self.context_window = ContextWindow(
+            max_context_tokens, token_counter=_model_token_counter(model)
+        )
+
+        self.system_message = SystemMessage(
+            id="yada-system-prompt",
+            content="""
+            You're name is YADA. You are a helpful AI assistant for developers.
+            If you use a tool, provide useful information back to the user to 
+            help them understand what the tool did.
+            If asked what capabilities you have, ensure you list or describe 
+            ALL tools you have access to.
+            """.strip(),
+        )
+
+        self.update_tools(safe_tools, sensitive_tools)
+
+    def update_tools(
+        self, safe_tools: list[BaseTool], sensitive_tools: list[BaseTool]
     ) -> None:
+        """
+        Rebind the model to a new set of tools and swap in a freshly compiled
+        graph. The old graph keeps serving until the new one is fully built,
+        and tool schemas of unchanged tools are reused.
+        """
         tool_classes = safe_tools + sensitive_tools
-        self.sensitive_tool_names = [tool.name for tool in sensitive_tools]
-        safe_tool_node = SyncToolNode(safe_tools, all_tools=tool_classes)
-        sensitive_tool_node = SyncToolNode(sensitive_tools, all_tools=tool_classes)
-        model = model.bind_tools(tool_classes)
+        safe_tool_node = SyncToolNode(
+            safe_tools,
+            all_tools=tool_classes,
+            max_workers=self.max_tool_workers,
+            timeout=self.tool_call_timeout,
+        )
+        sensitive_tool_node = SyncToolNode(
+            sensitive_tools,
+            all_tools=tool_classes,
+            max_workers=self.max_tool_workers,
+            timeout=self.tool_call_timeout,
+        )
+        model = self.model.bind_tools(self._bind_tool_schemas(tool_classes))
 
         state_modifier_runnable = RunnableLambda(
-            lambda state: [
-                SystemMessage(
-                    """
-                    You're name is YADA. You are a helpful AI assistant for developers.
-                    If you use a tool, provide useful information back to the user to 
-                    help them understand what the tool did.
-                    If asked what capabilities you have, ensure you list or describe 
-                    ALL tools you have access to.
-                    """.strip()
-                )
-            ]
-            + state["messages"],
+            self._modify_state,
             name=self.STATE_MODIFIER_RUNNABLE_NAME,
         )
 
-        self.model_runnable = state_modifier_runnable | model
+        model_runnable = state_modifier_runnable | model
+        tool_selector = (
+            ToolSelector(tool_classes, self.tool_selection_top_k)
+            if self.tool_selection_top_k
+            else None
+        )
 
         workflow = StateGraph(AgentState)
 
-        workflow.add_node("agent", RunnableLambda(self._call_model))
+        workflow.add_node(
+            "agent", RunnableLambda(self._call_model, afunc=self._acall_model)
+        )
         workflow.add_node("safe_tools", safe_tool_node)
         workflow.add_node("sensitive_tools", sensitive_tool_node)
 
@@ -77,12 +148,73 @@ class YadaAgent:
         workflow.add_edge("safe_tools", "agent")
         workflow.add_edge("sensitive_tools", "agent")
 
-        self.workflow = workflow.compile(
-            checkpointer=checkpointer, interrupt_before=interrupt_before, debug=debug
+        compiled = workflow.compile(
+            checkpointer=self.checkpointer,
+            interrupt_before=self.interrupt_before,
+            debug=self.debug,
         )
 
+        self.sensitive_tool_names = [tool.name for tool in sensitive_tools]
+        self._state_modifier_runnable = state_modifier_runnable
+        self._tool_selector = tool_selector
+        self._tool_subset_runnables = {}
+        self.model_runnable = model_runnable
+        self.workflow = compiled
+
+    def _select_model_runnable(self, state: AgentState):
+        """
+        Return the model runnable bound to the tools relevant to this turn, or
+        to all tools when tool selection is off. Bound models are cached per
+        tool subset.
+        """
+        if self._tool_selector is None:
+            return self.model_runnable
+
+        tool_names = tuple(self._tool_selector.select(state["messages"]))
+        # batch prompts call the model from several threads at once
+        with self._tool_subset_lock:
+            runnables = self._tool_subset_runnables
+            runnable = runnables.get(tool_names)
+            if runnable is None:
+                model = self.model.bind_tools(
+                    [self._tool_schemas[name][1] for name in tool_names]
+                )
+                runnable = self._state_modifier_runnable | model
+                if len(runnables) >= _MAX_TOOL_SUBSETS:
+                    del runnables[next(iter(runnables))]
+                runnables[tool_names] = runnable
+        return runnable
+
+    def _bind_tool_schemas(self, tools: list[BaseTool]) -> list[dict]:
+        tool_schemas = {}
+        for tool in tools:
+            cached = self._tool_schemas.get(tool.name)
+            if cached is None or cached[0] is not tool:
+                cached = (tool, convert_to_openai_tool(tool))
+            tool_schemas[tool.name] = cached
+
+        self._tool_schemas = tool_schemas
+        return [schema for _, schema in tool_schemas.values()]
+
+    def _modify_state(self, state: AgentState) -> list[BaseMessage]:
+        messages = self.context_window.trim(
+            state["messages"], reserved_messages=[self.system_message]
+        )
+        return [self.system_message] + messages
+
     def _call_model(self, state: AgentState, config: RunnableConfig):
-        response = self.model_runnable.invoke(state, config)
+        with profiler.span("model", "call_model") as span:
+            response = self._select_model_runnable(state).invoke(state, config)
+            _record_token_usage(span, response)
+        return self._handle_model_response(state, response)
+
+    async def _acall_model(self, state: AgentState, config: RunnableConfig):
+        with profiler.span("model", "call_model") as span:
+            response = await self._select_model_runnable(state).ainvoke(state, config)
+            _record_token_usage(span, response)
+        return self._handle_model_response(state, response)
+
+    def _handle_model_response(self, state: AgentState, response: AIMessage):
         if state["is_last_step"] and response.tool_calls:
             return {
                 "messages": [
@@ -120,9 +252,76 @@ class YadaAgent:
     ) -> Iterator[dict[str, Any]]:
         return self.workflow.stream(input, config, stream_mode="values")
 
+    def stream_tokens(
+        self, input: dict[str, Any], config: RunnableConfig
+    ) -> Iterator[tuple[str, Any]]:
+        return self.workflow.stream(input, config, stream_mode=["messages", "values"])
+
+    def stream_updates(
+        self,
+        input: dict[str, Any],
+        config: RunnableConfig,
+        on_token: Callable[[AIMessageChunk], None] = None,
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Yield `(node, update)` as each node finishes, with only what the node
+        added to the state rather than the whole state. `on_token` is called
+        with each chunk of the model's response as it streams.
+        """
+        if on_token is None:
+            for chunk in self.workflow.stream(input, config, stream_mode="updates"):
+                for node, update in chunk.items():
+                    yield node, update or {}
+            return
+
+        for mode, chunk in self.workflow.stream(
+            input, config, stream_mode=["messages", "updates"]
+        ):
+            if mode == "messages":
+                message, metadata = chunk
+                if metadata.get("langgraph_node") == "agent" and isinstance(
+                    message, AIMessageChunk
+                ):
+                    on_token(message)
+                continue
+
+            for node, update in chunk.items():
+                yield node, update or {}
+
+    def pending_tool_calls(self, node: str, update: dict[str, Any]) -> list[dict]:
+        """
+        The tool calls the graph is interrupted for after this update, if it
+        was the last one of a stream. The graph stops before running
+        sensitive tools, so that is any agent message calling one.
+        """
+        if node != "agent" or "sensitive_tools" not in self.interrupt_before:
+            return []
+
+        messages = update.get("messages") or []
+        if not messages or not isinstance(messages[-1], AIMessage):
+            return []
+
+        tool_calls = messages[-1].tool_calls
+        if not self.is_sensitive_tool_call_exist(tool_calls):
+            return []
+        return tool_calls
+
+    async def ainvoke(
+        self, input: dict[str, Any], config: RunnableConfig
+    ) -> dict[str, Any]:
+        return await self.workflow.ainvoke(input, config)
+
+    def astream(
+        self, input: dict[str, Any], config: RunnableConfig
+    ) -> AsyncIterator[dict[str, Any]]:
+        return self.workflow.astream(input, config, stream_mode="values")
+
     def get_state(self, config: RunnableConfig):
         return self.workflow.get_state(config)
 
+    async def aget_state(self, config: RunnableConfig):
+        return await self.workflow.aget_state(config)
+
     def is_sensitive_tool_call_exist(self, tool_calls: list[BaseTool]) -> bool:
         for tool_call in tool_calls:
             if self.is_sensitive_tool(tool_call["name"]):
@@ -133,6 +332,20 @@ class YadaAgent:
         return tool_name in self.sensitive_tool_names
 
 
+def _record_token_usage(span: dict, response: AIMessage) -> None:
+    usage = response.usage_metadata
+    if usage:
+        span["prompt_tokens"] = usage["input_tokens"]
+        span["completion_tokens"] = usage["output_tokens"]
+
+
+def _model_token_counter(model) -> Callable[[BaseMessage], int]:
+    def count(message: BaseMessage) -> int:
+        return model.get_num_tokens_from_messages([message])
+
+    return count
+
+
 if __name__ == "__main__":
     from yada import model
 
@@ -0,0 +1,211 @@
+import json
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import IO, Iterable, Iterator
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import BaseTool
+
+from yada.agent import YadaAgent
+from yada.sync_tool_node import SEQUENTIAL_TOOL_METADATA_KEY
+
+# sensitive tool calls the model may retry after a denial before the prompt fails
+_MAX_DENIALS = 5
+
+
+def read_prompts(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Parse JSONL prompts. Each line is either a JSON string or an object with a
+    `prompt` and optionally an `id` and a `thread_id`. Blank lines are skipped,
+    and a line that is not a prompt is yielded as `{"id": ..., "error": ...}`,
+    so it is reported without stopping the other prompts.
+    """
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"id": line_number, "error": f"Line {line_number}: {e}"}
+            continue
+
+        if isinstance(item, str):
+            item = {"prompt": item}
+        if not isinstance(item, dict) or not item.get("prompt"):
+            yield {
+                "id": line_number,
+                "error": f"Line {line_number}: expected a prompt, got {line}",
+            }
+            continue
+
+        item.setdefault("id", line_number)
+        yield item
+
+
+def without_sequential_tools(tools: list[BaseTool]) -> list[BaseTool]:
+    """
+    Drop the tools that change process state, like `change_directory`. Prompts
+    running concurrently share the process, so one prompt changing it would
+    redirect the tools of every other prompt.
+    """
+    return [
+        tool
+        for tool in tools
+        if not (tool.metadata or {}).get(SEQUENTIAL_TOOL_METADATA_KEY)
+    ]
+
+
+class BatchRunner:
+    """
+    Runs prompts through the agent with bounded concurrency, each on its own
+    thread ID, and writes a JSONL result per prompt as soon as it finishes.
+
+    There is nobody to confirm sensitive tool calls, so they only run if every
+    sensitive tool in the call is in `allowed_tools`; otherwise the calls are
+    denied and the model is told so.
+    """
+
+    def __init__(
+        self,
+        agent: YadaAgent,
+        concurrency: int = 4,
+        allowed_tools: Iterable[str] = (),
+    ) -> None:
+        self.agent = agent
+        self.concurrency = max(concurrency, 1)
+        self.allowed_tools = set(allowed_tools)
+        self.latencies = []
+        self.completed = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+        self._output_lock = threading.Lock()
+
+    def run(self, prompts: Iterable[dict], output: IO[str]) -> None:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = set()
+            for item in prompts:
+                if "error" in item:
+                    self._write_result(_invalid_prompt_result(item), output)
+                    continue
+
+                # only read ahead as far as there are free workers
+                if len(pending) >= self.concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._write_results(done, output)
+                pending.add(executor.submit(self._run_prompt, item))
+
+            done, _ = wait(pending)
+            self._write_results(done, output)
+        self.elapsed = time.perf_counter() - start
+
+    def summary(self) -> str:
+        throughput = len(self.latencies) / self.elapsed if self.elapsed else 0.0
+        return (
+            f"{self.completed} prompts ({self.errors} failed) in {self.elapsed:.1f}s, "
+            f"{throughput:.2f} prompts/s, latency "
+            f"p50 {percentile(self.latencies, 50):.2f}s "
+            f"p90 {percentile(self.latencies, 90):.2f}s "
+            f"p99 {percentile(self.latencies, 99):.2f}s"
+        )
+
+    def _write_results(self, futures, output: IO[str]) -> None:
+        for future in futures:
+            self._write_result(future.result(), output)
+
+    def _write_result(self, result: dict, output: IO[str]) -> None:
+        with self._output_lock:
+            self.completed += 1
+            # invalid lines never ran, so they have no latency
+            if "latency_seconds" in result:
+                self.latencies.append(result["latency_seconds"])
+            if result["status"] != "ok":
+                self.errors += 1
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    def _run_prompt(self, item: dict) -> dict:
+        thread_id = item.get("thread_id") or f"batch-{uuid4()}"
+        config = {"configurable": {"thread_id": thread_id}}
+        result = {"id": item["id"], "thread_id": thread_id, "prompt": item["prompt"]}
+        tool_calls = []
+        denied_tools = []
+
+        start = time.perf_counter()
+        try:
+            state = self.agent.invoke({"messages": [item["prompt"]]}, config)
+            while self.agent.get_state(config).next:
+                last_message: AIMessage = state["messages"][-1]
+                sensitive = [
+                    tc["name"]
+                    for tc in last_message.tool_calls
+                    if self.agent.is_sensitive_tool(tc["name"])
+                ]
+                if set(sensitive) <= self.allowed_tools:
+                    state = self.agent.invoke(None, config)
+                    continue
+
+                denied_tools.extend(sensitive)
+                if len(denied_tools) > _MAX_DENIALS:
+                    raise RuntimeError("Too many denied sensitive tool calls")
+                state = self.agent.invoke(
+                    {"messages": _denial_messages(last_message)}, config
+                )
+
+            tool_calls = [
+                tc["name"]
+                for message in state["messages"]
+                if isinstance(message, AIMessage)
+                for tc in message.tool_calls
+            ]
+            result.update(status="ok", response=state["messages"][-1].content)
+        except Exception as e:
+            result.update(status="error", error=str(e))
+
+        result.update(
+            tool_calls=tool_calls,
+            denied_tools=denied_tools,
+            latency_seconds=round(time.perf_counter() - start, 3),
+        )
+        return result
+
+
+def _invalid_prompt_result(item: dict) -> dict:
+    return {
+        "id": item["id"],
+        "status": "error",
+        "error": item["error"],
+        "tool_calls": [],
+        "denied_tools": [],
+    }
+
+
+def _denial_messages(message: AIMessage) -> list[ToolMessage]:
+    # every tool call needs an answer, or the next model call is rejected
+    return [
+        ToolMessage(
+            tool_call_id=tool_call["id"],
+            content=(
+                "Tool call denied by the batch policy. "
+                "Continue assisting without running this tool."
+            ),
+        )
+        for tool_call in message.tool_calls
+    ]
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile, 0 for no values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
@@ -0,0 +1,802 @@
+import atexit
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.types import TASKS
+
+MESSAGES_CHANNEL = "messages"
+_MESSAGES_BLOB_TYPE = "yada_messages"
+_EMPTY_BLOB_TYPE = "empty"
+# messages whose digest is remembered, enough for any history sent to a model
+_MESSAGE_DIGEST_CACHE_SIZE = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_updated_at ON checkpoints (updated_at);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    thread_id TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, digest)
+);
+"""
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Durable checkpoint saver backed by a local SQLite database.
+
+    Unlike `MemorySaver`, which copies the full state on every step, only the
+    channels that changed are written. The messages channel is stored as a list
+    of content digests, with each message body stored once per thread, and
+    consecutive versions store only the digests appended since the previous one.
+    A full list is written every `snapshot_interval` versions so loading a long
+    thread never walks more than that many rows.
+
+    Writes are buffered and committed in a single transaction when the buffer
+    fills, before any read, and on `close()` (also registered with atexit).
+    The threads written to are compacted on `close()` and, so a long-running
+    process does not grow without bound, every `compact_every` checkpoints or
+    `compact_interval_seconds`, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        serde: Optional[SerializerProtocol] = None,
+        batch_size: int = 64,
+        snapshot_interval: int = 32,
+        max_checkpoints_per_thread: Optional[int] = 20,
+        retention_days: Optional[float] = 30,
+        compact_every: Optional[int] = 500,
+        compact_interval_seconds: Optional[float] = 60 * 60,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.snapshot_interval = snapshot_interval
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.retention_days = retention_days
+        self.compact_every = compact_every
+        self.compact_interval_seconds = compact_interval_seconds
+
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._pending: List[Tuple[str, tuple]] = []
+        self._touched_threads: set = set()
+        self._puts_since_compaction = 0
+        self._last_compaction = time.monotonic()
+        # (thread_id, checkpoint_ns) -> (version, digests, delta chain depth)
+        self._last_messages: Dict[Tuple[str, str], Tuple[str, tuple, int]] = {}
+        # (thread_id, checkpoint_ns, version) -> (digests, delta chain depth)
+        self._resolved_digests: OrderedDict = OrderedDict()
+        # (thread_id, id(message)) -> (message, digest), least recently used
+        # first, avoids re-serializing unchanged messages
+        self._message_digests: OrderedDict = OrderedDict()
+
+    def _conn(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._connection is None:
+                connection = sqlite3.connect(
+                    self.path, check_same_thread=False, isolation_level=None
+                )
+                connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.executescript(_SCHEMA)
+                self._connection = connection
+                atexit.register(self.close)
+            return self._connection
+
+    def _execute_later(self, sql: str, params: tuple) -> None:
+        with self._lock:
+            self._pending.append((sql, params))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending:
+                return
+            conn = self._conn()
+            # take the write lock up front, so a delta's base cannot be
+            # compacted away by another saver between the check and the write
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params in self._pending:
+                    conn.execute(
+                        sql,
+                        tuple(
+                            (
+                                self._encode_messages(conn, p)
+                                if isinstance(p, _MessagesBlob)
+                                else p
+                            )
+                            for p in params
+                        ),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._pending.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is None:
+                return
+            self.flush()
+            self._compact_touched_threads()
+            self._connection.close()
+            self._connection = None
+            atexit.unregister(self.close)
+
+    def __enter__(self) -> "SqliteCheckpointSaver":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def latest_thread_id(self) -> Optional[str]:
+        """
+        Return the most recently updated thread ID, if any.
+        """
+        with self._lock:
+            self.flush()
+            row = (
+                self._conn()
+                .execute(
+                    "SELECT thread_id FROM checkpoints ORDER BY updated_at DESC LIMIT 1"
+                )
+                .fetchone()
+            )
+        return row[0] if row else None
+
+    def get_next_version(self, current: Optional[str], channel: Any) -> str:
+        return MemorySaver.get_next_version(self, current, channel)
+
+    # Writing
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_checkpoint_id = config["configurable"].get("checkpoint_id")
+
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        values = c.pop("channel_values", {})
+        # node outputs are already stored as channel blobs and pending writes
+        metadata = {k: v for k, v in metadata.items() if k != "writes"}
+
+        with self._lock:
+            for channel, version in new_versions.items():
+                self._put_blob(thread_id, checkpoint_ns, channel, str(version), values)
+
+            checkpoint_type, checkpoint_blob = self.serde.dumps_typed(c)
+            metadata_type, metadata_blob = self.serde.dumps_typed(metadata)
+            self._execute_later(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    parent_checkpoint_id,
+                    checkpoint_type,
+                    checkpoint_blob,
+                    metadata_type,
+                    metadata_blob,
+                    time.time(),
+                ),
+            )
+            self._touched_threads.add(thread_id)
+            self._puts_since_compaction += 1
+            if self._is_compaction_due():
+                self._compact_touched_threads()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def _put_blob(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        channel: str,
+        version: str,
+        values: Dict[str, Any],
+    ) -> None:
+        if channel not in values:
+            blob_type, blob = _EMPTY_BLOB_TYPE, None
+        elif channel == MESSAGES_CHANNEL and _is_message_list(values[channel]):
+            blob_type = _MESSAGES_BLOB_TYPE
+            blob = self._dump_messages(
+                thread_id, checkpoint_ns, version, values[channel]
+            )
+        else:
+            blob_type, blob = self.serde.dumps_typed(values[channel])
+
+        self._execute_later(
+            "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+            (thread_id, checkpoint_ns, channel, version, blob_type, blob),
+        )
+
+    def _dump_messages(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        version: str,
+        messages: List[BaseMessage],
+    ) -> "_MessagesBlob":
+        digests = tuple(self._store_message(thread_id, m) for m in messages)
+
+        base, appended, depth = None, digests, 0
+        last = self._last_messages.get((thread_id, checkpoint_ns))
+        if last:
+            last_version, last_digests, last_depth = last
+            if (
+                last_depth + 1 < self.snapshot_interval
+                and digests[: len(last_digests)] == last_digests
+            ):
+                base = last_version
+                appended = digests[len(last_digests) :]
+                depth = last_depth + 1
+
+        self._last_messages[(thread_id, checkpoint_ns)] = (version, digests, depth)
+        return _MessagesBlob(thread_id, checkpoint_ns, base, appended, digests)
+
+    def _encode_messages(
+        self, conn: sqlite3.Connection, blob: "_MessagesBlob"
+    ) -> bytes:
+        base, digests = blob.base, blob.appended
+        if (
+            base is not None
+            and not conn.execute(
+                "SELECT 1 FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND version = ?",
+                (blob.thread_id, blob.checkpoint_ns, MESSAGES_CHANNEL, base),
+            ).fetchone()
+        ):
+            # another saver on the same file compacted the base away
+            base, digests = None, blob.digests
+        return json.dumps({"base": base, "digests": list(digests)}).encode("utf-8")
+
+    def _store_message(self, thread_id: str, message: BaseMessage) -> str:
+        key = (thread_id, id(message))
+        cached = self._message_digests.get(key)
+        if cached and cached[0] is message:
+            self._message_digests.move_to_end(key)
+            return cached[1]
+
+        message_type, message_blob = self.serde.dumps_typed(message)
+        digest = hashlib.sha1(message_type.encode("utf-8") + message_blob).hexdigest()
+        self._execute_later(
+            "INSERT OR IGNORE INTO messages VALUES (?, ?, ?, ?)",
+            (thread_id, digest, message_type, message_blob),
+        )
+        self._message_digests[key] = (message, digest)
+        if len(self._message_digests) > _MESSAGE_DIGEST_CACHE_SIZE:
+            self._message_digests.popitem(last=False)
+        return digest
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        for idx, (channel, value) in enumerate(writes):
+            write_type, write_blob = self.serde.dumps_typed(value)
+            self._execute_later(
+                "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint_id,
+                    task_id,
+                    WRITES_IDX_MAP.get(channel, idx),
+                    channel,
+                    write_type,
+                    write_blob,
+                ),
+            )
+
+    # Reading
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        with self._lock:
+            self.flush()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = (
+                    self._conn()
+                    .execute(
+                        "SELECT * FROM checkpoints WHERE thread_id = ? "
+                        "AND checkpoint_ns = ? AND checkpoint_id = ?",
+                        (thread_id, checkpoint_ns, checkpoint_id),
+                    )
+                    .fetchone()
+                )
+            else:
+                row = (
+                    self._conn()
+                    .execute(
+                        "SELECT * FROM checkpoints WHERE thread_id = ? "
+                        "AND checkpoint_ns = ? ORDER BY checkpoint_id DESC LIMIT 1",
+                        (thread_id, checkpoint_ns),
+                    )
+                    .fetchone()
+                )
+
+            return self._load_tuple(row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = "SELECT * FROM checkpoints"
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (
+                checkpoint_ns := config["configurable"].get("checkpoint_ns")
+            ) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_checkpoint_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            self.flush()
+            rows = self._conn().execute(query, params).fetchall()
+
+        for row in rows:
+            if limit is not None and limit <= 0:
+                break
+
+            metadata = self.serde.loads_typed((row[6], row[7]))
+            if filter and not all(
+                metadata.get(key) == value for key, value in filter.items()
+            ):
+                continue
+
+            if limit is not None:
+                limit -= 1
+
+            # not holding the lock while the caller handles the tuple
+            with self._lock:
+                checkpoint_tuple = self._load_tuple(row, metadata)
+            yield checkpoint_tuple
+
+    def _load_tuple(
+        self, row: tuple, metadata: Optional[CheckpointMetadata] = None
+    ) -> CheckpointTuple:
+        (
+            thread_id,
+            checkpoint_ns,
+            checkpoint_id,
+            parent_checkpoint_id,
+            checkpoint_type,
+            checkpoint_blob,
+            metadata_type,
+            metadata_blob,
+            _,
+        ) = row
+        conn = self._conn()
+
+        checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_blob))
+        checkpoint["channel_values"] = self._load_channel_values(
+            thread_id, checkpoint_ns, checkpoint["channel_versions"]
+        )
+
+        sends = []
+        if parent_checkpoint_id:
+            sends = conn.execute(
+                "SELECT type, blob FROM writes WHERE thread_id = ? "
+                "AND checkpoint_ns = ? AND checkpoint_id = ? AND channel = ? "
+                "ORDER BY task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+            ).fetchall()
+        checkpoint["pending_sends"] = [self.serde.loads_typed(s) for s in sends]
+
+        writes = conn.execute(
+            "SELECT task_id, channel, type, blob FROM writes WHERE thread_id = ? "
+            "AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint=checkpoint,
+            metadata=(
+                metadata
+                if metadata is not None
+                else self.serde.loads_typed((metadata_type, metadata_blob))
+            ),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((write_type, write_blob)))
+                for task_id, channel, write_type, write_blob in writes
+            ],
+        )
+
+    def _load_channel_values(
+        self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions
+    ) -> Dict[str, Any]:
+        channel_values = {}
+        for channel, version in versions.items():
+            row = (
+                self._conn()
+                .execute(
+                    "SELECT type, blob FROM blobs WHERE thread_id = ? "
+                    "AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                    (thread_id, checkpoint_ns, channel, str(version)),
+                )
+                .fetchone()
+            )
+            if not row or row[0] == _EMPTY_BLOB_TYPE:
+                continue
+            elif row[0] == _MESSAGES_BLOB_TYPE:
+                digests, _ = self._resolve_digests(
+                    thread_id, checkpoint_ns, str(version)
+                )
+                channel_values[channel] = self._load_messages(thread_id, digests)
+            else:
+                channel_values[channel] = self.serde.loads_typed(row)
+        return channel_values
+
+    def _resolve_digests(
+        self, thread_id: str, checkpoint_ns: str, version: str
+    ) -> Tuple[tuple, int]:
+        key = (thread_id, checkpoint_ns, version)
+        if key in self._resolved_digests:
+            self._resolved_digests.move_to_end(key)
+            return self._resolved_digests[key]
+        last = self._last_messages.get((thread_id, checkpoint_ns))
+        if last and last[0] == version:
+            return last[1], last[2]
+
+        row = (
+            self._conn()
+            .execute(
+                "SELECT blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, MESSAGES_CHANNEL, version),
+            )
+            .fetchone()
+        )
+        if row is None:
+            # compacted away by another saver, only possible for a delta's base
+            return (), 0
+        encoded = json.loads(row[0])
+        digests, depth = tuple(encoded["digests"]), 0
+        if encoded["base"]:
+            base_digests, base_depth = self._resolve_digests(
+                thread_id, checkpoint_ns, encoded["base"]
+            )
+            digests, depth = base_digests + digests, base_depth + 1
+
+        self._resolved_digests[key] = (digests, depth)
+        if len(self._resolved_digests) > 2 * self.snapshot_interval:
+            self._resolved_digests.popitem(last=False)
+        return digests, depth
+
+    def _load_messages(self, thread_id: str, digests: tuple) -> List[BaseMessage]:
+        loaded = {}
+        unique = list(set(digests))
+        # stay below SQLite's bound parameter limit
+        for start in range(0, len(unique), 500):
+            chunk = unique[start : start + 500]
+            rows = (
+                self._conn()
+                .execute(
+                    "SELECT digest, type, blob FROM messages WHERE thread_id = ? "
+                    f"AND digest IN ({', '.join('?' * len(chunk))})",
+                    (thread_id, *chunk),
+                )
+                .fetchall()
+            )
+            for digest, message_type, message_blob in rows:
+                loaded[digest] = self.serde.loads_typed((message_type, message_blob))
+
+        return [loaded[digest] for digest in digests]
+
+    # Retention
+
+    def _is_compaction_due(self) -> bool:
+        return (
+            self.compact_every is not None
+            and self._puts_since_compaction >= self.compact_every
+        ) or (
+            self.compact_interval_seconds is not None
+            and time.monotonic() - self._last_compaction
+            >= self.compact_interval_seconds
+        )
+
+    def _compact_touched_threads(self) -> None:
+        for thread_id in self._touched_threads:
+            self.compact(thread_id)
+        self._touched_threads.clear()
+        self._puts_since_compaction = 0
+        self._last_compaction = time.monotonic()
+
+    def compact(self, thread_id: Optional[str] = None) -> None:
+        """
+        Drop threads older than `retention_days` and keep only the latest
+        `max_checkpoints_per_thread` checkpoints of the given thread, removing
+        channel values and messages that are no longer referenced.
+        """
+        with self._lock:
+            self.flush()
+            conn = self._conn()
+            conn.execute("BEGIN")
+            try:
+                if self.retention_days is not None:
+                    self._delete_expired_threads(conn)
+                if thread_id and self.max_checkpoints_per_thread:
+                    self._compact_thread(conn, thread_id)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _delete_expired_threads(self, conn: sqlite3.Connection) -> None:
+        cutoff = time.time() - self.retention_days * 24 * 60 * 60
+        expired = [
+            row[0]
+            for row in conn.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+                "HAVING MAX(updated_at) < ?",
+                (cutoff,),
+            )
+        ]
+        for expired_thread_id in expired:
+            for table in ["checkpoints", "blobs", "writes", "messages"]:
+                conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ?", (expired_thread_id,)
+                )
+
+    def _compact_thread(self, conn: sqlite3.Connection, thread_id: str) -> None:
+        referenced_digests = set()
+        namespaces = [
+            row[0]
+            for row in conn.execute(
+                "SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?",
+                (thread_id,),
+            )
+        ]
+        for checkpoint_ns in namespaces:
+            rows = conn.execute(
+                "SELECT checkpoint_id, type, checkpoint FROM checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC",
+                (thread_id, checkpoint_ns),
+            ).fetchall()
+            kept = rows[: self.max_checkpoints_per_thread]
+            dropped = [row[0] for row in rows[self.max_checkpoints_per_thread :]]
+
+            referenced = set()
+            for _, checkpoint_type, checkpoint_blob in kept:
+                checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_blob))
+                for channel, version in checkpoint["channel_versions"].items():
+                    referenced.add((channel, str(version)))
+
+            # kept message lists become snapshots so they never point at dropped rows
+            for channel, version in referenced:
+                if channel != MESSAGES_CHANNEL:
+                    continue
+                row = conn.execute(
+                    "SELECT type FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "AND channel = ? AND version = ?",
+                    (thread_id, checkpoint_ns, channel, version),
+                ).fetchone()
+                if not row or row[0] != _MESSAGES_BLOB_TYPE:
+                    continue
+                digests, _ = self._resolve_digests(thread_id, checkpoint_ns, version)
+                referenced_digests.update(digests)
+                if dropped:
+                    conn.execute(
+                        "UPDATE blobs SET blob = ? WHERE thread_id = ? "
+                        "AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                        (
+                            json.dumps({"base": None, "digests": list(digests)}),
+                            thread_id,
+                            checkpoint_ns,
+                            channel,
+                            version,
+                        ),
+                    )
+
+            if not dropped:
+                continue
+
+            for checkpoint_id in dropped:
+                for table in ["checkpoints", "writes"]:
+                    conn.execute(
+                        f"DELETE FROM {table} WHERE thread_id = ? "
+                        "AND checkpoint_ns = ? AND checkpoint_id = ?",
+                        (thread_id, checkpoint_ns, checkpoint_id),
+                    )
+
+            for channel, version in conn.execute(
+                "SELECT channel, version FROM blobs WHERE thread_id = ? "
+                "AND checkpoint_ns = ?",
+                (thread_id, checkpoint_ns),
+            ).fetchall():
+                if (channel, version) not in referenced:
+                    conn.execute(
+                        "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                        "AND channel = ? AND version = ?",
+                        (thread_id, checkpoint_ns, channel, version),
+                    )
+                    self._resolved_digests.pop(
+                        (thread_id, checkpoint_ns, version), None
+                    )
+
+        for (digest,) in conn.execute(
+            "SELECT digest FROM messages WHERE thread_id = ?", (thread_id,)
+        ).fetchall():
+            if digest not in referenced_digests:
+                conn.execute(
+                    "DELETE FROM messages WHERE thread_id = ? AND digest = ?",
+                    (thread_id, digest),
+                )
+
+    # Async
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.get_tuple, config
+        )
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: [*self.list(config, filter=filter, before=before, limit=limit)],
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+    ) -> None:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.put_writes, config, writes, task_id
+        )
+
+
+@dataclass
+class _MessagesBlob:
+    """
+    A messages channel value waiting to be written. It is encoded when the
+    buffer is flushed, as a delta against `base` if that is still stored.
+    """
+
+    thread_id: str
+    checkpoint_ns: str
+    base: Optional[str]
+    appended: tuple
+    digests: tuple
+
+
+def _is_message_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(m, BaseMessage) for m in value)
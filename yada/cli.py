@@ -1,25 +1,130 @@
+import os
 import sys
 import click
-from uuid import uuid4
 
 from yada import utils
 from yada.config import (
+    YADA_SOCKET_PATH,
     _config as yada_config,
     config_selections,
     set_api_key,
 )
-from yada.yada_cli import YadaCli
 
+# context key holding the arguments of a subcommand, see _RunCommand
+_SUBCOMMAND_ARGS = "yada.subcommand_args"
 
-@click.command()
+
+class _RunCommand(click.Command):
+    """
+    Hands everything after a subcommand name (`yada tools ...`) to that
+    subcommand, so its options are not parsed as options of `yada` itself.
+
+    Only arguments shaped like a call of the subcommand are handed over, so
+    `yada tools I have installed?` is still a prompt. `yada -- tools ...`
+    always is.
+    """
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if args and args[0] in _SUBCOMMANDS and _is_subcommand_call(args):
+            ctx.meta[_SUBCOMMAND_ARGS] = args
+            args = []
+        return super().parse_args(ctx, args)
+
+
+def _is_subcommand_call(args: list[str]) -> bool:
+    """
+    Whether `args` fit the subcommand they start with: a group followed by
+    one of its commands, or no more positional arguments than the command
+    takes, with file arguments naming `-` or an existing path.
+    """
+    name, *rest = args
+    command = _SUBCOMMANDS[name]
+    if isinstance(command, click.Group):
+        return not rest or rest[0] in command.commands or rest[0].startswith("-")
+
+    takes_value = {
+        opt
+        for param in command.params
+        if isinstance(param, click.Option) and not param.is_flag
+        for opt in param.opts
+    }
+    positionals = []
+    rest = iter(rest)
+    for arg in rest:
+        if arg in takes_value:
+            next(rest, None)
+        elif arg == "-" or not arg.startswith("-"):
+            positionals.append(arg)
+
+    arguments = [param for param in command.params if isinstance(param, click.Argument)]
+    if len(positionals) > len(arguments):
+        return False
+    for argument, value in zip(arguments, positionals):
+        if isinstance(argument.type, (click.File, click.Path)) and not (
+            value == "-" or os.path.exists(value)
+        ):
+            return False
+    return True
+
+
+@click.command(cls=_RunCommand)
 @click.option("-V", "--version", "version", is_flag=True, help="Show version")
 @click.option("--config", is_flag=True, help="Configure YADA")
+@click.option("-t", "--thread-id", "thread_id", help="Agent graph thread ID")
 @click.option(
-    "-t", "--thread-id", "thread_id", default=str(uuid4()), help="Agent graph thread ID"
+    "-r",
+    "--resume",
+    "resume",
+    is_flag=True,
+    help="Resume the given thread ID, or the most recent thread",
 )
 @click.option("-D", "--debug", "debug", is_flag=True, help="Debug mode")
+@click.option(
+    "-s",
+    "--stream",
+    "stream",
+    is_flag=True,
+    help="Stream chat responses as they arrive",
+)
+@click.option(
+    "--profile",
+    "profile",
+    is_flag=True,
+    help="Print where the time went in the session when it ends",
+)
+@click.option(
+    "--profile-trace",
+    "profile_trace",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Profile and write a Chrome trace event JSON file",
+)
+@click.option(
+    "-o",
+    "--output",
+    "output",
+    type=click.Choice(["text", "json", "jsonl"]),
+    default="text",
+    show_default=True,
+    help="Write a command's messages, tool calls and timings as JSON events",
+)
 @click.argument("command", nargs=-1, required=False)
-def run(version: bool, config: bool, thread_id: str, debug: bool, command: tuple[str]):
+def run(
+    version: bool,
+    config: bool,
+    thread_id: str,
+    resume: bool,
+    debug: bool,
+    stream: bool,
+    profile: bool,
+    profile_trace: str,
+    output: str,
+    command: tuple[str],
+):
+    subcommand_args = click.get_current_context().meta.get(_SUBCOMMAND_ARGS)
+    if subcommand_args:
+        name, *args = subcommand_args
+        _SUBCOMMANDS[name](args, prog_name=f"yada {name}")
+
     if version:
         _print_version()
         sys.exit(0)
@@ -27,15 +132,189 @@ def run(version: bool, config: bool, thread_id: str, debug: bool, command: tuple
         _configure_yada()
         sys.exit(0)
 
+    if output != "text" and not command:
+        raise click.UsageError("--output json and jsonl need a command")
+
+    profile = profile or bool(profile_trace)
+    if (
+        command
+        and output == "text"
+        and not (debug or profile)
+        and _forward_to_daemon(" ".join(command), thread_id, resume, stream)
+    ):
+        return
+
+    _check_api_key()
+
+    session_profiler = None
+    if profile:
+        from yada import profiler
+
+        session_profiler = profiler.enable()
+
+    # imported here so `-V` and `--config` do not pay for LangChain and the tools
+    from yada.yada_cli import YadaCli
+
+    try:
+        yada_cli = YadaCli(
+            thread_id=thread_id,
+            debug=debug,
+            stream_tokens=stream,
+            resume=resume,
+            output=output,
+        )
+
+        if command:
+            command = " ".join(command)
+            if not yada_cli.yada_command(command):
+                sys.exit(1)
+        else:
+            yada_cli.yada_chat()
+    finally:
+        if session_profiler:
+            session_profiler.print_summary()
+            if profile_trace:
+                session_profiler.write_chrome_trace(profile_trace)
+
+
+@click.group()
+def tools():
+    """
+    Manage YADA tools.
+    """
+
+
+@tools.command()
+def reindex():
+    """
+    Rebuild the index of custom tools.
+    """
+    from yada.tool_loader import ToolLoader
+
+    count = ToolLoader().reindex()
+    utils.print_markdown(f"Indexed {count} custom tools.", style="bold blue")
+
+
+@click.command()
+@click.argument("input", type=click.File("r"), default="-")
+@click.option(
+    "-c",
+    "--concurrency",
+    default=4,
+    show_default=True,
+    help="Number of prompts run at the same time",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="File to write the JSONL results to, stdout by default",
+)
+@click.option(
+    "--allow-tool",
+    "allowed_tools",
+    multiple=True,
+    help="Sensitive tool to run without confirmation, can be repeated. "
+    "Other sensitive tool calls are denied.",
+)
+def batch(input, concurrency: int, output, allowed_tools: tuple[str]):
+    """
+    Run the JSONL prompts in INPUT (stdin by default), each on its own thread.
+
+    Each line is a JSON string or an object with a "prompt" and optionally an
+    "id" and a "thread_id". A JSONL result is written for each prompt as it
+    finishes, and a throughput and latency summary is printed to stderr.
+    Lines that are not prompts get an error result.
+
+    With a concurrency above 1, tools that change the working directory are
+    disabled, since the prompts share it.
+    """
+    if not yada_config.api_key:
+        click.echo("Set your OpenAI API key first with `yada --config`.", err=True)
+        sys.exit(1)
+
+    from yada.batch import BatchRunner, read_prompts, without_sequential_tools
+    from yada.yada_cli import YadaCli
+
+    yada_cli = YadaCli(thread_id=None)
+    if concurrency > 1:
+        safe_tools = yada_cli.tool_loader.safe_tools
+        sensitive_tools = yada_cli.tool_loader.sensitive_tools
+        kept_safe_tools = without_sequential_tools(safe_tools)
+        kept_sensitive_tools = without_sequential_tools(sensitive_tools)
+        dropped = {t.name for t in safe_tools + sensitive_tools} - {
+            t.name for t in kept_safe_tools + kept_sensitive_tools
+        }
+        if dropped:
+            yada_cli.agent.update_tools(kept_safe_tools, kept_sensitive_tools)
+            click.echo(
+                f"Disabled {', '.join(sorted(dropped))}, prompts running "
+                "concurrently share the working directory. Use -c 1 to enable.",
+                err=True,
+            )
+
+    runner = BatchRunner(
+        yada_cli.agent,
+        concurrency=concurrency,
+        allowed_tools=allowed_tools,
+    )
+    runner.run(read_prompts(input), output)
+
+    click.echo(runner.summary(), err=True)
+    sys.exit(1 if runner.errors else 0)
+
+
+@click.command()
+def serve():
+    """
+    Run a daemon that keeps a warm agent, so `yada <command>` answers faster.
+
+    While it runs, one-off commands are forwarded to it over a Unix domain
+    socket, except with --debug.
+    """
+    import signal
+
     _check_api_key()
 
-    yada_cli = YadaCli(thread_id=thread_id, debug=debug)
+    from yada.server import YadaServer
+
+    server = YadaServer(YADA_SOCKET_PATH)
+    # exit through the finally below, so the socket file is removed
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    utils.print_text(f"YADA daemon listening on {YADA_SOCKET_PATH}", style="blue")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# `yada <name> ...` runs these instead of sending the words to the agent
+_SUBCOMMANDS = {"batch": batch, "serve": serve, "tools": tools}
+
+
+def _forward_to_daemon(
+    command: str, thread_id: str, resume: bool, stream: bool
+) -> bool:
+    """
+    Run the command on a `yada serve` daemon if one is running. Returns False
+    when there is no daemon, so the command runs locally, and exits with status
+    1 if the daemon reports an error or drops the connection.
+    """
+    from yada.client import connect, run_command
+
+    sock = connect(YADA_SOCKET_PATH)
+    if sock is None:
+        return False
 
-    if command:
-        command = " ".join(command)
-        yada_cli.yada_command(command)
-    else:
-        yada_cli.yada_chat()
+    if (
+        run_command(sock, command, thread_id=thread_id, resume=resume, stream=stream)
+        is None
+    ):
+        sys.exit(1)
+    return True
 
 
 def _print_version():
@@ -0,0 +1,93 @@
+import json
+import os
+import socket
+from typing import Optional
+
+from yada import utils
+
+
+def connect(socket_path: str) -> Optional[socket.socket]:
+    """
+    Connect to a running `yada serve` daemon, or return None if there is none.
+    """
+    if not os.path.exists(socket_path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def run_command(
+    sock: socket.socket,
+    command: str,
+    thread_id: str = None,
+    resume: bool = False,
+    stream: bool = False,
+    cwd: Optional[str] = None,
+    env: Optional[dict[str, str]] = None,
+) -> Optional[str]:
+    """
+    Run a command on the daemon, rendering its response and asking for
+    sensitive tool confirmation like the local CLI. Returns the thread ID, or
+    None if the command failed.
+    """
+    with sock, sock.makefile("rwb") as connection:
+
+        def send(**event) -> None:
+            connection.write(json.dumps(event).encode() + b"\n")
+            connection.flush()
+
+        # the daemon runs the tools where and how this command was started
+        send(
+            type="command",
+            prompt=command,
+            thread_id=thread_id,
+            resume=resume,
+            cwd=cwd or os.getcwd(),
+            env=dict(os.environ) if env is None else env,
+        )
+        utils.print_thinking()
+
+        response_stream = utils.AgentResponseStream()
+        streamed_message_id = None
+        try:
+            for line in connection:
+                event = json.loads(line)
+                if event["type"] == "token":
+                    if not stream:
+                        continue
+                    if event["id"] != streamed_message_id:
+                        response_stream.close()
+                        streamed_message_id = event["id"]
+                    response_stream.write(event["content"])
+                elif event["type"] == "message":
+                    response_stream.close()
+                    if event["id"] != streamed_message_id:
+                        utils.agent_response(event["content"])
+                elif event["type"] == "working":
+                    utils.print_working()
+                elif event["type"] == "confirm":
+                    response_stream.close()
+                    utils.agent_response(utils.tool_calls_message(event["tool_calls"]))
+                    answer = ""
+                    while not answer:
+                        answer = utils.user_input("YOU (y/N): ")
+                    utils.print_thinking()
+                    send(type="confirm", answer=answer)
+                elif event["type"] == "error":
+                    utils.print_text(
+                        f"An error occurred: {event['message']}", style="red"
+                    )
+                    return None
+                elif event["type"] == "done":
+                    return event["thread_id"]
+        finally:
+            response_stream.close()
+
+    utils.print_text("The YADA daemon closed the connection.", style="red")
+    return None
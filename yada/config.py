@@ -5,6 +5,11 @@ from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 YADA_CONFIG_FILE_PATH = pathlib.Path.home() / ".config/yada/yada.config"
+YADA_CHECKPOINT_DB_PATH = YADA_CONFIG_FILE_PATH.parent / "checkpoints.sqlite"
+YADA_LLM_CACHE_DB_PATH = YADA_CONFIG_FILE_PATH.parent / "llm_cache.sqlite"
+YADA_TOOL_INDEX_PATH = YADA_CONFIG_FILE_PATH.parent / "tool_index.json"
+YADA_SOCKET_PATH = YADA_CONFIG_FILE_PATH.parent / "yada.sock"
+YADA_GIT_CACHE_DIR = YADA_CONFIG_FILE_PATH.parent / "git-cache"
 _SECTION_NAME = "default"
 
 
@@ -21,6 +26,21 @@ class Config(BaseSettings):
     api_key: Optional[str] = ""
     llm_model_name: Optional[str] = "gpt-4o"
     custom_tools_dir: Optional[str] = ""
+    custom_tools_hot_reload: Optional[bool] = True
+    max_tool_workers: Optional[int] = 1
+    tool_call_timeout: Optional[float] = None
+    max_context_tokens: Optional[int] = None
+    tool_selection_top_k: Optional[int] = None
+    checkpoint_max_per_thread: Optional[int] = 20
+    checkpoint_retention_days: Optional[float] = 30
+    max_tool_output_bytes: Optional[int] = 16000
+    shell_command_timeout: Optional[float] = 600
+    shell_command_max_output_bytes: Optional[int] = 50_000_000
+    homebrew_command_timeout: Optional[float] = 1800
+    git_command_timeout: Optional[float] = 1800
+    llm_cache: Optional[bool] = False
+    llm_cache_ttl_seconds: Optional[float] = 86400
+    llm_cache_max_entries: Optional[int] = 1000
     model_config = SettingsConfigDict(
         env_file=get_or_create_yada_config_file(),
         arbitrary_types_allowed=False,
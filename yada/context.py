@@ -0,0 +1,100 @@
+import json
+from typing import Callable, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+# rough per-message overhead for role and separators, in tokens
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def approximate_token_count(message: BaseMessage) -> int:
+    """
+    Estimate the tokens of a message at ~4 characters per token.
+    """
+    text = str(message.content)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        text += json.dumps(message.tool_calls, default=str)
+    return len(text) // 4 + _MESSAGE_OVERHEAD_TOKENS
+
+
+class ContextWindow:
+    """
+    Trims the oldest conversation turns so the messages sent to the model stay
+    within a token budget.
+
+    An AIMessage with tool calls and the ToolMessages answering it are kept or
+    dropped together, since the API rejects one without the other. Token counts
+    are cached per message ID, so each step only counts new messages.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int],
+        token_counter: Callable[[BaseMessage], int] = approximate_token_count,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        # message id -> (content length, token count)
+        self._token_counts: dict[str, tuple[int, int]] = {}
+
+    def count_tokens(self, message: BaseMessage) -> int:
+        content_length = len(str(message.content))
+        if message.id:
+            cached = self._token_counts.get(message.id)
+            if cached and cached[0] == content_length:
+                return cached[1]
+
+        try:
+            count = self.token_counter(message)
+        except Exception:
+            count = approximate_token_count(message)
+
+        if message.id:
+            self._token_counts[message.id] = (content_length, count)
+        return count
+
+    def trim(
+        self,
+        messages: Sequence[BaseMessage],
+        reserved_messages: Sequence[BaseMessage] = (),
+    ) -> list[BaseMessage]:
+        """
+        Return the most recent messages that fit in the budget left after the
+        `reserved_messages` (e.g. the system prompt). The latest turn is always
+        kept, even when it alone exceeds the budget.
+        """
+        if not self.max_tokens:
+            return list(messages)
+
+        budget = self.max_tokens - sum(self.count_tokens(m) for m in reserved_messages)
+        groups = _group_tool_calls(messages)
+
+        kept = []
+        total = 0
+        for group in reversed(groups):
+            tokens = sum(self.count_tokens(m) for m in group)
+            if kept and total + tokens > budget:
+                break
+            kept.append(group)
+            total += tokens
+
+        return [message for group in reversed(kept) for message in group]
+
+
+def _group_tool_calls(messages: Sequence[BaseMessage]) -> list[list[BaseMessage]]:
+    groups = []
+    for message in messages:
+        if (
+            isinstance(message, ToolMessage)
+            and groups
+            and _awaits_tool_result(groups[-1])
+        ):
+            groups[-1].append(message)
+        else:
+            groups.append([message])
+    return groups
+
+
+def _awaits_tool_result(group: list[BaseMessage]) -> bool:
+    first = group[0]
+    return isinstance(first, AIMessage) and bool(first.tool_calls)
@@ -0,0 +1,164 @@
+import json
+import sys
+import time
+from typing import IO, Callable, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from yada import utils
+from yada.agent import YadaAgent
+
+OUTPUT_FORMATS = ("text", "json", "jsonl")
+
+
+def read_answer(tool_calls: list[dict]) -> str:
+    """
+    Read the answer to a sensitive tool call confirmation from a stdin line.
+    No more input denies the calls.
+    """
+    return sys.stdin.readline().strip() or "n"
+
+
+class JsonOutput:
+    """
+    Runs a command and writes what happens as JSON events instead of
+    rendering it: `start`, `message`, `tool_call`, `tool_result`, `confirm`,
+    `confirmed` and `done`, or `error`.
+
+    With `jsonl` each event is written as one line as soon as the graph
+    produces it. With `json` the events are written as a single document
+    when the command finishes.
+
+    Every event has `elapsed_seconds` since the command started. Messages
+    and tool results also carry the `duration_seconds` of the node that
+    produced them, and messages their token `usage`.
+
+    Sensitive tool calls are confirmed by `confirm`, which gets the tool
+    calls and returns the same answer the chat accepts.
+    """
+
+    def __init__(
+        self,
+        agent: YadaAgent,
+        output: IO[str],
+        output_format: str = "jsonl",
+        confirm: Callable[[list[dict]], str] = read_answer,
+    ) -> None:
+        self.agent = agent
+        self.output = output
+        self.output_format = output_format
+        self.confirm = confirm
+
+        self._events = []
+        self._start = 0.0
+        self._usage = {"input_tokens": 0, "output_tokens": 0}
+        self._response = None
+
+    def run(self, command: str, config: dict) -> bool:
+        """
+        Run the command and return whether it succeeded.
+        """
+        self._events = []
+        self._start = time.perf_counter()
+        self._usage = {"input_tokens": 0, "output_tokens": 0}
+        self._response = None
+        thread_id = config["configurable"]["thread_id"]
+        self._emit("start", thread_id=thread_id, command=command)
+
+        try:
+            response = self._run_turn({"messages": [command]}, config)
+            self._emit(
+                "done", thread_id=thread_id, response=response, usage=self._usage
+            )
+            return True
+        except Exception as e:
+            self._emit("error", thread_id=thread_id, message=str(e))
+            return False
+        finally:
+            if self.output_format == "json":
+                json.dump({"events": self._events}, self.output, default=str)
+                self.output.write("\n")
+                self.output.flush()
+
+    def _run_turn(self, input: dict, config: dict) -> Optional[str]:
+        while True:
+            pending = self._stream(input, config)
+            if not pending:
+                return self._response
+
+            self._emit("confirm", tool_calls=pending)
+            answer = self.confirm(pending)
+            approved = answer.strip().lower() == "y"
+            self._emit("confirmed", approved=approved, answer=answer)
+            if approved:
+                input = None
+            else:
+                denied = utils.tool_call_denied_message(answer)
+                input = {
+                    "messages": [
+                        ToolMessage(tool_call_id=tc["id"], content=denied)
+                        for tc in pending
+                    ]
+                }
+
+    def _stream(self, input: dict, config: dict) -> list[dict]:
+        """
+        Emit the events of every message the graph adds and return the
+        sensitive tool calls the graph stopped for, if any.
+        """
+        pending = []
+        node_start = time.perf_counter()
+        for node, update in self.agent.stream_updates(input, config):
+            duration = round(time.perf_counter() - node_start, 6)
+            node_start = time.perf_counter()
+
+            pending = self.agent.pending_tool_calls(node, update)
+            for message in update.get("messages", []):
+                self._emit_message(node, message, duration)
+        return pending
+
+    def _emit_message(self, node: str, message, duration: float) -> None:
+        if isinstance(message, AIMessage):
+            usage = message.usage_metadata or {}
+            self._usage["input_tokens"] += usage.get("input_tokens", 0)
+            self._usage["output_tokens"] += usage.get("output_tokens", 0)
+            if not message.tool_calls:
+                self._response = message.content
+            self._emit(
+                "message",
+                id=message.id,
+                content=message.content,
+                duration_seconds=duration,
+                usage=usage or None,
+            )
+            for tool_call in message.tool_calls:
+                self._emit(
+                    "tool_call",
+                    id=tool_call["id"],
+                    name=tool_call["name"],
+                    args=tool_call["args"],
+                    sensitive=self.agent.is_sensitive_tool(tool_call["name"]),
+                )
+        elif isinstance(message, ToolMessage):
+            self._emit(
+                "tool_result",
+                tool_call_id=message.tool_call_id,
+                name=message.name,
+                content=message.content,
+                status=message.status,
+                node=node,
+                duration_seconds=duration,
+            )
+
+    def _emit(self, type: str, **fields) -> None:
+        event = {
+            "type": type,
+            "elapsed_seconds": round(time.perf_counter() - self._start, 6),
+            **fields,
+        }
+        if self.output_format == "json":
+            self._events.append(event)
+            return
+
+        self.output.write(json.dumps(event, default=str) + "\n")
+        self.output.flush()
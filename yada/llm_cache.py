@@ -0,0 +1,275 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+from uuid import uuid4
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.runnables.config import ensure_config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    generations TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at);
+CREATE TABLE IF NOT EXISTS llm_cache_bypassed_threads (
+    thread_id TEXT PRIMARY KEY
+);
+"""
+
+
+class YadaLLMCache(BaseCache):
+    """
+    LLM response cache with an in-memory LRU in front of a SQLite store.
+
+    Keys combine the model configuration and bound tool schemas (LangChain's
+    `llm_string`) with the prompt messages, normalized so message and tool call
+    IDs do not prevent hits. Entries expire after `ttl_seconds`, the memory LRU
+    holds `max_memory_entries` and the disk store is trimmed to
+    `max_disk_entries` least recently used entries.
+
+    Prompts that contain a call to one of `sensitive_tool_names` are never
+    served from or written to the cache, since the tool may have changed state.
+    The thread the prompt belongs to is marked as well, so the rest of it
+    bypasses the cache even after the call is trimmed from the context window.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sensitive_tool_names: Sequence[str] = (),
+        ttl_seconds: Optional[float] = 24 * 60 * 60,
+        max_memory_entries: int = 128,
+        max_disk_entries: int = 1000,
+    ) -> None:
+        self.path = str(path)
+        self.sensitive_tool_names = set(sensitive_tool_names)
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._bypassed_threads: set[str] = set()
+        self._lock = threading.RLock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._updates_since_eviction = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._connection is None:
+                self._connection = sqlite3.connect(
+                    self.path, check_same_thread=False, isolation_level=None
+                )
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.executescript(_SCHEMA)
+            return self._connection
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        if key is None:
+            self.bypassed += 1
+            return None
+
+        with self._lock:
+            generations = self._memory_lookup(key)
+            if generations is None:
+                generations = self._disk_lookup(key)
+
+            if generations is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=LangChainBetaWarning)
+            generations = [loads(g) for g in json.loads(generations)]
+        for generation in generations:
+            # a fresh ID keeps the cached message from replacing an earlier one
+            generation.message.id = None
+            _renew_tool_call_ids(generation.message)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        if key is None:
+            return
+
+        generations = json.dumps([dumps(g) for g in return_val])
+        now = time.time()
+        with self._lock:
+            self._memory_store(key, now, generations)
+            self._conn().execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?)",
+                (key, generations, now, now),
+            )
+            self._updates_since_eviction += 1
+            if self._updates_since_eviction >= 50:
+                self.evict()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn().execute("DELETE FROM llm_cache")
+
+    def evict(self) -> None:
+        """
+        Remove expired entries and trim the disk store to `max_disk_entries`.
+        """
+        with self._lock:
+            conn = self._conn()
+            if self.ttl_seconds is not None:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,),
+                )
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key NOT IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_disk_entries,),
+            )
+            self._updates_since_eviction = 0
+
+    def _is_thread_bypassed(self, thread_id: str) -> bool:
+        with self._lock:
+            if thread_id in self._bypassed_threads:
+                return True
+            row = (
+                self._conn()
+                .execute(
+                    "SELECT 1 FROM llm_cache_bypassed_threads WHERE thread_id = ?",
+                    (thread_id,),
+                )
+                .fetchone()
+            )
+            if row is not None:
+                self._bypassed_threads.add(thread_id)
+            return row is not None
+
+    def bypass_thread(self, thread_id: str) -> None:
+        """
+        Stop serving and storing responses for the thread, e.g. after one of
+        its sensitive tool calls ran.
+        """
+        with self._lock:
+            if thread_id in self._bypassed_threads:
+                return
+            self._bypassed_threads.add(thread_id)
+            self._conn().execute(
+                "INSERT OR IGNORE INTO llm_cache_bypassed_threads VALUES (?)",
+                (thread_id,),
+            )
+
+    def stats(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.bypassed} bypassed"
+
+    def _memory_lookup(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        created_at, generations = entry
+        if self._is_expired(created_at):
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return generations
+
+    def _disk_lookup(self, key: str) -> Optional[str]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT generations, created_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        generations, created_at = row
+        if self._is_expired(created_at):
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            return None
+
+        conn.execute(
+            "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+        )
+        self._memory_store(key, created_at, generations)
+        return generations
+
+    def _memory_store(self, key: str, created_at: float, generations: str) -> None:
+        self._memory[key] = (created_at, generations)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _is_expired(self, created_at: float) -> bool:
+        return (
+            self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+        )
+
+    def _key(self, prompt: str, llm_string: str) -> Optional[str]:
+        """
+        Return the cache key, or None if the prompt must not be cached.
+        """
+        thread_id = _current_thread_id()
+        if thread_id is not None and self._is_thread_bypassed(thread_id):
+            return None
+
+        key = self._prompt_key(prompt, llm_string)
+        if key is None and thread_id is not None:
+            self.bypass_thread(thread_id)
+        return key
+
+    def _prompt_key(self, prompt: str, llm_string: str) -> Optional[str]:
+        try:
+            messages = json.loads(prompt)
+        except json.JSONDecodeError:
+            return hashlib.sha256(f"{llm_string}\n{prompt}".encode()).hexdigest()
+
+        normalized = []
+        for message in messages:
+            kwargs = message.get("kwargs", {})
+            tool_calls = [
+                {"name": tc.get("name"), "args": tc.get("args")}
+                for tc in kwargs.get("tool_calls") or []
+            ]
+            if any(tc["name"] in self.sensitive_tool_names for tc in tool_calls):
+                return None
+
+            content = kwargs.get("content")
+            normalized.append(
+                {
+                    "type": message.get("id", [""])[-1],
+                    "content": content.strip() if isinstance(content, str) else content,
+                    "name": kwargs.get("name"),
+                    "tool_calls": tool_calls,
+                }
+            )
+
+        normalized_prompt = json.dumps(normalized, sort_keys=True, default=str)
+        return hashlib.sha256(f"{llm_string}\n{normalized_prompt}".encode()).hexdigest()
+
+
+def _current_thread_id() -> Optional[str]:
+    # the model runs inside the graph, whose config names the thread
+    return ensure_config().get("configurable", {}).get("thread_id")
+
+
+def _renew_tool_call_ids(message) -> None:
+    """
+    Give a cached message's tool calls new IDs, so they do not collide with
+    the calls and results of the response they were cached from.
+    """
+    raw_tool_calls = message.additional_kwargs.get("tool_calls") or []
+    for i, tool_call in enumerate(getattr(message, "tool_calls", None) or []):
+        tool_call["id"] = f"call_{uuid4().hex[:24]}"
+        if i < len(raw_tool_calls) and isinstance(raw_tool_calls[i], dict):
+            raw_tool_calls[i]["id"] = tool_call["id"]
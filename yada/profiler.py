@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# the profiler spans are recorded in, None unless `yada --profile` is used
+_profiler: Optional["Profiler"] = None
+
+
+class Profiler:
+    """
+    Records timed spans of a session: model calls, tool calls and rendering.
+
+    Each span records its wall time and the change in resident memory, plus
+    whatever the instrumented code adds to its args, such as token usage or
+    tool output bytes. Memory is process-wide, so deltas of spans running
+    concurrently overlap.
+    """
+
+    def __init__(self) -> None:
+        self.spans: list[dict] = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, category: str, name: str) -> Iterator[dict]:
+        args = {}
+        rss = _rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            if rss is not None:
+                args["memory_delta_bytes"] = _rss_bytes() - rss
+            with self._lock:
+                self.spans.append(
+                    {
+                        "category": category,
+                        "name": name,
+                        "start": start - self._start,
+                        "duration": end - start,
+                        "thread_id": threading.get_ident(),
+                        "args": args,
+                    }
+                )
+
+    def summary(self) -> list[dict]:
+        """
+        Aggregate the spans per category and name, slowest total first.
+        """
+        rows = {}
+        for span in self.spans:
+            key = (span["category"], span["name"])
+            row = rows.setdefault(
+                key,
+                {
+                    "category": span["category"],
+                    "name": span["name"],
+                    "count": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "output_bytes": 0,
+                    "memory_delta_bytes": 0,
+                },
+            )
+            row["count"] += 1
+            row["total_seconds"] += span["duration"]
+            row["max_seconds"] = max(row["max_seconds"], span["duration"])
+            for field in (
+                "prompt_tokens",
+                "completion_tokens",
+                "output_bytes",
+                "memory_delta_bytes",
+            ):
+                row[field] += span["args"].get(field, 0)
+
+        return sorted(rows.values(), key=lambda row: -row["total_seconds"])
+
+    def print_summary(self) -> None:
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="YADA profile")
+        for column in [
+            "Step",
+            "Calls",
+            "Total s",
+            "Mean s",
+            "Max s",
+            "Tokens in",
+            "Tokens out",
+            "Output",
+            "Memory",
+        ]:
+            table.add_column(column, justify="left" if column == "Step" else "right")
+
+        for row in self.summary():
+            table.add_row(
+                f"{row['category']}: {row['name']}",
+                str(row["count"]),
+                f"{row['total_seconds']:.3f}",
+                f"{row['total_seconds'] / row['count']:.3f}",
+                f"{row['max_seconds']:.3f}",
+                str(row["prompt_tokens"] or ""),
+                str(row["completion_tokens"] or ""),
+                _format_bytes(row["output_bytes"]),
+                _format_bytes(row["memory_delta_bytes"]),
+            )
+
+        table.caption = f"Session wall time {time.perf_counter() - self._start:.3f}s"
+        Console(stderr=True).print(table)
+
+    def chrome_trace(self) -> dict:
+        """
+        Return the spans in the Chrome trace event format, which can be opened
+        in chrome://tracing or https://ui.perfetto.dev.
+        """
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": span["name"],
+                    "cat": span["category"],
+                    "ph": "X",
+                    "ts": round(span["start"] * 1e6),
+                    "dur": round(span["duration"] * 1e6),
+                    "pid": pid,
+                    "tid": span["thread_id"],
+                    "args": span["args"],
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def enable() -> Profiler:
+    """
+    Start recording spans in a new profiler and return it.
+    """
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def disable() -> None:
+    global _profiler
+    _profiler = None
+
+
+@contextmanager
+def span(category: str, name: str) -> Iterator[dict]:
+    """
+    Time the block as a span of the enabled profiler. Yields a dict the block
+    can add measurements to; it is discarded when profiling is off.
+    """
+    profiler = _profiler
+    if profiler is None:
+        yield {}
+        return
+
+    with profiler.span(category, name) as args:
+        yield args
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _format_bytes(value: int) -> str:
+    if not value:
+        return ""
+    for unit in ["B", "KiB", "MiB"]:
+        if abs(value) < 1024:
+            return f"{value:.0f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
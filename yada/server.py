@@ -0,0 +1,181 @@
+import json
+import os
+import socket
+import socketserver
+from contextlib import contextmanager
+from typing import Iterator
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from yada import utils
+from yada.yada_cli import YadaCli
+
+
+class YadaServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Keeps a warm agent and serves `yada` commands over a Unix domain socket.
+
+    The protocol is newline-delimited JSON. A client sends
+    `{"type": "command", "prompt": ..., "thread_id": ..., "resume": ...,
+    "cwd": ..., "env": ...}` and receives `token`, `message`, `working` and
+    `confirm` events until `done` or `error`. A `confirm` event asks the
+    client to reply with `{"type": "confirm", "answer": ...}`, the same answer
+    the chat accepts.
+
+    Tools resolve paths against the process working directory and pass the
+    process environment to commands, so the agent runs with the client's
+    `cwd` and `env` and only one command runs it at a time. A
+    `change_directory` lasts until the client's command ends.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = str(socket_path)
+        _remove_stale_socket(self.socket_path)
+
+        self.yada_cli = YadaCli(thread_id=None)
+        super().__init__(self.socket_path, _YadaRequestHandler)
+        os.chmod(self.socket_path, 0o600)
+        self.tool_watcher = self.yada_cli._start_tool_watcher()
+
+    @property
+    def agent(self):
+        return self.yada_cli.agent
+
+    @contextmanager
+    def client_context(self, client: dict) -> Iterator[None]:
+        """
+        Run the agent in the client's working directory and environment, and
+        update `client["cwd"]` to where the tools left it. Also keeps the
+        tools from being reloaded meanwhile.
+        """
+        with self.yada_cli._turn_lock:
+            cwd = os.getcwd()
+            environ = dict(os.environ)
+            try:
+                os.chdir(client["cwd"])
+                os.environ.clear()
+                os.environ.update(client["env"])
+                yield
+            finally:
+                try:
+                    client["cwd"] = os.getcwd()
+                except FileNotFoundError:
+                    # the tools deleted it, the next step fails to enter it
+                    pass
+                os.environ.clear()
+                os.environ.update(environ)
+                os.chdir(cwd)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.tool_watcher:
+            self.tool_watcher.stop()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class _YadaRequestHandler(socketserver.StreamRequestHandler):
+    server: YadaServer
+
+    def handle(self) -> None:
+        request = self._receive()
+        if not request or request.get("type") != "command":
+            return
+
+        try:
+            if not request.get("cwd") or request.get("env") is None:
+                self._send(
+                    type="error",
+                    message="The client did not send its working directory.",
+                )
+                return
+            self._client = {"cwd": request["cwd"], "env": request["env"]}
+
+            thread_id = request.get("thread_id")
+            if request.get("resume") and not thread_id:
+                thread_id = self.server.yada_cli.checkpointer.latest_thread_id()
+            thread_id = thread_id or str(uuid4())
+            config = {"configurable": {"thread_id": thread_id}}
+
+            self._run_turn({"messages": [request["prompt"]]}, config)
+            self._send(type="done", thread_id=thread_id)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            self._send(type="error", message=str(e))
+
+    def _run_turn(self, input: dict, config: dict) -> None:
+        tool_calls = self._stream(input, config)
+
+        while tool_calls:
+            self._send(type="confirm", tool_calls=tool_calls)
+            response = self._receive()
+            if response is None:
+                # client went away, the thread stays interrupted like a quit chat
+                return
+
+            answer = response.get("answer", "")
+            if answer.strip().lower() == "y":
+                self._send(type="working")
+                input = None
+            else:
+                denied = utils.tool_call_denied_message(answer)
+                input = {
+                    "messages": [
+                        ToolMessage(tool_call_id=tc["id"], content=denied)
+                        for tc in tool_calls
+                    ]
+                }
+            tool_calls = self._stream(input, config)
+
+    def _stream(self, input: dict, config: dict) -> list[dict]:
+        with self.server.client_context(self._client):
+            return self._stream_updates(input, config)
+
+    def _stream_updates(self, input: dict, config: dict) -> list[dict]:
+        """
+        Send the messages the agent adds as they arrive. Returns the sensitive
+        tool calls the graph is interrupted for, if any.
+        """
+        agent = self.server.agent
+        pending = []
+        for node, update in agent.stream_updates(
+            input, config, on_token=self._send_token
+        ):
+            pending = agent.pending_tool_calls(node, update)
+            for message in update.get("messages", []):
+                if not isinstance(message, AIMessage):
+                    continue
+                if not message.tool_calls:
+                    self._send(type="message", id=message.id, content=message.content)
+                elif not agent.is_sensitive_tool_call_exist(message.tool_calls):
+                    self._send(type="working")
+        return pending
+
+    def _send_token(self, message: AIMessageChunk) -> None:
+        if isinstance(message.content, str) and message.content:
+            self._send(type="token", id=message.id, content=message.content)
+
+    def _send(self, **event) -> None:
+        self.wfile.write(json.dumps(event, default=str).encode() + b"\n")
+        self.wfile.flush()
+
+    def _receive(self) -> dict:
+        line = self.rfile.readline()
+        return json.loads(line) if line else None
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    if not os.path.exists(socket_path):
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            os.remove(socket_path)
+            return
+    raise RuntimeError(f"A YADA daemon is already listening on {socket_path}")
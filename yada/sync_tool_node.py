@@ -1,14 +1,20 @@
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from typing import (
     Any,
+    Optional,
     Union,
     cast,
 )
 
 from langchain_core.messages import (
     AnyMessage,
+    ToolMessage,
 )
 from langchain_core.runnables import RunnableConfig
 from langchain_core.runnables.config import (
+    ContextThreadPoolExecutor,
     get_config_list,
 )
 from langchain_core.tools import BaseTool
@@ -18,16 +24,37 @@ from langgraph.store.base import BaseStore
 
 from pydantic import BaseModel
 
+from yada import profiler
+
 from langgraph.prebuilt.tool_node import ToolNode, _get_state_args, _get_store_arg
 
+SEQUENTIAL_TOOL_METADATA_KEY = "yada_sequential"
+
 
 class SyncToolNode(ToolNode):
     """
     SyncToolNode is a ToolNode that runs tools synchronously.
+
+    By default tool calls run one after another. When `max_workers` is greater
+    than 1, independent tool calls run concurrently on a bounded thread pool.
+    Tools marked as sequential (see `yada.tools.sequential_tool`) act as a
+    barrier: everything before them finishes first and they run alone.
+    Outputs are always returned in the same order as the tool calls.
+
+    When the graph runs asynchronously, tool calls are gathered concurrently
+    using each tool's coroutine, with the same barrier and timeout rules.
     """
 
-    def __init__(self, tools: list, all_tools: list) -> None:
+    def __init__(
+        self,
+        tools: list,
+        all_tools: list,
+        max_workers: int = 1,
+        timeout: Optional[float] = None,
+    ) -> None:
         self.all_tools = all_tools
+        self.max_workers = max(1, max_workers or 1)
+        self.timeout = timeout
         super().__init__(tools)
 
         # add missing tools
@@ -52,10 +79,159 @@ class SyncToolNode(ToolNode):
     ) -> Any:
         tool_calls, output_type = self._parse_input(input, store)
         config_list = get_config_list(config, len(tool_calls))
-        # with get_executor_for_config(config) as executor:
-        #     outputs = [*executor.map(self._run_one, tool_calls, config_list)]
+
+        if self.max_workers == 1 and self.timeout is None:
+            outputs = []
+            for tool_call, tool_config in zip(tool_calls, config_list):
+                outputs.append(self._run_one(tool_call, tool_config))
+        else:
+            outputs = self._run_concurrently(tool_calls, config_list)
+
+        # TypedDict, pydantic, dataclass, etc. should all be able to load from dict
+        return outputs if output_type == "list" else {"messages": outputs}
+
+    async def _afunc(
+        self,
+        input: Union[
+            list[AnyMessage],
+            dict[str, Any],
+            BaseModel,
+        ],
+        config: RunnableConfig,
+        *,
+        store: BaseStore,
+    ) -> Any:
+        tool_calls, output_type = self._parse_input(input, store)
+        config_list = get_config_list(config, len(tool_calls))
+
+        # async tool calls are always gathered concurrently, sequential tools
+        # still act as a barrier between batches
         outputs = []
-        for tool_call, tool_config in zip(tool_calls, config_list):
-            outputs.append(self._run_one(tool_call, tool_config))
+        for batch in self._batch_tool_calls(tool_calls, config_list):
+            outputs.extend(
+                await asyncio.gather(
+                    *(
+                        self._arun_one_with_timeout(tool_call, tool_config)
+                        for tool_call, tool_config in batch
+                    )
+                )
+            )
+
         # TypedDict, pydantic, dataclass, etc. should all be able to load from dict
         return outputs if output_type == "list" else {"messages": outputs}
+
+    async def _arun_one_with_timeout(
+        self, call: dict, config: RunnableConfig
+    ) -> ToolMessage:
+        try:
+            return await asyncio.wait_for(
+                self._arun_one(call, config), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            return self._timeout_message(call)
+
+    def _run_concurrently(
+        self, tool_calls: list[dict], config_list: list[RunnableConfig]
+    ) -> list[ToolMessage]:
+        outputs = []
+        executor = ContextThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for batch in self._batch_tool_calls(tool_calls, config_list):
+                pending = [
+                    self._submit(executor, tool_call, tool_config)
+                    for tool_call, tool_config in batch
+                ]
+                for i, (tool_call, _) in enumerate(batch):
+                    future, started = pending[i]
+                    outputs.append(self._wait_for_result(tool_call, future, started))
+                    if future.done():
+                        continue
+
+                    # the timed out call keeps its worker, so move the calls
+                    # queued behind it to a new pool
+                    stuck = executor
+                    executor = ContextThreadPoolExecutor(max_workers=self.max_workers)
+                    for j in range(i + 1, len(batch)):
+                        if pending[j][0].cancel():
+                            pending[j] = self._submit(executor, *batch[j])
+                    stuck.shutdown(wait=False, cancel_futures=True)
+        finally:
+            # do not block on tool calls that timed out
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return outputs
+
+    def _submit(
+        self, executor: ContextThreadPoolExecutor, call: dict, config: RunnableConfig
+    ) -> tuple[Future, threading.Event]:
+        started = threading.Event()
+        return executor.submit(self._run_one_started, call, config, started), started
+
+    def _batch_tool_calls(
+        self, tool_calls: list[dict], config_list: list[RunnableConfig]
+    ) -> list[list[tuple[dict, RunnableConfig]]]:
+        batches = [[]]
+        for tool_call, tool_config in zip(tool_calls, config_list):
+            if self.is_sequential_tool(tool_call["name"]):
+                if batches[-1]:
+                    batches.append([])
+                batches[-1].append((tool_call, tool_config))
+                batches.append([])
+            else:
+                batches[-1].append((tool_call, tool_config))
+
+        return [batch for batch in batches if batch]
+
+    def _run_one(self, call: dict, config: RunnableConfig) -> ToolMessage:
+        with profiler.span("tool", call["name"]) as span:
+            message = super()._run_one(call, config)
+            span["output_bytes"] = _output_bytes(message)
+        return message
+
+    async def _arun_one(self, call: dict, config: RunnableConfig) -> ToolMessage:
+        with profiler.span("tool", call["name"]) as span:
+            message = await super()._arun_one(call, config)
+            span["output_bytes"] = _output_bytes(message)
+        return message
+
+    def _run_one_started(
+        self, call: dict, config: RunnableConfig, started: threading.Event
+    ) -> ToolMessage:
+        started.set()
+        return self._run_one(call, config)
+
+    def _wait_for_result(
+        self, tool_call: dict, future: Future, started: threading.Event
+    ) -> ToolMessage:
+        # the timeout applies to the tool call itself, not time spent queued;
+        # earlier calls are done or abandoned by now, so it starts soon
+        if not started.wait(timeout=self.timeout):
+            future.cancel()
+            return self._timeout_message(tool_call)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            return self._timeout_message(tool_call)
+
+    def _timeout_message(self, tool_call: dict) -> ToolMessage:
+        return ToolMessage(
+            content=(
+                f"Error: tool call timed out after {self.timeout} seconds.\n"
+                " please fix your mistakes."
+            ),
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"],
+        )
+
+    def is_sequential_tool(self, tool_name: str) -> bool:
+        tool_ = self.tools_by_name.get(tool_name)
+        if not tool_ or not tool_.metadata:
+            return False
+        return bool(tool_.metadata.get(SEQUENTIAL_TOOL_METADATA_KEY))
+
+
+def _output_bytes(message: ToolMessage) -> int:
+    content = message.content
+    if not isinstance(content, str):
+        content = str(content)
+    return len(content.encode())
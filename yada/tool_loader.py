@@ -1,30 +1,101 @@
-import os
+import copy
+import hashlib
 import importlib
 import importlib.util
 import inspect
+import json
+import os
 import pathlib
+import threading
 from types import ModuleType
+from typing import Any, Optional
 
-from langchain.tools import BaseTool
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, ConfigDict
 
 from yada import tools, custom_tools_dir
+from yada.config import YADA_TOOL_INDEX_PATH
+
+_INDEX_VERSION = 1
+
+# custom tool file path -> imported module, shared by the loader and lazy tools
+_custom_modules: dict[str, ModuleType] = {}
+_custom_modules_lock = threading.Lock()
 
 
 class ToolLoader:
-    def __init__(self):
+    def __init__(self, index_path: Optional[str] = YADA_TOOL_INDEX_PATH):
         self.safe_tools = []
         self.sensitive_tools = []
+        self.index_path = index_path
+        self.custom_tools_dir = None
+        self._builtin_tools = ([], [])
+        # custom tool file path -> the tools loaded from it
+        self._custom_tools: dict[str, list[BaseTool]] = {}
 
     def load(self) -> tuple[list[BaseTool], list[BaseTool]]:
-        safe_tools, sensitive_tools = self._categorize_tools(
-            tools, tools.get_tool_registry()
-        )
-        custom_safe_tools, custom_sensitive_tools = self._load_custom_tools(
-            os.environ.get("YADA_CUSTOM_TOOLS_DIR", custom_tools_dir())
-        )
+        self.custom_tools_dir = _custom_tools_dir()
+        self._builtin_tools = self._categorize_tools(tools, tools.get_tool_registry())
+        self._load_custom_tools(self.custom_tools_dir)
+        self._collect_tools()
+
+    def reload(self, paths: list[str]) -> None:
+        """
+        Re-index the given custom tool files and replace their tools, leaving
+        the tools from every other file untouched. Deleted files drop their
+        tools.
+        """
+        directory = _custom_tools_dir()
+        registry = tools.get_tool_registry()
+        index = self._read_index(directory)
+
+        for path in paths:
+            path = os.path.abspath(path)
+            for tool in self._custom_tools.pop(path, []):
+                registry.pop(tool.name, None)
+
+            if os.path.isfile(path):
+                index["files"][path] = self._index_file(path, _file_sha256(path))
+                self._custom_tools[path] = self._lazy_tools(path, index["files"][path])
+            else:
+                index["files"].pop(path, None)
+                with _custom_modules_lock:
+                    _custom_modules.pop(path, None)
+
+        self._write_index(index)
+        self._collect_tools()
+
+    def _collect_tools(self) -> None:
+        safe_tools, sensitive_tools = self._builtin_tools
+        self.safe_tools = []
+        self.sensitive_tools = []
+        seen = set()
+
+        registry = tools.get_tool_registry()
+        custom_tools = [t for ts in self._custom_tools.values() for t in ts]
+        for tool in safe_tools + sensitive_tools + custom_tools:
+            # modules importing other tool modules expose their tools twice
+            if tool.name in seen:
+                continue
+            seen.add(tool.name)
+
+            if registry.get(tool.name):
+                self.safe_tools.append(tool)
+            else:
+                self.sensitive_tools.append(tool)
 
-        self.safe_tools.extend(safe_tools + custom_safe_tools)
-        self.sensitive_tools.extend(sensitive_tools + custom_sensitive_tools)
+    def reindex(self) -> int:
+        """
+        Rebuild the custom tool index from scratch and return the number of
+        indexed tools.
+        """
+        directory = _custom_tools_dir()
+        index = {"version": _INDEX_VERSION, "directory": directory, "files": {}}
+        for path in _custom_tool_files(directory):
+            index["files"][path] = self._index_file(path, _file_sha256(path))
+        self._write_index(index)
+
+        return sum(len(entry["tools"]) for entry in index["files"].values())
 
     def _categorize_tools(
         self, module: object, registry: dict
@@ -45,36 +116,188 @@ class ToolLoader:
 
         return safe_tools, sensitive_tools
 
-    def _load_custom_tools(
-        self, directory: str
-    ) -> tuple[list[BaseTool], list[BaseTool]]:
-        safe_tools = []
-        sensitive_tools = []
+    def _load_custom_tools(self, directory: str) -> None:
+        """
+        Load the custom tools from the index, re-indexing only the files whose
+        size and mtime changed and whose content hash no longer matches. The
+        custom modules themselves are imported when one of their tools runs.
+        """
+        self._custom_tools = {}
+        if not directory:
+            return
 
-        if directory:
-
-            def load_user_functions(file_path):
-                spec_name = pathlib.Path(file_path).stem
-                spec = importlib.util.spec_from_file_location(spec_name, file_path)
-                custom_tools = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(custom_tools)
-                return custom_tools
-
-            tool_files = [
-                f
-                for f in os.listdir(directory)
-                if os.path.isfile(os.path.join(directory, f))
-                and f.endswith("_tools.py")
-            ]
-
-            for tool_file in tool_files:
-                custom_tools_module = load_user_functions(
-                    os.path.join(directory, tool_file)
-                )
-                safe, sensitive = self._categorize_tools(
-                    custom_tools_module, tools.get_tool_registry()
+        index = self._read_index(directory)
+        files = {}
+        changed = False
+        for path in _custom_tool_files(directory):
+            entry = index["files"].get(path)
+            stat = os.stat(path)
+            if not (
+                entry
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and entry["size"] == stat.st_size
+            ):
+                digest = _file_sha256(path)
+                if entry and entry["sha256"] == digest:
+                    entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                else:
+                    entry = self._index_file(path, digest)
+                changed = True
+            files[path] = entry
+
+        if changed or files.keys() != index["files"].keys():
+            index["files"] = files
+            self._write_index(index)
+
+        for path, entry in files.items():
+            self._custom_tools[path] = self._lazy_tools(path, entry)
+
+    def _lazy_tools(self, path: str, entry: dict) -> list[BaseTool]:
+        registry = tools.get_tool_registry()
+        lazy_tools = []
+        for tool_entry in entry["tools"]:
+            if tool_entry["safe"] is not None:
+                registry[tool_entry["name"]] = tool_entry["safe"]
+            lazy_tools.append(LazyTool.from_index_entry(path, tool_entry))
+        return lazy_tools
+
+    def _index_file(self, path: str, digest: str) -> dict:
+        registry = tools.get_tool_registry()
+        module = _import_custom_module(path, reload=True)
+
+        tool_entries = []
+        for name, obj in inspect.getmembers(module):
+            if isinstance(obj, BaseTool):
+                tool_entries.append(
+                    {
+                        "name": obj.name,
+                        "description": obj.description,
+                        "schema": obj.tool_call_schema.model_json_schema(),
+                        "safe": registry.get(obj.name),
+                        "metadata": _json_safe(obj.metadata or {}),
+                    }
                 )
-                safe_tools.extend(safe)
-                sensitive_tools.extend(sensitive)
 
-        return safe_tools, sensitive_tools
+        stat = os.stat(path)
+        return {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "tools": tool_entries,
+        }
+
+    def _read_index(self, directory: str) -> dict:
+        empty = {"version": _INDEX_VERSION, "directory": directory, "files": {}}
+        if not self.index_path:
+            return empty
+
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return empty
+
+        if (
+            index.get("version") != _INDEX_VERSION
+            or index.get("directory") != directory
+        ):
+            return empty
+        return index
+
+    def _write_index(self, index: dict) -> None:
+        if not self.index_path:
+            return
+
+        pathlib.Path(self.index_path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+
+class LazyTool(BaseTool):
+    """
+    Stand-in for a custom tool that was loaded from the index. It exposes the
+    indexed name, description and schema to the model and imports the custom
+    module on first call.
+    """
+
+    module_path: str
+    json_schema: dict
+
+    @classmethod
+    def from_index_entry(cls, module_path: str, entry: dict) -> "LazyTool":
+        return cls(
+            name=entry["name"],
+            description=entry["description"],
+            metadata=entry["metadata"] or None,
+            module_path=module_path,
+            json_schema=entry["schema"],
+        )
+
+    @property
+    def tool_call_schema(self) -> type[BaseModel]:
+        json_schema = self.json_schema
+
+        class IndexedSchema(BaseModel):
+            model_config = ConfigDict(extra="allow")
+
+            @classmethod
+            def model_json_schema(cls, *args, **kwargs) -> dict:
+                return copy.deepcopy(json_schema)
+
+        IndexedSchema.__name__ = self.name
+        return IndexedSchema
+
+    def load_tool(self) -> BaseTool:
+        module = _import_custom_module(self.module_path)
+        for _, obj in inspect.getmembers(module):
+            if isinstance(obj, BaseTool) and obj.name == self.name:
+                return obj
+        raise ValueError(f"Tool {self.name} not found in {self.module_path}")
+
+    def _run(self, **kwargs: Any) -> Any:
+        return self.load_tool().invoke(kwargs)
+
+    async def _arun(self, **kwargs: Any) -> Any:
+        return await self.load_tool().ainvoke(kwargs)
+
+
+def _custom_tools_dir() -> str:
+    return os.environ.get("YADA_CUSTOM_TOOLS_DIR", custom_tools_dir())
+
+
+def _custom_tool_files(directory: str) -> list[str]:
+    if not directory:
+        return []
+
+    return sorted(
+        os.path.abspath(os.path.join(directory, f))
+        for f in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, f)) and f.endswith("_tools.py")
+    )
+
+
+def _import_custom_module(path: str, reload: bool = False) -> ModuleType:
+    with _custom_modules_lock:
+        module = _custom_modules.get(path)
+        if module is None or reload:
+            spec_name = pathlib.Path(path).stem
+            spec = importlib.util.spec_from_file_location(spec_name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _custom_modules[path] = module
+        return module
+
+
+def _file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _json_safe(value: dict) -> dict:
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return {}
@@ -0,0 +1,161 @@
+import math
+import re
+from collections import Counter
+from typing import Iterable, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.tools import BaseTool
+
+# tools the model can always call, whatever the request
+ALWAYS_SELECTED_TOOLS = ("list_capabilities",)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = {
+    "a",
+    "an",
+    "and",
+    "are",
+    "args",
+    "be",
+    "bool",
+    "can",
+    "defaults",
+    "do",
+    "for",
+    "how",
+    "i",
+    "in",
+    "int",
+    "is",
+    "it",
+    "me",
+    "my",
+    "none",
+    "of",
+    "on",
+    "optional",
+    "please",
+    "str",
+    "that",
+    "the",
+    "this",
+    "to",
+    "what",
+    "with",
+    "you",
+}
+# words developers use for what the tool descriptions call something else
+_SYNONYMS = {
+    "brew": ["homebrew"],
+    "dir": ["directory"],
+    "folder": ["directory"],
+    "ls": ["list"],
+    "repo": ["repository"],
+    "rm": ["remove", "delete"],
+    "run": ["execute"],
+}
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOP_WORDS:
+            continue
+        # crude plural stemming so "containers" matches "container"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class ToolSelector:
+    """
+    Picks the tools relevant to the latest request with a BM25 index over tool
+    names and descriptions, so the model is not sent every tool schema on
+    every call.
+
+    The tools in `ALWAYS_SELECTED_TOOLS` and every tool already called in the
+    thread are always selected on top of the `top_k` best matches.
+    """
+
+    # BM25 parameters
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, tools: Sequence[BaseTool], top_k: int) -> None:
+        self.top_k = top_k
+        self.tool_names = [tool.name for tool in tools]
+
+        self._documents = []
+        for tool in tools:
+            # name tokens count twice, they are the most descriptive words
+            name_tokens = tokenize(tool.name.replace("_", " "))
+            self._documents.append(
+                Counter(name_tokens * 2 + tokenize(tool.description or ""))
+            )
+
+        self._lengths = [sum(doc.values()) for doc in self._documents]
+        self._average_length = sum(self._lengths) / max(len(self._lengths), 1)
+        document_frequency = Counter(token for doc in self._documents for token in doc)
+        self._idf = {
+            token: math.log(1 + (len(tools) - df + 0.5) / (df + 0.5))
+            for token, df in document_frequency.items()
+        }
+
+    def select(self, messages: Sequence[BaseMessage]) -> list[str]:
+        """
+        Return the names of the tools to bind for the next model call, in the
+        original tool order. All tools are returned if no tool matches the
+        latest request.
+        """
+        if len(self.tool_names) <= self.top_k:
+            return list(self.tool_names)
+
+        matches = self.rank(_latest_request(messages))
+        if not matches:
+            return list(self.tool_names)
+
+        selected = set(matches[: self.top_k])
+        selected.update(name for name in ALWAYS_SELECTED_TOOLS)
+        selected.update(_called_tools(messages))
+        return [name for name in self.tool_names if name in selected]
+
+    def rank(self, query: str) -> list[str]:
+        """
+        Return the names of the tools matching the query, best match first.
+        """
+        query_tokens = set(tokenize(query))
+        for token in list(query_tokens):
+            query_tokens.update(_SYNONYMS.get(token, []))
+
+        scores = []
+        for index, (doc, length) in enumerate(zip(self._documents, self._lengths)):
+            score = 0.0
+            for token in query_tokens:
+                frequency = doc.get(token)
+                if not frequency:
+                    continue
+                norm = self.K1 * (1 - self.B + self.B * length / self._average_length)
+                score += (
+                    self._idf[token] * frequency * (self.K1 + 1) / (frequency + norm)
+                )
+            if score > 0:
+                scores.append((-score, index))
+
+        return [self.tool_names[index] for _, index in sorted(scores)]
+
+
+def _latest_request(messages: Sequence[BaseMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return str(message.content)
+    return ""
+
+
+def _called_tools(messages: Iterable[BaseMessage]) -> set[str]:
+    return {
+        tool_call["name"]
+        for message in messages
+        if isinstance(message, AIMessage)
+        for tool_call in message.tool_calls
+    }
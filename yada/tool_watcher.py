@@ -0,0 +1,146 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Optional
+
+# inotify(7) event masks
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE
+_IN_EVENT_HEADER = struct.Struct("iIII")
+
+
+class ToolWatcher:
+    """
+    Watches a custom tools directory and calls `on_change` with the paths of
+    the `*_tools.py` files that were written, moved or deleted.
+
+    Uses inotify on Linux and falls back to polling file stats every
+    `poll_interval` seconds elsewhere. Changes arriving within `debounce`
+    seconds of each other are reported together, so an editor's
+    write-then-rename save triggers a single reload.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        on_change: Callable[[list[str]], None],
+        poll_interval: float = 1.0,
+        debounce: float = 0.2,
+    ) -> None:
+        self.directory = os.path.abspath(directory)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify_fd: Optional[int] = None
+
+    def start(self) -> None:
+        self._inotify_fd = _inotify_watch(self.directory)
+        if self._inotify_fd is not None:
+            target, args = self._watch_inotify, ()
+        else:
+            # snapshot before returning, so later changes are never missed
+            target, args = self._poll, (self._snapshot(),)
+        self._thread = threading.Thread(
+            target=target, args=args, name="yada-tool-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+    def _watch_inotify(self) -> None:
+        while not self._stop.is_set():
+            changed = self._read_inotify(timeout=self.poll_interval)
+            if not changed:
+                continue
+
+            # collect the rest of a burst of events before reloading
+            while more := self._read_inotify(timeout=self.debounce):
+                changed |= more
+            self._notify(changed)
+
+    def _read_inotify(self, timeout: float) -> set[str]:
+        ready, _, _ = select.select([self._inotify_fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self._inotify_fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            _, _, _, name_length = _IN_EVENT_HEADER.unpack_from(data, offset)
+            offset += _IN_EVENT_HEADER.size
+            name = data[offset : offset + name_length].rstrip(b"\0").decode()
+            offset += name_length
+            if name.endswith("_tools.py"):
+                changed.add(os.path.join(self.directory, name))
+        return changed
+
+    def _poll(self, snapshot: dict[str, tuple[int, int]]) -> None:
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            changed = {
+                path
+                for path in snapshot.keys() | current.keys()
+                if snapshot.get(path) != current.get(path)
+            }
+            snapshot = current
+            if changed:
+                self._notify(changed)
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return snapshot
+
+        for entry in entries:
+            if entry.name.endswith("_tools.py") and entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _notify(self, changed: set[str]) -> None:
+        try:
+            self.on_change(sorted(changed))
+        except Exception as e:
+            # a broken tool file must not kill the watcher
+            print(f"Failed to reload custom tools: {e}", file=sys.stderr)
+
+
+def _inotify_watch(directory: str) -> Optional[int]:
+    """
+    Return an inotify file descriptor watching `directory`, or None where
+    inotify is unavailable.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(directory), _IN_WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (AttributeError, OSError):
+        return None
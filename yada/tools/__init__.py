@@ -1,6 +1,28 @@
+import asyncio
+import atexit
 import json
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
 
-from langchain.tools import tool
+from langchain_core.tools import tool
+
+from yada.config import get_config
+from yada.sync_tool_node import SEQUENTIAL_TOOL_METADATA_KEY
+
+_OUTPUT_CHUNK_SIZE = 64 * 1024
+# seconds a spilled tool output is kept for read_tool_output
+_SPILL_FILE_MAX_AGE_SECONDS = 24 * 60 * 60
+# seconds a killed command gets to exit after SIGTERM before SIGKILL
+_KILL_GRACE_SECONDS = 2.0
 
 _tool_registry = {}
 
@@ -21,10 +43,442 @@ def sensitive_tool(*args, **kwargs):
     return structured_tool
 
 
+def sequential_tool(*args, **kwargs):
+    """
+    Mark a tool as changing process state, so it never runs concurrently with other tools.
+    """
+    structured_tool = args[0]
+    structured_tool.metadata = {
+        **(structured_tool.metadata or {}),
+        SEQUENTIAL_TOOL_METADATA_KEY: True,
+    }
+    return structured_tool
+
+
+def with_coroutine(coroutine):
+    """
+    Attach an async implementation to a tool, used when the agent runs asynchronously.
+    """
+
+    def decorator(structured_tool):
+        structured_tool.coroutine = coroutine
+        return structured_tool
+
+    return decorator
+
+
 def json2str(obj) -> str:
     return json.dumps(obj, indent=2, default=lambda obj: str(obj))
 
 
+class ToolOutput:
+    """
+    Collects a command's output or a log stream with bounded memory.
+
+    The first `head_bytes` and last `tail_bytes` are kept in memory. Once the
+    output outgrows both windows, everything is also written to a temp file
+    under `spill_dir()`, and `text()` replaces the middle with a note saying
+    how much was elided and where the full output is.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        if max_bytes is None:
+            max_bytes = get_config().max_tool_output_bytes
+        self.head_bytes = max_bytes // 4
+        self.tail_bytes = max_bytes - self.head_bytes
+        self.total_bytes = 0
+        self.spill_path = None
+
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._spill_file = None
+
+    def write(self, chunk: Union[bytes, str]) -> None:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if not chunk:
+            return
+
+        self.total_bytes += len(chunk)
+        if self._spill_file is None and self.total_bytes > (
+            self.head_bytes + self.tail_bytes
+        ):
+            self._spill()
+        if self._spill_file is not None:
+            self._spill_file.write(chunk)
+
+        head_room = self.head_bytes - len(self._head)
+        if head_room > 0:
+            self._head += chunk[:head_room]
+            chunk = chunk[head_room:]
+        self._tail += chunk
+        if len(self._tail) > self.tail_bytes:
+            del self._tail[: len(self._tail) - self.tail_bytes]
+
+    def close(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    @property
+    def elided_bytes(self) -> int:
+        return self.total_bytes - len(self._head) - len(self._tail)
+
+    def text(self) -> str:
+        self.close()
+        head = self._head.decode("utf-8", errors="replace")
+        tail = self._tail.decode("utf-8", errors="replace")
+        if not self.elided_bytes:
+            return head + tail
+
+        return (
+            f"{head}\n[... {self.elided_bytes} of {self.total_bytes} bytes elided. "
+            f"Full output saved to {self.spill_path}, "
+            "use read_tool_output to fetch more ...]\n"
+            f"{tail}"
+        )
+
+    def _spill(self) -> None:
+        _remove_old_spill_files()
+        fd, self.spill_path = tempfile.mkstemp(
+            prefix="output-", suffix=".log", dir=spill_dir()
+        )
+        self._spill_file = os.fdopen(fd, "wb")
+        # nothing has been dropped yet, so head + tail is everything so far
+        self._spill_file.write(self._head)
+        self._spill_file.write(self._tail)
+
+
+def spill_dir() -> str:
+    directory = os.path.join(tempfile.gettempdir(), "yada-output")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _remove_old_spill_files() -> None:
+    directory = spill_dir()
+    expired = time.time() - _SPILL_FILE_MAX_AGE_SECONDS
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < expired:
+                os.remove(path)
+        except OSError:
+            # removed by another YADA process
+            pass
+
+
+@dataclass
+class CommandResult:
+    """
+    How a command run with `run_command`, `astream_command` or
+    `execute_command` ended. `exit_code` is negative when the command was
+    killed by a signal. Only `execute_command` fills in `output`.
+    """
+
+    exit_code: int
+    duration_seconds: float
+    timed_out: bool = False
+    output_limit_exceeded: bool = False
+    output: str = ""
+
+    @property
+    def succeeded(self) -> bool:
+        return self.exit_code == 0 and not self.timed_out
+
+    def describe(self, command: str) -> str:
+        """
+        A one-line summary of how the command ended, for tool results.
+        """
+        if self.timed_out:
+            outcome = "timed out and was killed"
+        elif self.output_limit_exceeded:
+            outcome = "wrote too much output and was killed"
+        else:
+            outcome = f"exited with code {self.exit_code}"
+        return f"`{command}` {outcome} after {self.duration_seconds:.1f}s"
+
+
+# executable name -> how many commands running it may run at once, brew
+# holds a global lock so concurrent runs would only fail
+COMMAND_CONCURRENCY_LIMITS = {"brew": 1}
+
+_command_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_command_semaphores_lock = threading.Lock()
+
+
+# process groups of running commands, killed if YADA exits first
+_process_groups: set[int] = set()
+_process_groups_lock = threading.Lock()
+
+
+def run_command(
+    *args: str,
+    output: ToolOutput,
+    shell: bool = False,
+    stderr: bool = False,
+    timeout: Optional[float] = None,
+    max_output_bytes: Optional[int] = None,
+    echo: Optional[Callable[[bytes], None]] = None,
+    env: Optional[dict[str, str]] = None,
+) -> CommandResult:
+    """
+    Run a command, streaming its stdout into `output` and, when given, to
+    `echo` as it arrives. With `stderr`, stderr is interleaved with stdout;
+    otherwise it is discarded. `env` is added to the environment.
+
+    The command runs in its own process group with no stdin. The whole group
+    is killed when it runs longer than `timeout` seconds, writes more than
+    `max_output_bytes`, or the caller is interrupted.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        args[0] if shell else list(args),
+        shell=shell,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT if stderr else subprocess.DEVNULL,
+        start_new_session=True,
+        env={**os.environ, **env} if env else None,
+    )
+    _track_process_group(process.pid)
+    deadline = start + timeout if timeout is not None else None
+    result = CommandResult(exit_code=0, duration_seconds=0.0)
+
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(process.stdout, selectors.EVENT_READ)
+            while True:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        result.timed_out = True
+                        break
+                if not selector.select(remaining):
+                    continue
+
+                chunk = process.stdout.read1(_OUTPUT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                output.write(chunk)
+                if echo:
+                    echo(chunk)
+                if max_output_bytes and output.total_bytes > max_output_bytes:
+                    result.output_limit_exceeded = True
+                    break
+
+        # the command may outlive its stdout, e.g. after redirecting it
+        if not (result.timed_out or result.output_limit_exceeded):
+            try:
+                process.wait(
+                    timeout=(
+                        max(0.0, deadline - time.perf_counter())
+                        if deadline is not None
+                        else None
+                    )
+                )
+            except subprocess.TimeoutExpired:
+                result.timed_out = True
+    except BaseException:
+        _kill_process_group(process)
+        raise
+    finally:
+        if result.timed_out or result.output_limit_exceeded:
+            _kill_process_group(process)
+        process.stdout.close()
+        process.wait()
+        _untrack_process_group(process.pid)
+
+    result.exit_code = process.returncode
+    result.duration_seconds = time.perf_counter() - start
+    return result
+
+
+async def astream_command(
+    *args: str,
+    output: ToolOutput,
+    stderr: bool = False,
+    timeout: Optional[float] = None,
+    max_output_bytes: Optional[int] = None,
+    echo: Optional[Callable[[bytes], None]] = None,
+) -> CommandResult:
+    """
+    Async counterpart of `run_command`.
+    """
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT if stderr else asyncio.subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    _track_process_group(process.pid)
+    result = CommandResult(exit_code=0, duration_seconds=0.0)
+
+    async def read_output() -> None:
+        while chunk := await process.stdout.read(_OUTPUT_CHUNK_SIZE):
+            output.write(chunk)
+            if echo:
+                echo(chunk)
+            if max_output_bytes and output.total_bytes > max_output_bytes:
+                result.output_limit_exceeded = True
+                return
+        # the command may outlive its stdout, e.g. after redirecting it
+        await process.wait()
+
+    try:
+        await asyncio.wait_for(read_output(), timeout=timeout)
+    except asyncio.TimeoutError:
+        result.timed_out = True
+    except BaseException:
+        await _akill_process_group(process)
+        raise
+    finally:
+        if result.timed_out or result.output_limit_exceeded:
+            await _akill_process_group(process)
+        await process.wait()
+        _untrack_process_group(process.pid)
+
+    result.exit_code = process.returncode
+    result.duration_seconds = time.perf_counter() - start
+    return result
+
+
+def execute_command(
+    *args: str,
+    timeout: Optional[float] = None,
+    echo: Optional[Callable[[bytes], None]] = None,
+    env: Optional[dict[str, str]] = None,
+    interactive: bool = False,
+    stderr: bool = True,
+    max_bytes: Optional[int] = None,
+) -> CommandResult:
+    """
+    Run a command for a tool and return its result with the bounded,
+    interleaved stdout and stderr as `output`. Commands of an executable in
+    `COMMAND_CONCURRENCY_LIMITS` wait for a free slot first.
+
+    Without `stderr` only stdout is kept. `max_bytes` bounds the output kept
+    in memory, `max_tool_output_bytes` by default; output parsed by a tool
+    rather than shown to the model may need all of it.
+
+    Interactive commands, like installers asking for a password, share the
+    terminal instead: their output is not captured and Ctrl-C reaches them
+    directly.
+    """
+    with _command_slot(args[0]):
+        if interactive:
+            return _run_interactive(args, timeout=timeout, env=env)
+
+        output = ToolOutput(max_bytes)
+        result = run_command(
+            *args, output=output, stderr=stderr, timeout=timeout, echo=echo, env=env
+        )
+        result.output = output.text()
+        return result
+
+
+def _command_slot(executable: str):
+    name = os.path.basename(executable)
+    limit = COMMAND_CONCURRENCY_LIMITS.get(name)
+    if not limit:
+        return nullcontext()
+
+    with _command_semaphores_lock:
+        semaphore = _command_semaphores.get(name)
+        if semaphore is None:
+            semaphore = _command_semaphores[name] = threading.BoundedSemaphore(limit)
+    return semaphore
+
+
+def _run_interactive(
+    args: tuple[str, ...], timeout: Optional[float], env: Optional[dict[str, str]]
+) -> CommandResult:
+    start = time.perf_counter()
+    process = subprocess.Popen(list(args), env={**os.environ, **env} if env else None)
+    result = CommandResult(exit_code=0, duration_seconds=0.0)
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        result.timed_out = True
+        process.kill()
+        process.wait()
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+
+    result.exit_code = process.returncode
+    result.duration_seconds = time.perf_counter() - start
+    return result
+
+
+def terminal_echo() -> Optional[Callable[[bytes], None]]:
+    """
+    A writer echoing command output to stderr when it is a terminal, so the
+    user sees progress without it mixing into stdout.
+    """
+    if not sys.stderr.isatty():
+        return None
+
+    def echo(chunk: bytes) -> None:
+        sys.stderr.buffer.write(chunk)
+        sys.stderr.buffer.flush()
+
+    return echo
+
+
+def _kill_process_group(process: subprocess.Popen) -> None:
+    """
+    SIGTERM the command's process group, then SIGKILL whatever is left after
+    a grace period, so children of a shell command die with it.
+    """
+    _signal_process_group(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=_KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        pass
+    _signal_process_group(process.pid, signal.SIGKILL)
+
+
+async def _akill_process_group(process: asyncio.subprocess.Process) -> None:
+    _signal_process_group(process.pid, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=_KILL_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    _signal_process_group(process.pid, signal.SIGKILL)
+
+
+def _signal_process_group(pgid: int, signal_number: int) -> None:
+    try:
+        os.killpg(pgid, signal_number)
+    except ProcessLookupError:
+        pass
+
+
+def _track_process_group(pgid: int) -> None:
+    with _process_groups_lock:
+        _process_groups.add(pgid)
+
+
+def _untrack_process_group(pgid: int) -> None:
+    with _process_groups_lock:
+        _process_groups.discard(pgid)
+
+
+@atexit.register
+def _kill_process_groups() -> None:
+    # commands run in their own session, so Ctrl-C in the terminal does not
+    # reach them; make sure none outlive YADA
+    with _process_groups_lock:
+        pgids = list(_process_groups)
+    for pgid in pgids:
+        _signal_process_group(pgid, signal.SIGKILL)
+
+
 from yada.tools import (
     docker_tools,
     filesystem_tools,
@@ -1,7 +1,89 @@
-import docker
+import atexit
+import datetime
+import re
+import threading
+import time
 
-from langchain.tools import tool
-from yada.tools import safe_tool, sensitive_tool
+from langchain_core.tools import tool
+from yada.tools import ToolOutput, safe_tool, sensitive_tool
+
+_BUILT_IMAGE_ID = re.compile(r"(^Successfully built |sha256:)([0-9a-f]+)$")
+_RELATIVE_TIME = re.compile(r"^(\d+)([smhd])$")
+_TIME_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+# seconds between pings of the shared client, so a restarted daemon is noticed
+_HEALTH_CHECK_INTERVAL_SECONDS = 30
+# seconds a container or image listing is reused
+_LISTING_TTL_SECONDS = 5
+
+_client = None
+_client_checked_at = 0.0
+_client_lock = threading.Lock()
+
+_listings = {}
+_listings_lock = threading.Lock()
+
+
+def _docker_client():
+    """
+    Return the process-wide Docker client, creating it on first use.
+
+    The client keeps its HTTP connection pool between tool calls. It is pinged
+    at most every `_HEALTH_CHECK_INTERVAL_SECONDS` and recreated if the daemon
+    stopped answering, e.g. after a restart.
+    """
+    global _client, _client_checked_at
+
+    with _client_lock:
+        now = time.monotonic()
+        if (
+            _client is not None
+            and now - _client_checked_at > _HEALTH_CHECK_INTERVAL_SECONDS
+        ):
+            try:
+                _client.ping()
+                _client_checked_at = now
+            except Exception:
+                _close_client()
+
+        if _client is None:
+            # docker is imported on first tool execution to keep startup fast
+            import docker
+
+            _client = docker.from_env()
+            _client_checked_at = now
+        return _client
+
+
+def _close_client() -> None:
+    global _client
+
+    if _client is not None:
+        try:
+            _client.close()
+        except Exception:
+            pass
+        _client = None
+
+
+atexit.register(_close_client)
+
+
+def _cached_listing(name: str, list_fn) -> str:
+    with _listings_lock:
+        cached = _listings.get(name)
+        if cached and time.monotonic() - cached[0] < _LISTING_TTL_SECONDS:
+            return cached[1]
+
+    listing = list_fn()
+    with _listings_lock:
+        _listings[name] = (time.monotonic(), listing)
+    return listing
+
+
+def _invalidate_listings() -> None:
+    with _listings_lock:
+        _listings.clear()
 
 
 @sensitive_tool
@@ -17,13 +99,19 @@ def run_docker_container_image(
         command (str, optional): The command to run in the container. Defaults to None.
         detach (bool, optional): Whether to run the container in detached mode. Defaults to False.
     """
-    client = docker.from_env()
-    container_or_logs = client.containers.run(image, command, detach=detach)
+    client = _docker_client()
+    output = ToolOutput()
 
     if detach:
-        return f"Ran Docker container {container_or_logs.id} from image {image}.\nLOGS\n---\n{container_or_logs.logs()}"
+        container = client.containers.run(image, command, detach=True)
+        _invalidate_listings()
+        _collect(container.logs(stream=True, follow=False), output)
+        return f"Ran Docker container {container.id} from image {image}.\nLOGS\n---\n{output.text()}"
     else:
-        return f"Ran Docker container from image {image}.\nLOGS\n---\n{container_or_logs.decode('utf-8')}"
+        logs = client.containers.run(image, command, stream=True)
+        _invalidate_listings()
+        _collect(logs, output)
+        return f"Ran Docker container from image {image}.\nLOGS\n---\n{output.text()}"
 
 
 @safe_tool
@@ -32,8 +120,12 @@ def list_all_running_docker_containers() -> str:
     """
     List all running Docker containers.
     """
-    client = docker.from_env()
-    return "\n".join([str(container) for container in client.containers.list()])
+    return _cached_listing(
+        "containers",
+        lambda: "\n".join(
+            [str(container) for container in _docker_client().containers.list()]
+        ),
+    )
 
 
 @safe_tool
@@ -42,8 +134,10 @@ def list_all_docker_images() -> str:
     """
     List all Docker images.
     """
-    client = docker.from_env()
-    return "\n".join([str(image) for image in client.images.list()])
+    return _cached_listing(
+        "images",
+        lambda: "\n".join([str(image) for image in _docker_client().images.list()]),
+    )
 
 
 @sensitive_tool
@@ -56,11 +150,32 @@ def build_docker_image_from_dockerfile(directory: str = ".", tag: str = None) ->
         directory (str, optional): The directory containing the Dockerfile. Defaults to ".".
         tag (str, optional): The tag to assign to the image. Defaults to None.
     """
-    client = docker.from_env()
-    image, logs = client.images.build(path=directory, tag=tag)
-    logz = [log for log in logs]
+    from docker.errors import BuildError
+
+    client = _docker_client()
+    output = ToolOutput()
+    image_id = None
+    last_event = None
+
+    # the low-level API streams build events; `images.build` would keep them all
+    for event in client.api.build(path=directory, tag=tag, decode=True):
+        if "error" in event:
+            output.write(event["error"])
+            raise BuildError(event["error"], [{"stream": output.text()}])
+        if "stream" in event:
+            output.write(event["stream"])
+            match = _BUILT_IMAGE_ID.search(event["stream"].strip())
+            if match:
+                image_id = match.group(2)
+        last_event = event
+
+    if image_id is None:
+        raise BuildError(last_event or "Unknown", [{"stream": output.text()}])
+
+    _invalidate_listings()
+    image = client.images.get(image_id)
     return f"""Built Docker image {image.id}.
-    Logs: {logz}""".strip()
+    Logs: {output.text()}""".strip()
 
 
 @safe_tool
@@ -74,7 +189,7 @@ def execute_command_in_docker_container(container_id: str, command: str) -> str:
         command (str): The command to execute
     """
     try:
-        client = docker.from_env()
+        client = _docker_client()
         container = client.containers.get(container_id)
         exit_code, output = container.exec_run(cmd=command)
 
@@ -97,9 +212,10 @@ def stop_docker_container(container_id: str) -> str:
         container_id (str): The ID of the Docker container.
     """
     try:
-        client = docker.from_env()
+        client = _docker_client()
         container = client.containers.get(container_id)
         container.stop()
+        _invalidate_listings()
         return f"Stopped Docker container {container_id}."
     except Exception as e:
         return f"An error occurred: {e}"
@@ -115,9 +231,10 @@ def remove_docker_container(container_id: str) -> str:
         container_id (str): The ID of the Docker container.
     """
     try:
-        client = docker.from_env()
+        client = _docker_client()
         container = client.containers.get(container_id)
         container.remove()
+        _invalidate_listings()
         return f"Removed Docker container {container_id}."
     except Exception as e:
         return f"An error occurred: {e}"
@@ -134,8 +251,9 @@ def remove_docker_image(image_id: str, force: bool = False) -> str:
         force (bool, optional): Whether to force removal. Defaults to False.
     """
     try:
-        client = docker.from_env()
+        client = _docker_client()
         client.images.remove(image_id, force=force)
+        _invalidate_listings()
         return f"Removed Docker image {image_id}."
     except Exception as e:
         return f"An error occurred: {e}"
@@ -143,17 +261,58 @@ def remove_docker_image(image_id: str, force: bool = False) -> str:
 
 @safe_tool
 @tool
-def docker_logs(container_id: str) -> str:
+def docker_logs(
+    container_id: str,
+    tail: int = 200,
+    since: str = None,
+    until: str = None,
+    grep: str = None,
+    max_lines: int = 200,
+) -> str:
     """
     Get the logs of a Docker container.
 
+    Logs of long-running containers can be huge, so narrow them down instead of
+    reading everything: use `since`/`until` for the time of an incident, `tail`
+    for the most recent lines and `grep` for errors, e.g. to find out why a
+    container crashed use tail=500 and grep="error|exception|fatal|panic".
+
     Args:
         container_id (str): The ID of the Docker container.
+        tail (int, optional): Only read the last N lines of the log, -1 for all lines. Defaults to 200.
+        since (str, optional): Only read lines after this time, either relative ("30s", "15m", "2h", "1d"), an ISO 8601 timestamp or a Unix timestamp. Defaults to None.
+        until (str, optional): Only read lines before this time, in the same formats as `since`. Defaults to None.
+        grep (str, optional): Only return lines matching this case-insensitive regular expression. Defaults to None.
+        max_lines (int, optional): Stop reading after this many (matching) lines. Defaults to 200.
     """
     try:
-        client = docker.from_env()
+        client = _docker_client()
         container = client.containers.get(container_id)
-        return container.logs().decode("utf-8")
+        logs = container.logs(
+            stream=True,
+            follow=False,
+            tail=tail if tail is not None and tail >= 0 else "all",
+            since=_parse_log_time(since),
+            until=_parse_log_time(until),
+        )
+
+        pattern = re.compile(grep, re.IGNORECASE) if grep else None
+        output = ToolOutput()
+        lines = 0
+        try:
+            for line in _log_lines(logs):
+                if pattern and not pattern.search(line):
+                    continue
+                output.write(line)
+                lines += 1
+                if lines >= max_lines:
+                    output.write(f"[stopped after {max_lines} lines]\n")
+                    break
+        finally:
+            # stops the daemon from sending the rest of the log
+            logs.close()
+
+        return output.text() or "No matching log lines."
     except Exception as e:
         return f"An error occurred: {e}"
 
@@ -168,8 +327,46 @@ def docker_compose_up(compose_file: str = "docker-compose.yml") -> str:
         compose_file (str, optional): The Docker Compose file to use. Defaults to "docker-compose.yml".
     """
     try:
-        client = docker.from_env()
+        client = _docker_client()
         client.compose.up(compose_file)
+        _invalidate_listings()
         return "Ran docker-compose up."
     except Exception as e:
         return f"An error occurred: {e}"
+
+
+def _collect(chunks, output: ToolOutput) -> None:
+    for chunk in chunks:
+        output.write(chunk)
+
+
+def _log_lines(chunks):
+    """
+    Re-split streamed log chunks, which may hold partial lines, into lines.
+    """
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk.decode("utf-8", errors="replace")
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+    if buffer:
+        yield buffer + "\n"
+
+
+def _parse_log_time(value: str):
+    if value is None or value == "":
+        return None
+
+    value = str(value).strip()
+    match = _RELATIVE_TIME.match(value)
+    if match:
+        delta = datetime.timedelta(**{_TIME_UNITS[match.group(2)]: int(match.group(1))})
+        return datetime.datetime.now() - delta
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
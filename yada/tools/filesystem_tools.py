@@ -2,9 +2,9 @@ import os
 import shutil
 import pathlib
 
-from langchain.tools import tool
+from langchain_core.tools import tool
 
-from yada.tools import safe_tool, sensitive_tool, json2str
+from yada.tools import safe_tool, sensitive_tool, sequential_tool, json2str
 
 
 @safe_tool
@@ -17,6 +17,7 @@ def current_directory() -> str:
 
 
 @safe_tool
+@sequential_tool
 @tool
 def change_directory(directory: str) -> str:
     """
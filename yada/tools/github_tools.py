@@ -1,25 +1,215 @@
-from langchain.tools import tool
+import atexit
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional
 
-from yada.tools import sensitive_tool
+from langchain_core.tools import tool
 
-from git import Repo, GitCommandError
+from yada.config import YADA_GIT_CACHE_DIR, get_config
+from yada.tools import CommandResult, execute_command, sensitive_tool, terminal_echo
+
+# one lock per cached remote, so two clones do not fetch into it at once
+_reference_cache_locks: dict[str, threading.Lock] = {}
+_reference_cache_locks_lock = threading.Lock()
+
+# open repositories kept between tool calls, so GitPython's `git cat-file`
+# processes are started once per repository instead of once per call
+_MAX_CACHED_REPOSITORIES = 8
+
+
+class _CachedRepository:
+    def __init__(self, repo) -> None:
+        self.repo = repo
+        self.head = _read_head(repo.git_dir)
+        # GitPython repositories are not thread-safe
+        self.lock = threading.Lock()
+
+    def close(self) -> None:
+        with self.lock:
+            try:
+                self.repo.close()
+            except Exception:
+                pass
+
+
+# resolved path -> repository, least recently used first
+_repositories: "OrderedDict[str, _CachedRepository]" = OrderedDict()
+_repositories_lock = threading.Lock()
+
+
+def _git(*args: str, progress: bool = False) -> CommandResult:
+    """
+    Run a git command and raise with its output if it fails.
+    """
+    result = execute_command(
+        "git",
+        *args,
+        timeout=get_config().git_command_timeout,
+        echo=terminal_echo() if progress else None,
+    )
+    if not result.succeeded:
+        raise RuntimeError(
+            f"{result.describe('git ' + ' '.join(args))}\n{_last_lines(result.output)}"
+        )
+    return result
+
+
+def _last_lines(output: str, count: int = 20) -> str:
+    # progress output redraws its line with carriage returns
+    lines = [line.rsplit("\r", 1)[-1] for line in output.splitlines()]
+    return "\n".join(line for line in lines[-count:] if line.strip())
+
+
+def _reference_cache(git_url: str) -> str:
+    """
+    Return a bare repository holding the objects of `git_url`, created on
+    first use and fetched again before every later clone of the same remote.
+    """
+    name = os.path.basename(git_url.rstrip("/")).removesuffix(".git")
+    digest = hashlib.sha256(git_url.encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(YADA_GIT_CACHE_DIR, f"{name}-{digest}.git")
+
+    with _reference_cache_locks_lock:
+        lock = _reference_cache_locks.setdefault(path, threading.Lock())
+    with lock:
+        if os.path.isdir(path):
+            _git(
+                "-C",
+                path,
+                "fetch",
+                "--progress",
+                "--prune",
+                "--",
+                git_url,
+                "+refs/heads/*:refs/heads/*",
+                progress=True,
+            )
+        else:
+            os.makedirs(YADA_GIT_CACHE_DIR, exist_ok=True)
+            # clones borrow objects from the cache, so it must never drop any,
+            # even those only reachable from branches deleted upstream
+            _git(
+                "clone",
+                "--progress",
+                "--bare",
+                "--config",
+                "gc.auto=0",
+                "--config",
+                "gc.pruneExpire=never",
+                "--",
+                git_url,
+                path,
+                progress=True,
+            )
+    return path
+
+
+def _read_head(git_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+@contextmanager
+def _repository(repository_path: str) -> Iterator:
+    """
+    Use the cached repository at `repository_path`, opening it on first use.
+
+    At most `_MAX_CACHED_REPOSITORIES` stay open; the least recently used is
+    closed when another is opened. An entry whose HEAD was changed outside
+    YADA, e.g. by a checkout in the user's shell, is reopened.
+    """
+    from git import Repo
+
+    path = os.path.realpath(repository_path)
+    evicted = []
+    with _repositories_lock:
+        cached = _repositories.pop(path, None)
+        if cached is not None and _read_head(cached.repo.git_dir) != cached.head:
+            evicted.append(cached)
+            cached = None
+        if cached is None:
+            cached = _CachedRepository(Repo(path))
+        _repositories[path] = cached
+        while len(_repositories) > _MAX_CACHED_REPOSITORIES:
+            evicted.append(_repositories.popitem(last=False)[1])
+
+    for repository in evicted:
+        repository.close()
+
+    with cached.lock:
+        try:
+            yield cached.repo
+        finally:
+            # our own checkouts do not invalidate the entry
+            cached.head = _read_head(cached.repo.git_dir)
+
+
+def _close_repositories() -> None:
+    with _repositories_lock:
+        repositories = list(_repositories.values())
+        _repositories.clear()
+    for repository in repositories:
+        repository.close()
+
+
+atexit.register(_close_repositories)
 
 
 @sensitive_tool
 @tool
 def clone_github_repository_by_git_url(
-    git_url: str, to_path: str = ".", branch: str = "main"
+    git_url: str,
+    to_path: str = ".",
+    branch: str = "main",
+    depth: Optional[int] = None,
+    single_branch: bool = False,
+    filter: Optional[str] = None,
+    sparse_paths: Optional[list[str]] = None,
+    reference_cache: bool = False,
 ) -> str:
     """
-    Clone a GitHub repository by its git URL.
+    Clone a GitHub repository by its git URL. For big repositories prefer a
+    shallow, partial or sparse clone.
 
     Args:
         git_url (str): The git URL of the repository.
         to_path (str): The path to clone the repository to.
         branch (str): Optional, The branch to clone, default "main".
+        depth (int): Optional, Only fetch this many commits of history.
+        single_branch (bool): Optional, Only fetch the cloned branch, default False.
+        filter (str): Optional, A partial clone filter such as "blob:none", which fetches file contents on demand.
+        sparse_paths (list[str]): Optional, Only check out these directories.
+        reference_cache (bool): Optional, Borrow objects from a local cache of the remote that is kept across clones, default False.
     """
-    Repo.clone_from(git_url, to_path, branch=branch)
-    return f"Cloned the {branch} branch of the repository to {to_path}."
+    args = ["clone", "--progress", "--branch", branch]
+    if depth:
+        args += ["--depth", str(depth)]
+    if single_branch:
+        args.append("--single-branch")
+    if filter:
+        args.append(f"--filter={filter}")
+    if sparse_paths:
+        args.append("--sparse")
+
+    try:
+        if reference_cache:
+            args += ["--reference", _reference_cache(git_url)]
+        result = _git(*args, "--", git_url, to_path, progress=True)
+        if sparse_paths:
+            _git("-C", to_path, "sparse-checkout", "set", "--", *sparse_paths)
+    except Exception as e:
+        return f"An error occurred: {e}"
+
+    message = f"Cloned the {branch} branch of the repository to {to_path}"
+    if sparse_paths:
+        message += f", checking out only {', '.join(sparse_paths)}"
+    return f"{message} in {result.duration_seconds:.1f}s."
 
 
 @sensitive_tool
@@ -32,15 +222,17 @@ def checkout_github_repository_branch(branch: str, repository_path: str = ".") -
         branch (str): The branch to checkout.
         repository_path (str): The path to the repository, default ".".
     """
+    from git import GitCommandError
+
     try:
-        repo = Repo(repository_path)
-        if branch in repo.heads:
-            repo.git.checkout(branch)
-            return f"Checked out existing {branch} branch."
-        else:
-            new_branch = repo.create_head(branch)
-            new_branch.checkout()
-            return f"Created and checked out new {branch} branch."
+        with _repository(repository_path) as repo:
+            if branch in repo.heads:
+                repo.git.checkout(branch)
+                return f"Checked out existing {branch} branch."
+            else:
+                new_branch = repo.create_head(branch)
+                new_branch.checkout()
+                return f"Created and checked out new {branch} branch."
     except GitCommandError as e:
         return f"An error occurred: {e}"
 
@@ -57,9 +249,11 @@ def delete_local_github_repository_branch(
         branch (str): The branch to delete.
         repository_path (str): The path to the repository, default ".".
     """
+    from git import GitCommandError
+
     try:
-        repo = Repo(repository_path)
-        repo.git.branch("-D", branch)
+        with _repository(repository_path) as repo:
+            repo.git.branch("-D", branch)
         return f"Deleted local branch {branch}."
     except GitCommandError as e:
         return f"An error occurred: {e}"
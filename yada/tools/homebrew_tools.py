@@ -1,45 +1,150 @@
-import os
-import subprocess
+import asyncio
+import json
+import re
+import sys
+import threading
+from typing import Optional
 
-from langchain.tools import tool
+from langchain_core.tools import tool
 
-from yada.tools import os_tools, safe_tool, sensitive_tool
+from yada.config import get_config
+from yada.tools import (
+    CommandResult,
+    execute_command,
+    os_tools,
+    safe_tool,
+    sensitive_tool,
+    terminal_echo,
+    with_coroutine,
+)
+
+# run through /bin/sh, the installer asks for a password on the terminal
+_INSTALL_HOMEBREW_COMMAND = '/bin/bash -c "$(curl -fsSL https://raw.githubusercontent.com/Homebrew/install/HEAD/install.sh)"'
+
+# package name -> installed versions from `brew list --versions`, loaded on
+# first use and refreshed after YADA installs or uninstalls something
+_installed_packages: Optional[dict[str, list[str]]] = None
+_installed_packages_lock = threading.Lock()
+
+# brew updates itself before installing, once per session is enough
+_auto_updated = False
+
+
+def _brew(
+    *args: str, progress: bool = False, check: bool = True, **kwargs
+) -> CommandResult:
+    """
+    Run a brew command, one at a time, and raise if it fails unless `check`
+    is off. Installs after the first one skip brew's auto-update.
+    """
+    global _auto_updated
+    install = args[0] == "install"
+    result = execute_command(
+        "brew",
+        *args,
+        timeout=get_config().homebrew_command_timeout,
+        echo=terminal_echo() if progress else None,
+        env={"HOMEBREW_NO_AUTO_UPDATE": "1"} if install and _auto_updated else None,
+        **kwargs,
+    )
+    if install and result.succeeded:
+        _auto_updated = True
+    if check and not result.succeeded:
+        raise RuntimeError(
+            f"{result.describe('brew ' + ' '.join(args))}\n{result.output}"
+        )
+    return result
+
+
+def _installed_package_versions() -> dict[str, list[str]]:
+    global _installed_packages
+    with _installed_packages_lock:
+        if _installed_packages is None:
+            _installed_packages = _list_versions()
+        return _installed_packages
+
+
+def _refresh_installed_packages() -> None:
+    global _installed_packages
+    with _installed_packages_lock:
+        _installed_packages = None
+        try:
+            _installed_packages = _list_versions()
+        except Exception:
+            # loaded again on the next listing
+            pass
+
+
+def _list_versions() -> dict[str, list[str]]:
+    # parsed rather than shown to the model, so keep all of it and no warnings
+    result = _brew("list", "--versions", stderr=False, max_bytes=sys.maxsize)
+    return _parse_versions(result.output)
+
+
+def _parse_versions(output: str) -> dict[str, list[str]]:
+    packages = {}
+    for line in output.splitlines():
+        if line.strip():
+            name, *versions = line.split()
+            packages[name] = versions
+    return packages
+
+
+def _install_homebrew() -> str:
+    result = execute_command(
+        "/bin/sh",
+        "-c",
+        _INSTALL_HOMEBREW_COMMAND,
+        timeout=get_config().homebrew_command_timeout,
+        interactive=True,
+    )
+    if not result.succeeded:
+        return f"An error occurred: {result.describe('Homebrew install script')}"
+    return "Homebrew installation complete."
+
+
+async def _ainstall_homebrew():
+    return await asyncio.to_thread(_install_homebrew)
 
 
 @sensitive_tool
+@with_coroutine(_ainstall_homebrew)
 @tool
 def install_homebrew():
     """
     Install Homebrew package manager.
     """
-    try:
-        os.system(
-            '/bin/bash -c "$(curl -fsSL https://raw.githubusercontent.com/Homebrew/install/HEAD/install.sh)"'
-        )
-        return "Homebrew installation complete."
-    except subprocess.CalledProcessError as e:
-        return f"An error occurred: {e}"
+    return _install_homebrew()
+
+
+async def _alist_homebrew_packages():
+    return await asyncio.to_thread(list_homebrew_packages.func)
 
 
 @safe_tool
+@with_coroutine(_alist_homebrew_packages)
 @tool
 def list_homebrew_packages():
     """
-    List the installed Homebrew packages.
+    List the installed Homebrew packages and their versions.
     """
     try:
-        result = subprocess.run(
-            ["brew", "list"],
-            check=True,
-            capture_output=True,
-            text=True,
+        packages = _installed_package_versions()
+        if not packages:
+            return "No Homebrew packages are installed."
+        return "\n".join(
+            f"{name} {' '.join(versions)}" for name, versions in packages.items()
         )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         return f"An error occurred: {e}"
 
 
+async def _ainstall_homebrew_package(package: str):
+    return await asyncio.to_thread(install_homebrew_package.func, package)
+
+
 @safe_tool
+@with_coroutine(_ainstall_homebrew_package)
 @tool
 def install_homebrew_package(package: str):
     """
@@ -49,16 +154,22 @@ def install_homebrew_package(package: str):
         package (str): The package to install.
     """
     try:
-        subprocess.run(
-            ["brew", "install", package],
-            check=True,
+        result = _brew("install", package, progress=True)
+        _refresh_installed_packages()
+        return (
+            f"Installed Homebrew package: {package} "
+            f"in {result.duration_seconds:.1f}s"
         )
-        return f"Installed Homebrew package: {package}"
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         return f"An error occurred: {e}"
 
 
+async def _auninstall_homebrew_package(package: str):
+    return await asyncio.to_thread(uninstall_homebrew_package.func, package)
+
+
 @sensitive_tool
+@with_coroutine(_auninstall_homebrew_package)
 @tool
 def uninstall_homebrew_package(package: str):
     """
@@ -68,33 +179,209 @@ def uninstall_homebrew_package(package: str):
         package (str): The package to uninstall.
     """
     try:
-        subprocess.run(
-            ["brew", "uninstall", package],
-            check=True,
+        result = _brew("uninstall", package, progress=True)
+        _refresh_installed_packages()
+        return (
+            f"Uninstalled Homebrew package: {package} "
+            f"in {result.duration_seconds:.1f}s"
         )
-        return f"Uninstalled Homebrew package: {package}"
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
+        return f"An error occurred: {e}"
+
+
+def _canonical_names(packages: list[str]) -> dict[str, str]:
+    """
+    Map each package to the name `brew list` shows it under, resolving
+    aliases, old names and tap-qualified names with `brew info`.
+    """
+    result = _brew(
+        "info",
+        "--json=v2",
+        *packages,
+        check=False,
+        stderr=False,
+        max_bytes=sys.maxsize,
+    )
+    if not result.succeeded and len(packages) > 1:
+        # one unknown name fails the whole lookup
+        names = {}
+        for package in packages:
+            names.update(_canonical_names([package]))
+        return names
+
+    known = []
+    if result.succeeded:
+        info = json.loads(result.output)
+        for formula in info.get("formulae", []):
+            known.append(
+                (
+                    formula["name"],
+                    {
+                        formula["name"],
+                        formula.get("full_name"),
+                        *formula.get("aliases", []),
+                        *formula.get("oldnames", []),
+                    },
+                )
+            )
+        for cask in info.get("casks", []):
+            known.append(
+                (
+                    cask["token"],
+                    {
+                        cask["token"],
+                        cask.get("full_token"),
+                        *cask.get("old_tokens", []),
+                    },
+                )
+            )
+
+    names = {}
+    for package in packages:
+        short_name = package.rsplit("/", 1)[-1]
+        names[package] = next(
+            (name for name, aliases in known if package in aliases), short_name
+        )
+    return names
+
+
+def _package_errors(output: str, package: str, name: str) -> list[str]:
+    errors = []
+    for line in output.splitlines():
+        if line.startswith("Error:"):
+            words = set(re.split(r"[\s\"'`:,]+", line))
+            if package in words or name in words:
+                errors.append(line)
+    return errors
+
+
+def _package_statuses(
+    command: str,
+    packages: list[str],
+    result: CommandResult,
+    installed: Optional[dict[str, list[str]]],
+) -> list[str]:
+    try:
+        names = _canonical_names(packages)
+    except Exception:
+        names = {package: package for package in packages}
+
+    statuses = []
+    for package in packages:
+        name = names[package]
+        errors = _package_errors(result.output, package, name)
+        listed_as = f" as {name}" if name != package else ""
+        if errors:
+            status = f"failed: {errors[0].removeprefix('Error:').strip()}"
+        elif installed is None:
+            status = "unknown"
+        elif name in installed:
+            versions = " ".join(installed[name])
+            if command == "install":
+                status = f"installed{listed_as} {versions}"
+            else:
+                status = f"still installed{listed_as} {versions}"
+        elif command == "install":
+            status = "not installed"
+        else:
+            status = "uninstalled"
+        statuses.append(f"{package}: {status}")
+    return statuses
+
+
+def _batch_report(command: str, packages: list[str], result: CommandResult) -> str:
+    try:
+        installed = _installed_package_versions()
+    except Exception:
+        installed = None
+
+    lines = [
+        f"brew {command} of {len(packages)} packages took "
+        f"{result.duration_seconds:.1f}s:",
+        *_package_statuses(command, packages, result, installed),
+    ]
+    if not result.succeeded:
+        description = result.describe(f"brew {command} {' '.join(packages)}")
+        lines += [f"An error occurred: {description}", result.output.rstrip()]
+    return "\n".join(lines)
+
+
+async def _ainstall_homebrew_packages(packages: list[str]):
+    return await asyncio.to_thread(install_homebrew_packages.func, packages)
+
+
+@safe_tool
+@with_coroutine(_ainstall_homebrew_packages)
+@tool
+def install_homebrew_packages(packages: list[str]):
+    """
+    Install several Homebrew packages with a single brew command. Prefer this
+    over installing packages one at a time.
+
+    Args:
+        packages (list[str]): The packages to install.
+    """
+    if not packages:
+        return "No packages to install."
+    try:
+        result = _brew("install", *packages, progress=True, check=False)
+        _refresh_installed_packages()
+        return _batch_report("install", packages, result)
+    except Exception as e:
         return f"An error occurred: {e}"
 
 
+async def _auninstall_homebrew_packages(packages: list[str]):
+    return await asyncio.to_thread(uninstall_homebrew_packages.func, packages)
+
+
+@sensitive_tool
+@with_coroutine(_auninstall_homebrew_packages)
+@tool
+def uninstall_homebrew_packages(packages: list[str]):
+    """
+    Uninstall several Homebrew packages with a single brew command.
+
+    Args:
+        packages (list[str]): The packages to uninstall.
+    """
+    if not packages:
+        return "No packages to uninstall."
+    try:
+        result = _brew("uninstall", *packages, progress=True, check=False)
+        _refresh_installed_packages()
+        return _batch_report("uninstall", packages, result)
+    except Exception as e:
+        return f"An error occurred: {e}"
+
+
+async def _ahomebrew_doctor() -> str:
+    return await asyncio.to_thread(homebrew_doctor.func)
+
+
 @safe_tool
+@with_coroutine(_ahomebrew_doctor)
 @tool
 def homebrew_doctor() -> str:
     """
     Run the Homebrew doctor command.
     """
     try:
-        result = subprocess.run(
-            ["brew", "doctor"],
-            check=True,
-            capture_output=True,
-            text=True,
+        # brew doctor exits with 1 when it has warnings, which are the point
+        result = execute_command(
+            "brew", "doctor", timeout=get_config().homebrew_command_timeout
         )
-        return f"""
+        if result.timed_out:
+            return f"An error occurred: {result.describe('brew doctor')}"
+        return _format_doctor_output(result.output)
+    except Exception as e:
+        return f"An error occurred: {e}"
+
+
+def _format_doctor_output(stdout: str) -> str:
+    return f"""
         BREW DOCTOR OUTPUT:
         ```
-        {result.stdout}
+        {stdout}
         ```
         """
-    except subprocess.CalledProcessError as e:
-        return f"An error occurred: {e}"
@@ -1,9 +1,19 @@
 import os
 import platform
-import subprocess
 
-from langchain.tools import tool
-from yada.tools import safe_tool, sensitive_tool
+from langchain_core.tools import tool
+from yada.config import get_config
+from yada.tools import (
+    CommandResult,
+    ToolOutput,
+    astream_command,
+    run_command,
+    safe_tool,
+    sensitive_tool,
+    spill_dir,
+    terminal_echo,
+    with_coroutine,
+)
 
 
 @safe_tool
@@ -40,22 +50,87 @@ def _get_shell_path() -> str:
     return os.getenv("SHELL")
 
 
+async def _aexecute_shell_command(command: str) -> str:
+    config = get_config()
+    output = ToolOutput()
+    result = await astream_command(
+        "/bin/sh",
+        "-c",
+        command,
+        output=output,
+        stderr=True,
+        timeout=config.shell_command_timeout,
+        max_output_bytes=config.shell_command_max_output_bytes,
+        echo=terminal_echo(),
+    )
+    return _format_command_output(output.text(), result)
+
+
 @sensitive_tool
+@with_coroutine(_aexecute_shell_command)
 @tool
 def execute_shell_command(command: str) -> str:
     """
-    Execute a shell command.
+    Execute a shell command. Returns its interleaved stdout and stderr, exit
+    code and duration.
 
     Args:
         command (str): The command to execute.
     """
-    command_output = subprocess.run(
-        command, shell=True, capture_output=True
-    ).stdout.decode("utf-8")
+    config = get_config()
+    output = ToolOutput()
+    result = run_command(
+        command,
+        output=output,
+        shell=True,
+        stderr=True,
+        timeout=config.shell_command_timeout,
+        max_output_bytes=config.shell_command_max_output_bytes,
+        echo=terminal_echo(),
+    )
+
+    return _format_command_output(output.text(), result)
+
+
+def _format_command_output(command_output: str, result: CommandResult) -> str:
+    status = f"Exit code: {result.exit_code}, duration: {result.duration_seconds:.2f}s"
+    if result.timed_out:
+        status += ". Timed out, the command was killed"
+    elif result.output_limit_exceeded:
+        status += ". Too much output, the command was killed"
 
     return f"""
     Command Output
     ```
     {command_output}
     ```
+    {status}
+    """
+
+
+@safe_tool
+@tool
+def read_tool_output(path: str, offset: int = 0, length: int = 8000) -> str:
     """
+    Read part of a tool output that was too long to return in full.
+
+    Args:
+        path (str): The file the full output was saved to.
+        offset (int, optional): The byte offset to start reading at. Defaults to 0.
+        length (int, optional): The number of bytes to read, at most max_tool_output_bytes. Defaults to 8000.
+    """
+    # reading it all back would defeat the bound on tool output
+    offset = max(0, offset)
+    length = max(0, min(length, get_config().max_tool_output_bytes))
+    try:
+        path = os.path.realpath(path)
+        if os.path.dirname(path) != os.path.realpath(spill_dir()):
+            return f"Not a saved tool output: {path}"
+
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(offset)
+            chunk = f.read(length).decode("utf-8", errors="replace")
+        return f"Bytes {offset}-{min(offset + length, size)} of {size}\n{chunk}"
+    except Exception as e:
+        return f"An error occurred: {e}"
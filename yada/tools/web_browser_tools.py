@@ -1,6 +1,4 @@
-import webbrowser
-
-from langchain.tools import tool
+from langchain_core.tools import tool
 
 from yada.tools import safe_tool
 
@@ -18,6 +16,8 @@ def open_url_in_browser(
         new_window (bool): Optional, Open the URL in a new window, default False.
         new_tab (bool): Optional, Open the URL in a new tab, default False.
     """
+    import webbrowser
+
     if new_window:
         webbrowser.open_new(url)
     elif new_tab:
@@ -1,51 +1,177 @@
-import time
+import functools
+import sys
+import threading
 
 from rich.console import Console
+from rich.live import Live
 from rich.markdown import Markdown
 from rich.text import Text
 
-from langchain_core.messages import ToolMessage
-from langchain_core.runnables import RunnableLambda
-
-from langgraph.prebuilt.tool_node import ToolNode
-
 USER_TEXT = Text("YOU: ", style="bold green")
 AGENT_TEXT = Text("YADA: ", style="bold blue")
 
+_console = None
+_console_lock = threading.Lock()
+
+
+def get_console() -> Console:
+    """
+    The console all output goes through. Terminal detection and setup happen
+    once instead of on every printed line.
+    """
+    global _console
+    if _console is None:
+        with _console_lock:
+            if _console is None:
+                _console = Console()
+    return _console
+
+
+def is_plain_output() -> bool:
+    """
+    True when output is piped or redirected, so text is written as is without
+    Markdown rendering, colors or progress lines. FORCE_COLOR forces rendering.
+    """
+    return not get_console().is_terminal
+
+
+def _write_plain(*parts: str) -> None:
+    # one write per line of output, without rich's rendering pipeline
+    stdout = sys.stdout
+    stdout.write("".join(parts))
+    stdout.flush()
+
 
 def print_text(text: str, style: str = None) -> None:
-    console = Console()
-    console.print(text, style=style)
+    if is_plain_output():
+        _write_plain(str(text), "\n")
+        return
+
+    get_console().print(text, style=style)
 
 
 def print_markdown(
     markdown: str, prepend_text: Text = None, style: str = None, end: str = None
 ) -> None:
-    console = Console()
-    if prepend_text:
-        console.print(prepend_text, end="")
-    console.print(Markdown(markdown.strip()), style=style, end=end)
+    if is_plain_output():
+        prefix = prepend_text.plain if prepend_text else ""
+        _write_plain(prefix, markdown.strip(), "\n" if end is None else end)
+        return
+
+    console = get_console()
+    # buffered, so the prefix and the rendered Markdown go out in one write
+    with console:
+        if prepend_text:
+            console.print(prepend_text, end="")
+        console.print(Markdown(markdown.strip()), style=style, end=end)
+
+
+def print_static(text: str, markdown: bool = False, style: str = None) -> None:
+    """
+    Print content that never changes, like the title banner. It is rendered
+    once per terminal width and the rendered output is reused.
+    """
+    if is_plain_output():
+        _write_plain(text.lstrip("\n").rstrip(), "\n")
+        return
+
+    _write_plain(_render_static(text, markdown, style, get_console().width))
+
+
+@functools.lru_cache(maxsize=16)
+def _render_static(text: str, markdown: bool, style: str, width: int) -> str:
+    console = get_console()
+    with console.capture() as capture:
+        console.print(Markdown(text.strip()) if markdown else text, style=style)
+    return capture.get()
 
 
 def agent_response(text: str, end: str = None) -> None:
     print_markdown(text, prepend_text=AGENT_TEXT, end=end)
 
 
+class AgentResponseStream:
+    """
+    Renders an agent response incrementally as Markdown while tokens arrive.
+    Piped output gets the raw tokens as they arrive instead.
+    """
+
+    def __init__(self) -> None:
+        self._console = get_console()
+        self._live = None
+        self._parts = []
+
+    def write(self, token: str) -> None:
+        if is_plain_output():
+            if not self._parts:
+                token = AGENT_TEXT.plain + token
+            self._parts.append(token)
+            _write_plain(token)
+            return
+
+        if self._live is None:
+            self._console.print(AGENT_TEXT, end="")
+            self._live = Live(
+                console=self._console,
+                refresh_per_second=12,
+                vertical_overflow="visible",
+            )
+            self._live.start()
+
+        self._parts.append(token)
+        self._live.update(Markdown("".join(self._parts).strip()))
+
+    def close(self) -> None:
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
+        elif self._parts:
+            _write_plain("\n")
+        self._parts = []
+
+
+def tool_calls_message(tool_calls: list[dict]) -> str:
+    lines = [
+        "I want to execute the following tools. "
+        "Reply 'y' to continue or 'n' to cancel. "
+        "Otherwise you can explain your requested changes."
+        "\n\n**Calling tool(s)**\n"
+    ]
+
+    for tc in tool_calls:
+        lines.append(f"- **Tool:** {tc['name']}\n\t- **Args**\n")
+        lines.extend(f"\t\t- {arg}={value}\n" for arg, value in tc["args"].items())
+
+    return "".join(lines)
+
+
+def tool_call_denied_message(user_prompt: str) -> str:
+    if user_prompt.strip().lower() == "n":
+        user_prompt = "No, I don't want to execute those tools."
+
+    return (
+        f"Tool call denied by user. Reasoning: '{user_prompt}'. "
+        "Continue assisting, accounting for the user's input."
+    )
+
+
 def user_response(text: str) -> None:
     print_markdown(text, prepend_text=USER_TEXT)
 
 
 def user_input(message: str = "YOU: ") -> str:
-    console = Console()
-    return console.input(Text(message, style="bold green"))
+    return get_console().input(Text(message, style="bold green"))
 
 
 def print_thinking() -> None:
-    print("Thinking...", end="\r", flush=True)
+    # progress lines are overwritten in a terminal, piped they are just noise
+    if not is_plain_output():
+        _write_plain("Thinking...\r")
 
 
 def print_working() -> None:
-    print("Working...", end="\r", flush=True)
+    if not is_plain_output():
+        _write_plain("Working...\r")
 
 
 def say_goodbye() -> None:
@@ -57,6 +183,8 @@ def is_exit_response(response: str) -> bool:
 
 
 def handle_tool_error(state) -> dict:
+    from langchain_core.messages import ToolMessage
+
     error = state.get("error")
     tool_calls = state["messages"][-1].tool_calls
     return {
@@ -71,6 +199,9 @@ def handle_tool_error(state) -> dict:
 
 
 def create_tool_node_with_fallback(tools: list) -> dict:
+    from langchain_core.runnables import RunnableLambda
+    from langgraph.prebuilt.tool_node import ToolNode
+
     return ToolNode(tools).with_fallbacks(
         [RunnableLambda(handle_tool_error)], exception_key="error"
     )
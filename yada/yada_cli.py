@@ -1,31 +1,78 @@
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+import os
+import sys
+import threading
+from uuid import uuid4
 
-from yada import utils, model
+from yada import profiler, utils, model
+from yada.checkpoint import SqliteCheckpointSaver
+from yada.config import YADA_CHECKPOINT_DB_PATH, YADA_LLM_CACHE_DB_PATH, get_config
+from yada.json_output import JsonOutput
+from yada.llm_cache import YadaLLMCache
 from yada.tool_loader import ToolLoader
+from yada.tool_watcher import ToolWatcher
 from yada.agent import YadaAgent
 
 
 class YadaCli:
-    def __init__(self, thread_id: str, debug: bool = False) -> None:
+    def __init__(
+        self,
+        thread_id: str,
+        debug: bool = False,
+        stream_tokens: bool = False,
+        resume: bool = False,
+        output: str = "text",
+    ) -> None:
         self._printed = set()
-        self.config = {"configurable": {"thread_id": thread_id}}
         self.debug = debug
+        self.stream_tokens = stream_tokens
+        self.output = output
+        self.checkpointer = SqliteCheckpointSaver(
+            YADA_CHECKPOINT_DB_PATH,
+            max_checkpoints_per_thread=get_config().checkpoint_max_per_thread,
+            retention_days=get_config().checkpoint_retention_days,
+        )
+        self.llm_cache = None
+        self.tool_loader = None
         self.agent = self._new_agent()
+        # held while a turn runs, so reloaded tools are swapped in between turns
+        self._turn_lock = threading.Lock()
+
+        self.resumed = resume
+        if resume and not thread_id:
+            thread_id = self.checkpointer.latest_thread_id()
+        self.config = {"configurable": {"thread_id": thread_id or str(uuid4())}}
+
+    def yada_command(self, command: str) -> bool:
+        if self.output != "text":
+            json_output = JsonOutput(self.agent, sys.stdout, output_format=self.output)
+            return json_output.run(command, self.config)
 
-    def yada_command(self, command: str) -> None:
         result = self.agent.invoke(
             {"messages": [command]},
             config=self.config,
         )
         self._handle_event(result)
         self._handle_tool_calls(result)
+        self._print_debug_stats()
+        return True
 
     def yada_chat(self) -> None:
         self._print_title()
 
-        utils.agent_response("Hello! How can I help you?")
+        if self.resumed:
+            self._print_resumed_thread()
+        else:
+            utils.agent_response("Hello! How can I help you?")
 
+        tool_watcher = self._start_tool_watcher()
+        try:
+            self._chat_loop()
+        finally:
+            if tool_watcher:
+                tool_watcher.stop()
+
+    def _chat_loop(self) -> None:
         while True:
             try:
                 user_prompt = utils.user_input()
@@ -35,23 +82,98 @@ class YadaCli:
                     utils.say_goodbye()
                     break
 
-                utils.print_thinking()
+                with self._turn_lock:
+                    utils.print_thinking()
 
-                events = self.agent.stream(
-                    {"messages": [user_prompt]},
-                    config=self.config,
-                )
+                    if self.stream_tokens:
+                        event = self._stream_tokens(user_prompt)
+                    else:
+                        events = self.agent.stream(
+                            {"messages": [user_prompt]},
+                            config=self.config,
+                        )
 
-                for event in events:
-                    self._handle_event(event)
+                        for event in events:
+                            self._handle_event(event)
 
-                self._handle_tool_calls(event)
+                    self._handle_tool_calls(event)
+                    self._print_debug_stats()
             except KeyboardInterrupt:
                 utils.say_goodbye()
                 break
 
+    def _start_tool_watcher(self) -> ToolWatcher:
+        directory = self.tool_loader.custom_tools_dir
+        if not (get_config().custom_tools_hot_reload and directory):
+            return None
+        if not os.path.isdir(directory):
+            return None
+
+        tool_watcher = ToolWatcher(directory, self._reload_custom_tools)
+        tool_watcher.start()
+        return tool_watcher
+
+    def _reload_custom_tools(self, paths: list[str]) -> None:
+        with self._turn_lock:
+            self.tool_loader.reload(paths)
+            self.agent.update_tools(
+                self.tool_loader.safe_tools, self.tool_loader.sensitive_tools
+            )
+            if self.llm_cache:
+                self.llm_cache.sensitive_tool_names = {
+                    t.name for t in self.tool_loader.sensitive_tools
+                }
+
+        names = ", ".join(os.path.basename(path) for path in paths)
+        utils.print_text(f"Reloaded custom tools from {names}", style="dim")
+
+    def _stream_tokens(self, user_prompt: str) -> dict:
+        response_stream = utils.AgentResponseStream()
+        streamed_message_id = None
+        event = None
+
+        try:
+            for mode, chunk in self.agent.stream_tokens(
+                {"messages": [user_prompt]},
+                config=self.config,
+            ):
+                if mode == "messages":
+                    message, metadata = chunk
+                    if (
+                        metadata.get("langgraph_node") != "agent"
+                        or not isinstance(message, AIMessageChunk)
+                        or not isinstance(message.content, str)
+                        or not message.content
+                        or message.id in self._printed
+                    ):
+                        continue
+
+                    if message.id != streamed_message_id:
+                        response_stream.close()
+                        streamed_message_id = message.id
+
+                    response_stream.write(message.content)
+                else:
+                    # node finished, the full state follows its token chunks
+                    response_stream.close()
+                    event = chunk
+
+                    last_message = event["messages"][-1]
+                    if (
+                        isinstance(last_message, AIMessage)
+                        and last_message.id == streamed_message_id
+                        and not last_message.tool_calls
+                    ):
+                        self._printed.add(last_message.id)
+
+                    self._handle_event(event)
+        finally:
+            response_stream.close()
+
+        return event
+
     def _print_title(self) -> None:
-        utils.print_text(
+        utils.print_static(
             """
 __  _____   ___  ___
 \\ \\/ / _ | / _ \\/ _ |
@@ -61,7 +183,7 @@ Yet Another Dev Assistant
         """,
             style="blue",
         )
-        utils.print_markdown(
+        utils.print_static(
             """
 **Examples of what you can ask me**
 - What can you do?
@@ -70,20 +192,62 @@ Yet Another Dev Assistant
 - Install Homebrew
 - Install python@3.12 using Homebrew
 - Clone "Git URL" to path "bar"
-""".strip()
+""",
+            markdown=True,
         )
-        print("")  # newline
+        utils.print_text("")  # newline
+
+    def _print_resumed_thread(self) -> None:
+        messages = self.agent.get_state(self.config).values.get("messages", [])
+        self._printed.update(message.id for message in messages)
+
+        thread_id = self.config["configurable"]["thread_id"]
+        last_ai_message = next(
+            (
+                m
+                for m in reversed(messages)
+                if isinstance(m, AIMessage) and not m.tool_calls
+            ),
+            None,
+        )
+        if last_ai_message:
+            utils.print_text(
+                f"Resumed thread {thread_id} ({len(messages)} messages).",
+                style="blue",
+            )
+            utils.agent_response(last_ai_message.content)
+        else:
+            utils.agent_response(
+                f"Nothing to resume for thread {thread_id}. How can I help you?"
+            )
+
+    def _print_debug_stats(self) -> None:
+        if self.debug and self.llm_cache:
+            utils.print_text(f"LLM cache: {self.llm_cache.stats()}", style="dim")
 
     def _new_agent(self) -> YadaAgent:
         tool_loader = ToolLoader()
         tool_loader.load()
+        self.tool_loader = tool_loader
+
+        if get_config().llm_cache:
+            self.llm_cache = YadaLLMCache(
+                YADA_LLM_CACHE_DB_PATH,
+                sensitive_tool_names=[t.name for t in tool_loader.sensitive_tools],
+                ttl_seconds=get_config().llm_cache_ttl_seconds,
+                max_disk_entries=get_config().llm_cache_max_entries,
+            )
 
         return YadaAgent(
-            model=model(),
+            model=model(cache=self.llm_cache),
             safe_tools=tool_loader.safe_tools,
             sensitive_tools=tool_loader.sensitive_tools,
-            checkpointer=MemorySaver(),
+            checkpointer=self.checkpointer,
             debug=self.debug,
+            max_tool_workers=get_config().max_tool_workers,
+            tool_call_timeout=get_config().tool_call_timeout,
+            max_context_tokens=get_config().max_context_tokens,
+            tool_selection_top_k=get_config().tool_selection_top_k,
         )
 
     def _handle_event(
@@ -91,6 +255,10 @@ Yet Another Dev Assistant
         event: dict,
         print_user_events: bool = False,
     ) -> None:
+        with profiler.span("render", "handle_event"):
+            self._render_event(event, print_user_events)
+
+    def _render_event(self, event: dict, print_user_events: bool) -> None:
         current_state = event.get("dialog_state")
         if current_state:
             print("Currently in:", current_state[-1])
@@ -110,8 +278,8 @@ Yet Another Dev Assistant
                 self._printed.add(message_id)
 
     def _handle_tool_calls(self, event: dict) -> None:
-        snapshot = self.agent.get_state(self.config)
-        while snapshot.next:
+        tool_calls = self._pending_tool_calls(event)
+        while tool_calls:
             while True:
                 user_prompt = utils.user_input("YOU (y/N): ")
                 if not user_prompt:
@@ -119,44 +287,47 @@ Yet Another Dev Assistant
                 else:
                     break
 
-            result = self._handle_user_response_to_sensitive_tool_call(
-                user_prompt, event
+            tool_calls = self._handle_user_response_to_sensitive_tool_call(
+                user_prompt, tool_calls
             )
 
-            last_message = result.get("messages")[-1]
-            self._handle_ai_message(last_message)
-
-            snapshot = self.agent.get_state(self.config)
+    def _pending_tool_calls(self, event: dict) -> list[dict]:
+        # the graph stops before sensitive tools, so the last message of the
+        # turn tells whether it is waiting, without loading the thread state
+        messages = (event or {}).get("messages")
+        if not messages:
+            return []
+        return self.agent.pending_tool_calls("agent", {"messages": messages[-1:]})
 
     def _handle_user_response_to_sensitive_tool_call(
-        self, user_prompt: str, event: dict
-    ) -> dict:
+        self, user_prompt: str, tool_calls: list[dict]
+    ) -> list[dict]:
+        """
+        Resume the graph with the user's answer, printing the messages it adds
+        as they arrive. Returns the next sensitive tool calls waiting for
+        confirmation, if any.
+        """
         if user_prompt.strip().lower() == "y":
             utils.print_working()
-            return self.agent.invoke(None, self.config)
+            input = None
         else:
-            if user_prompt.strip().lower() == "n":
-                user_prompt = "No, I don't want to execute those tools."
-
             utils.print_thinking()
+            denied = utils.tool_call_denied_message(user_prompt)
+            input = {
+                "messages": [
+                    ToolMessage(tool_call_id=tool_call["id"], content=denied)
+                    for tool_call in tool_calls
+                ]
+            }
 
-            last_event_message: AIMessage = event["messages"][-1]
-            tool_calls = last_event_message.tool_calls
-
-            return self.agent.invoke(
-                {
-                    "messages": [
-                        ToolMessage(
-                            tool_call_id=tool_calls[0]["id"],
-                            content=(
-                                f"Tool call denied by user. Reasoning: '{user_prompt}'. "
-                                "Continue assisting, accounting for the user's input."
-                            ),
-                        )
-                    ]
-                },
-                self.config,
-            )
+        pending = []
+        for node, update in self.agent.stream_updates(input, self.config):
+            for message in update.get("messages", []):
+                if isinstance(message, AIMessage) and message.id not in self._printed:
+                    self._handle_ai_message(message)
+                    self._printed.add(message.id)
+            pending = self.agent.pending_tool_calls(node, update)
+        return pending
 
     def _handle_ai_message(
         self,
@@ -173,17 +344,4 @@ Yet Another Dev Assistant
             utils.agent_response(message.content)
 
     def _print_tool_calls_message(self, tool_calls: list[dict]) -> None:
-        tool_call_msg = (
-            "I want to execute the following tools. "
-            "Reply 'y' to continue or 'n' to cancel. "
-            "Otherwise you can explain your requested changes."
-            "\n\n**Calling tool(s)**\n"
-        )
-
-        for tc in tool_calls:
-            tool_call_msg += f"- **Tool:** {tc['name']}\n\t- **Args**\n"
-
-            for arg in tc["args"]:
-                tool_call_msg += f"\t\t- {arg}={tc['args'][arg]}\n"
-
-        utils.agent_response(tool_call_msg)
+        utils.agent_response(utils.tool_calls_message(tool_calls))